@@ -1,5 +1,9 @@
-# Simple wrapper to make the app accessible at the root level for Render
-from backend.app import app
+# Simple wrapper to run the app from the root level. Gunicorn (e.g. on Render) uses
+# the factory directly: gunicorn 'backend.app:create_app()'
+from backend.app import create_app, setup_database, start_background_services
 
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    app = create_app()
+    setup_database(app)
+    start_background_services(app)
+    app.run()
@@ -1,4 +1,4 @@
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, send_from_directory, jsonify, current_app
 from flask_cors import CORS
 from flask_mail import Mail
 from flask_jwt_extended import JWTManager
@@ -6,41 +6,61 @@ from backend.config import Config
 from backend.models import db
 from backend.routes.user_routes import user_bp
 from backend.routes.admin_routes import admin_bp
-from backend.services.scheduler_service import start_scheduler
+from backend.services.scheduler_service import start_scheduler, stop_scheduler
+from backend.services.token_allocator import token_allocator
+from backend.services.email_outbox import start_outbox_dispatcher
+from backend.services.stats_service import init_status_counters
+from backend.services.export_jobs import init_export_jobs
+from backend.services.migration_service import init_migrations, upgrade_database
+from backend.services.database_service import init_engines
+from backend.services.response_cache import init_response_cache
+from backend.services.event_hub import init_event_hub, start_event_relay, stop_event_relay
+from backend.services.token_index import init_token_index, load_token_index
+from backend.services.queue_estimator import init_service_time_stats
+from backend.services.metrics import init_metrics, metrics_response
+from backend.services.profiler import init_profiler
+from backend.utils.mail_transport import init_mail_transport
+from backend.utils.email_templates import load_email_templates
+from flask.cli import with_appcontext
+import click
 import os
 import logging
+import signal
+import threading
 import traceback
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_app():
+def create_app(config_class=Config):
+    # Wires the app together without touching the database or starting threads, so
+    # importing and building it is cheap and safe in any process. The schema is set
+    # up by `flask init-db`; the outbox and scheduler are started per worker by
+    # start_background_services (see gunicorn.conf.py) or by `flask scheduler`.
     app = Flask(__name__, static_folder='../frontend/dist', static_url_path='')
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
     
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
     db.init_app(app)
+    init_engines(app)
+    init_migrations(app)
     mail = Mail(app)
+    init_mail_transport(app, mail)
+    load_email_templates()
     jwt = JWTManager(app)
+    token_allocator.init_app(app)
+    init_export_jobs(app)
+    init_response_cache(app)
+    init_event_hub(app)
+    init_token_index(app)
+    init_metrics(app)
+    init_profiler(app)
     
     app.register_blueprint(user_bp)
     app.register_blueprint(admin_bp)
-    
-    with app.app_context():
-        try:
-            db.create_all()
-            logger.info("Database tables created successfully")
-        except Exception as e:
-            logger.error(f"Error creating database tables: {str(e)}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-    
-    try:
-        start_scheduler(app, mail)
-        logger.info("Scheduler started successfully")
-    except Exception as e:
-        logger.error(f"Error starting scheduler: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(scheduler_command)
     
     @app.route('/health')
     def health():
@@ -50,6 +70,10 @@ def create_app():
     def api_health():
         return jsonify({'status': 'healthy'}), 200
     
+    @app.route('/metrics')
+    def metrics():
+        return metrics_response()
+    
     @app.route('/')
     def index():
         if app.static_folder and os.path.exists(os.path.join(app.static_folder, 'index.html')):
@@ -79,8 +103,62 @@ def create_app():
     
     return app
 
-# Create an app instance for gunicorn
-app = create_app()
+def setup_database(app):
+    # Migrations plus the rows every worker relies on: the token sequence, the
+    # status counters and the service time stats. Runs once per deploy, not in
+    # every worker.
+    with app.app_context():
+        upgrade_database()
+        token_allocator.sync_sequence()
+        init_status_counters()
+        init_service_time_stats()
+
+def start_background_services(app):
+    # The scheduler (reminders, plus the periodic jobs on whichever process holds
+    # the lease), the email outbox dispatcher and the token index, in the current process
+    mail = app.extensions['mail_transport'].mail
+    try:
+        start_scheduler(app, mail)
+    except Exception as e:
+        logger.error(f"Error starting scheduler: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+    start_outbox_dispatcher(app, mail)
+    start_event_relay(app)
+    load_token_index(app)
+
+def stop_background_services(app):
+    stop_scheduler(app)
+    stop_event_relay(app)
+    dispatcher = app.extensions.get('email_outbox')
+    if dispatcher is not None:
+        dispatcher.stop()
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create or upgrade the database schema."""
+    setup_database(current_app._get_current_object())
+    click.echo("Database schema is up to date")
+
+@click.command('scheduler')
+@with_appcontext
+def scheduler_command():
+    """Run the scheduler and email outbox in the foreground."""
+    app = current_app._get_current_object()
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    start_background_services(app)
+    click.echo("Scheduler running, press Ctrl+C to stop")
+    try:
+        stopping.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_background_services(app)
 
 if __name__ == '__main__':
+    # Development server: one process that sets up the schema and runs everything
+    app = create_app()
+    setup_database(app)
+    start_background_services(app)
     app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
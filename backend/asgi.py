@@ -0,0 +1,209 @@
+import asyncio
+import json
+import traceback
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.app import create_app, start_background_services, stop_background_services
+from backend.config import Config
+from backend.services.database_service import create_async_database_engine
+from backend.services.email_outbox import notify_outbox
+from backend.services.response_cache import invalidate_responses
+from backend.services.event_hub import TOKEN_CREATED, STREAM_PREAMBLE, KEEPALIVE, STREAM_HEADERS, publish_event, token_created_event
+from backend.services.token_index import index_tokens
+from backend.services.metrics import RequestMetrics
+from backend.services.scheduler_service import request_reminder_dispatch
+from backend.services.submission_service import register_user, submission_response, validate_submission
+from backend.services.token_allocator import token_allocator
+
+# ASGI serving mode: /api/submit and /api/next-token run natively on the event loop
+# with an async engine (aiosqlite or asyncpg), so thousands of waiting clients cost a
+# coroutine each instead of a worker thread. They share their logic with the Flask
+# routes and return the same responses. Every other route is served by the Flask app
+# in a thread pool. /api/events streams Server-Sent Events with a coroutine per
+# subscriber, so idle subscribers cost no threads.
+#
+#   flask --app backend.app init-db
+#   uvicorn --factory backend.asgi:create_asgi_app --host 0.0.0.0 --port $PORT --timeout-graceful-shutdown 5
+#
+# (open /api/events streams never finish on their own, hence the shutdown timeout)
+#
+# The lifespan events start and stop the outbox and scheduler in each worker, so
+# gunicorn.conf.py leaves them alone for uvicorn workers.
+
+JSON_HEADERS = [
+    (b'content-type', b'application/json'),
+    (b'access-control-allow-origin', b'*'),
+]
+
+STREAM_RESPONSE_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'access-control-allow-origin', b'*'),
+] + [(name.lower().encode(), value.encode()) for name, value in STREAM_HEADERS.items()]
+
+
+class _ThreadedWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs every WSGI call on one shared thread by default; the Flask app is
+    # thread-safe, so let concurrent requests use the thread pool
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, thread_sensitive=False)
+
+
+class _ThreadedWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ThreadedWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(
+            scope, receive, send
+        )
+
+
+class AsgiApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = _ThreadedWsgiToAsgi(flask_app)
+        self.engine = create_async_database_engine(flask_app)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        # Only one coroutine reserves a new token block at a time (block sizes > 1)
+        self._block_lock = asyncio.Lock()
+        # SQLite takes one writer at a time and makes the others poll with sleeps of
+        # up to 100 ms, so this process's submits queue here instead
+        self._write_lock = asyncio.Lock() if self.engine.dialect.name == 'sqlite' else nullcontext()
+        self.routes = {
+            ('POST', '/api/submit'): self.submit_user,
+            ('GET', '/api/next-token'): self.get_next_token,
+        }
+        self.streams = {
+            ('GET', '/api/events'): self.stream_events,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        route = (scope.get('method'), scope.get('path'))
+        if scope['type'] == 'http' and route in self.streams:
+            await self.streams[route](scope, receive, send)
+        elif scope['type'] == 'http' and route in self.routes:
+            # Recorded like the Flask routes, under the same route label
+            metrics = RequestMetrics(*route)
+            status, body = await self.routes[route](scope, receive)
+            metrics.finish(status, self.flask_app.config.get('METRICS_QUERY_WARN_THRESHOLD'))
+            await self.send_json(send, status, body)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    async def send_json(self, send, status, body):
+        payload = self.flask_app.json.dumps(body).encode() + b'\n'
+        headers = JSON_HEADERS + [(b'content-length', str(len(payload)).encode())]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.to_thread(start_background_services, self.flask_app)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await asyncio.to_thread(stop_background_services, self.flask_app)
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def submit_user(self, scope, receive):
+        try:
+            fields, error = validate_submission(await read_json(scope, receive))
+            if error:
+                return 400, {'error': error}
+
+            async with self._write_lock, self.sessions() as session:
+                async with session.begin():
+                    new_token_number = await self.allocate_token(session)
+                    new_user = await session.run_sync(register_user, new_token_number, fields)
+            notify_outbox(self.flask_app)
+            invalidate_responses(self.flask_app)
+            index_tokens(self.flask_app, new_user.status, [new_user.token_number])
+            publish_event(self.flask_app, TOKEN_CREATED, token_created_event(new_user))
+            # Off the loop: without a running scheduler the sweep runs inline
+            await asyncio.to_thread(request_reminder_dispatch, self.flask_app)
+
+            return 201, submission_response(new_user)
+
+        except Exception as e:
+            self.flask_app.logger.error(f"Error submitting user: {str(e)}")
+            self.flask_app.logger.error(f"Traceback: {traceback.format_exc()}")
+            return 500, {'error': 'Failed to submit user data. Please try again.'}
+
+    async def get_next_token(self, scope, receive):
+        try:
+            async with self.sessions() as session:
+                next_token = await session.run_sync(token_allocator.peek_next)
+            return 200, {'next_token': next_token}
+        except Exception as e:
+            self.flask_app.logger.error(f"Error getting next token: {str(e)}")
+            self.flask_app.logger.error(f"Traceback: {traceback.format_exc()}")
+            return 500, {'error': 'Failed to get next token'}
+
+    async def stream_events(self, scope, receive, send):
+        subscription = self.flask_app.extensions['event_hub'].subscribe(asyncio.get_running_loop())
+        if subscription is None:
+            await self.send_json(send, 503, {'error': 'Too many subscribers, try again later'})
+            return
+        keepalive = self.flask_app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            subscription.closed = True
+            subscription.ready.set()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_RESPONSE_HEADERS})
+            await send({'type': 'http.response.body', 'body': STREAM_PREAMBLE, 'more_body': True})
+            while not subscription.closed:
+                events = await subscription.wait_async(keepalive)
+                if not subscription.closed:
+                    await send({'type': 'http.response.body', 'body': b''.join(events) or KEEPALIVE, 'more_body': True})
+        except OSError:
+            # The client went away mid-send
+            pass
+        finally:
+            watcher.cancel()
+            subscription.close()
+
+    async def allocate_token(self, session):
+        if token_allocator.block_size == 1:
+            # Inside the submit transaction, like the Flask route
+            return await session.run_sync(token_allocator.allocate)
+
+        token_number = token_allocator.take_reserved()
+        if token_number is None:
+            async with self._block_lock:
+                token_number = token_allocator.take_reserved()
+                if token_number is None:
+                    async with self.engine.begin() as conn:
+                        await conn.run_sync(token_allocator.reserve_block)
+                    token_number = token_allocator.take_reserved()
+        return token_number
+
+
+async def read_json(scope, receive):
+    # Same rules as Flask's request.json: a JSON content type and a parseable body,
+    # otherwise an error (which the handlers turn into the route's 500 response)
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    content_type = dict(scope['headers']).get(b'content-type', b'').decode('latin-1')
+    mimetype = content_type.split(';')[0].strip().lower()
+    if not (mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))):
+        raise ValueError(f"Expected a JSON body, got content type {content_type!r}")
+    return json.loads(body)
+
+
+def create_asgi_app(config_class=Config):
+    return AsgiApp(create_app(config_class))
@@ -1,11 +1,53 @@
 import os
 from datetime import timedelta
 
+
+def database_url(name, default=None):
+    url = os.environ.get(name, default)
+    # Render and Heroku hand out postgres:// URLs, which SQLAlchemy no longer accepts
+    if url and url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url):
+    if url.startswith('sqlite'):
+        # Nothing to keep alive for a local file; SQLITE_PRAGMAS handles concurrency
+        return {}
+    # Per worker process: DB_POOL_SIZE open connections plus DB_MAX_OVERFLOW for
+    # bursts. Pre-ping replaces connections the server dropped, and recycling stays
+    # under the idle timeouts of hosted databases and proxies.
+    return {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 10,
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE_SECONDS', 1800)),
+    }
+
+
 class Config:
     SECRET_KEY = os.environ.get('SESSION_SECRET', 'dev-secret-key-change-in-production')
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///service_tokens.db'
+    SQLALCHEMY_DATABASE_URI = database_url('DATABASE_URL', 'sqlite:///service_tokens.db')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Optional read replica for the read-only admin queries (user listing, outbox
+    # listing, synchronous exports); everything else uses the primary
+    DATABASE_REPLICA_URL = database_url('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': {
+        'url': DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL)
+    }} if DATABASE_REPLICA_URL else {}
+    
+    # Set on every new SQLite connection: WAL lets readers run alongside the writer,
+    # NORMAL only syncs at checkpoints (safe in WAL mode), and writers wait for the
+    # lock instead of failing with "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    }
+    
     JWT_SECRET_KEY = os.environ.get('SESSION_SECRET', 'jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
@@ -17,7 +59,78 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD', '')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@servicetoken.com')
     
+    # Long-lived SMTP connections kept open per worker process
+    MAIL_POOL_SIZE = int(os.environ.get('MAIL_POOL_SIZE', 2))
+    MAIL_POOL_MAX_IDLE_SECONDS = 60
+    
+    OUTBOX_WORKERS = int(os.environ.get('OUTBOX_WORKERS', MAIL_POOL_SIZE))
+    OUTBOX_BATCH_SIZE = 50
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_BASE_SECONDS = 30
+    OUTBOX_LOCK_TIMEOUT_SECONDS = 300
+    
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME', 'admin')
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin123')
     
-    SERVICE_TIME_MINUTES = 15
+    # Queue ETAs: the mean service time is learnt from completions, starting from
+    # SERVICE_TIME_MINUTES (see backend/services/queue_estimator.py). Reminders go out
+    # once a token is expected to be served within REMINDER_LEAD_MINUTES.
+    SERVICE_TIME_MINUTES = int(os.environ.get('SERVICE_TIME_MINUTES', 15))
+    SERVICE_TIME_WINDOW = 20
+    SERVICE_TIME_MAX_MINUTES = 120
+    REMINDER_LEAD_MINUTES = int(os.environ.get('REMINDER_LEAD_MINUTES', 15))
+    
+    # Only the worker holding the lease runs periodic jobs; the others take over
+    # within one lease period if it dies
+    SCHEDULER_LEASE_SECONDS = 30
+    SCHEDULER_MAX_WORKERS = int(os.environ.get('SCHEDULER_MAX_WORKERS', 2))
+    OUTBOX_RECOVERY_MINUTES = 5
+    STATS_RECONCILE_MINUTES = 60
+    EXPORT_CLEANUP_MINUTES = 30
+    
+    # Background exports: built in a process pool and cached until the users change
+    EXPORT_DIR = os.environ.get('EXPORT_DIR')
+    EXPORT_WORKERS = int(os.environ.get('EXPORT_WORKERS', 1))
+    EXPORT_MAX_AGE_MINUTES = 24 * 60
+    EXPORT_MAX_TOTAL_MB = int(os.environ.get('EXPORT_MAX_TOTAL_MB', 500))
+    EXPORT_JOB_TIMEOUT_SECONDS = 30 * 60
+    # Processes that render page ranges of one PDF in parallel (needs pypdf)
+    PDF_EXPORT_WORKERS = int(os.environ.get('PDF_EXPORT_WORKERS', 1))
+    
+    # Admin stats and user listing responses, cached per worker until a submit or
+    # status change (or for at most the TTL; 0 turns caching off). Set
+    # RESPONSE_CACHE_REDIS_URL to share the cache, and its invalidation, across workers.
+    RESPONSE_CACHE_TTL_SECONDS = int(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 10))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 128))
+    RESPONSE_CACHE_REDIS_URL = os.environ.get('RESPONSE_CACHE_REDIS_URL')
+    
+    # Live updates on /api/events: events buffered per subscriber before the oldest
+    # are dropped, subscribers per worker, and the keepalive interval. Set
+    # EVENTS_REDIS_URL to relay events between workers. EVENTS_STREAMING is turned
+    # off in gunicorn's sync workers (see gunicorn.conf.py), where every open stream
+    # would take the worker's only thread.
+    EVENTS_BUFFER_SIZE = int(os.environ.get('EVENTS_BUFFER_SIZE', 100))
+    EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 5000))
+    EVENTS_KEEPALIVE_SECONDS = 15
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL')
+    EVENTS_STREAMING = True
+    
+    # Public token lookups (/api/token/<n>): served from each worker's in-memory
+    # index, which picks up other workers' writes every TOKEN_INDEX_REFRESH_SECONDS,
+    # and limited to TOKEN_LOOKUP_RATE_LIMIT requests per client per minute (0 = off)
+    TOKEN_INDEX_REFRESH_SECONDS = int(os.environ.get('TOKEN_INDEX_REFRESH_SECONDS', 5))
+    TOKEN_LOOKUP_RATE_LIMIT = int(os.environ.get('TOKEN_LOOKUP_RATE_LIMIT', 60))
+    
+    # Prometheus metrics on /metrics, per worker process, for scrapers sending
+    # METRICS_TOKEN as a bearer token or for admins; requests running more queries
+    # than the threshold are logged. PROFILER_ENABLED lets requests sent with
+    # "X-Profile: 1" by the same callers be sampled.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    METRICS_QUERY_WARN_THRESHOLD = int(os.environ.get('METRICS_QUERY_WARN_THRESHOLD', 50))
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_INTERVAL_MS = 1
+    PROFILER_KEEP = 20
+    
+    # Tokens reserved per worker per counter update; 1 keeps numbering gap-free
+    TOKEN_BLOCK_SIZE = int(os.environ.get('TOKEN_BLOCK_SIZE', 1))
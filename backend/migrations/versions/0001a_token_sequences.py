@@ -0,0 +1,31 @@
+"""token sequences
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 11:18:38.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001a'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases created with db.create_all() from newer models and
+    # stamped with the baseline already have it
+    op.create_table('token_sequences',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('token_sequences')
@@ -0,0 +1,32 @@
+"""scheduler leases
+
+Revision ID: 0001c
+Revises: 0001b
+Create Date: 2026-10-18 11:18:38.200000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001c'
+down_revision = '0001b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases created with db.create_all() from newer models and
+    # stamped with the baseline already have it
+    op.create_table('scheduler_leases',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('holder', sa.String(length=100), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_leases')
@@ -0,0 +1,31 @@
+"""status counters
+
+Revision ID: 0001d
+Revises: 0001c
+Create Date: 2026-10-18 11:18:38.300000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001d'
+down_revision = '0001c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases created with db.create_all() from newer models and
+    # stamped with the baseline already have it
+    op.create_table('status_counters',
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status'),
+    if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('status_counters')
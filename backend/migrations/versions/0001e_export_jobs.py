@@ -0,0 +1,43 @@
+"""export jobs
+
+Revision ID: 0001e
+Revises: 0001d
+Create Date: 2026-10-18 11:18:38.400000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001e'
+down_revision = '0001d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: databases created with db.create_all() from newer models and
+    # stamped with the baseline already have it
+    op.create_table('export_jobs',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('cache_key', sa.String(length=100), nullable=False),
+    sa.Column('filename', sa.String(length=100), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index('ix_export_jobs_cache_key', 'export_jobs', ['cache_key'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_export_jobs_cache_key'))
+
+    op.drop_table('export_jobs')
@@ -0,0 +1,88 @@
+"""search index
+
+Revision ID: 0002
+Revises: 0001e
+Create Date: 2026-10-18 11:18:42.108924
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001e'
+branch_labels = None
+depends_on = None
+
+
+# The statements as they stood when this revision was written; the copies in
+# backend/services/search_service.py may change, this revision may not
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, email, contact_number, contact_digits, tokenize = 'unicode61', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits)
+        VALUES (new.id, new.name, new.email, new.contact_number,
+                replace(replace(replace(replace(replace(new.contact_number, '-', ''), ' ', ''), '+', ''), '(', ''), ')', ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email, contact_number ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+        INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits)
+        VALUES (new.id, new.name, new.email, new.contact_number,
+                replace(replace(replace(replace(replace(new.contact_number, '-', ''), ' ', ''), '+', ''), '(', ''), ')', ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        DELETE FROM users_fts WHERE rowid = old.id;
+    END
+    """,
+]
+SQLITE_REBUILD = [
+    "DELETE FROM users_fts",
+    """
+    INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits)
+    SELECT id, name, email, contact_number,
+           replace(replace(replace(replace(replace(contact_number, '-', ''), ' ', ''), '+', ''), '(', ''), ')', '')
+    FROM users
+    """,
+]
+POSTGRES_DDL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_users_search ON users USING gin (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' ||
+                    coalesce(contact_number, '') || ' ' ||
+                    regexp_replace(coalesce(contact_number, ''), '[^0-9]', '', 'g'))
+    )
+    """,
+]
+
+
+def upgrade():
+    # Full-text index for admin search, backfilled from existing users. Both are
+    # idempotent, so databases that already built the index at startup are fine.
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DDL + SQLITE_REBUILD:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('users_fts_insert', 'users_fts_update', 'users_fts_delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS users_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_users_search")
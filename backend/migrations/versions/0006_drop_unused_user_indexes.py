@@ -0,0 +1,29 @@
+"""drop unused user indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 19:12:44.301558
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Revision 0003 used to create these. No query looks users up by email or contact
+    # number (search goes through the full-text index), so they only slowed writes.
+    # if_exists: databases migrated after 0003 dropped them never had them.
+    op.drop_index('ix_users_email', table_name='users', if_exists=True)
+    op.drop_index('ix_users_contact_number', table_name='users', if_exists=True)
+
+
+def downgrade():
+    # Nothing to restore: 0003 no longer creates them either
+    pass
@@ -15,9 +15,15 @@ class User(db.Model):
     work_description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='Pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     reminder_sent = db.Column(db.Boolean, default=False)
     
+    __table_args__ = (
+        # Status-filtered listing newest first, its keyset cursor, the reminder sweep
+        # (pending tokens in a range) and the per-status counts
+        db.Index('ix_users_status_token_number', 'status', 'token_number'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -33,9 +39,98 @@ class User(db.Model):
             'reminder_sent': self.reminder_sent
         }
 
+class StatusCounter(db.Model):
+    __tablename__ = 'status_counters'
+    
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
+
 class CompletedWork(db.Model):
     __tablename__ = 'completed_works'
     
     id = db.Column(db.Integer, primary_key=True)
     count = db.Column(db.Integer, default=0)
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ServiceTimeStats(db.Model):
+    __tablename__ = 'service_time_stats'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    # Exponentially weighted mean of recent service durations, in seconds
+    mean_seconds = db.Column(db.Float, nullable=False)
+    samples = db.Column(db.Integer, default=0, nullable=False)
+    last_completed_at = db.Column(db.DateTime)
+
+class TokenSequence(db.Model):
+    __tablename__ = 'token_sequences'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class EmailOutbox(db.Model):
+    __tablename__ = 'email_outbox'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    kind = db.Column(db.String(20), nullable=False)
+    recipient = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='Queued', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    # Due and stale entries are looked up by status, oldest retry first
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'kind': self.kind,
+            'recipient': self.recipient,
+            'status': self.status,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None
+        }
+
+class SchedulerLease(db.Model):
+    __tablename__ = 'scheduler_leases'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+    
+    id = db.Column(db.String(32), primary_key=True)
+    format = db.Column(db.String(10), nullable=False)
+    status = db.Column(db.String(20), default='Queued', nullable=False)
+    cache_key = db.Column(db.String(100), nullable=False, index=True)
+    filename = db.Column(db.String(100), nullable=False)
+    file_path = db.Column(db.String(500), nullable=False)
+    size = db.Column(db.Integer)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'format': self.format,
+            'status': self.status,
+            'filename': self.filename,
+            'size': self.size,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
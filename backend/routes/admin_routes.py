@@ -1,7 +1,20 @@
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, send_file, current_app, Response, stream_with_context
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from backend.models import db, User, CompletedWork
-from backend.utils.export_service import export_to_excel, export_to_csv, export_to_pdf
+from backend.models import db, User, CompletedWork, EmailOutbox, ExportJob
+from backend.services.email_outbox import notify_outbox
+from backend.services.scheduler_service import request_reminder_dispatch
+from backend.services.search_service import search_filter, ranked_search, get_search_backend
+from backend.services.stats_service import STATUSES, record_status_change, get_status_counts, get_stats as get_dashboard_stats
+from backend.services.export_jobs import EXPORT_FORMATS
+from backend.services.database_service import read_connection, replica_bind_arguments
+from backend.services.response_cache import STATS_NAMESPACE, USERS_NAMESPACE, cached_response, invalidate_responses
+from backend.services.event_hub import publish_status_change
+from backend.services.queue_estimator import record_completions
+from backend.services.token_index import index_tokens
+from backend.services.profiler import get_profile
+from sqlalchemy import select, func, update
+from backend.utils.export_service import export_to_excel, stream_csv, export_to_pdf
+from backend.utils.user_serializer import USER_FIELDS, select_users, serialize_users, json_response
 from datetime import datetime
 
 admin_bp = Blueprint('admin', __name__)
@@ -30,34 +43,75 @@ def admin_login():
         current_app.logger.error(f"Login error: {str(e)}")
         return jsonify({'error': 'Login failed'}), 500
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 @admin_bp.route('/api/admin/users', methods=['GET'])
 @jwt_required()
+@cached_response(USERS_NAMESPACE)
 def get_all_users():
     try:
-        search = request.args.get('search', '')
+        search = request.args.get('search', '').strip()
         status = request.args.get('status', '')
+        # 'relevance' ranks search results instead of listing them newest first
+        order = request.args.get('order', '')
+        limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+        # Keyset pagination: the cursor is the last token number of the previous page
+        cursor = request.args.get('cursor', type=int)
+        
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        if fields:
+            unknown = [field for field in fields if field not in USER_FIELDS]
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+            fields = ['id', 'token_number'] + [field for field in fields if field not in ('id', 'token_number')]
+        else:
+            fields = list(USER_FIELDS)
         
-        query = User.query
+        search_backend = get_search_backend(current_app) if search else None
+        ranked = bool(search) and order == 'relevance'
+        filters = []
         
         if search:
-            search_filter = f"%{search}%"
-            query = query.filter(
-                (User.name.like(search_filter)) |
-                (User.email.like(search_filter)) |
-                (User.contact_number.like(search_filter)) |
-                (User.token_number == int(search) if search.isdigit() else False)
-            )
+            filters.append(search_filter(search, search_backend))
         
         if status and status != 'All':
-            query = query.filter(User.status == status)
+            filters.append(User.status == status)
         
-        users = query.order_by(User.token_number.desc()).all()
+        # Only the requested columns are loaded, as plain rows rather than ORM objects
+        query = select_users(fields)
+        if ranked:
+            # Ranked results are a single best-first page; there is no cursor to follow
+            query = ranked_search(query.filter(*filters[1:]), search, search_backend)
+        else:
+            query = query.filter(*filters)
+            if cursor is not None:
+                query = query.filter(User.token_number < cursor)
+            query = query.order_by(User.token_number.desc())
+        connection = read_connection()
+        rows = connection.execute(query.limit(limit + 1)).all()
         
-        return jsonify({
+        has_more = len(rows) > limit
+        users = serialize_users(fields, rows[:limit])
+        
+        # The total only changes between listings, not between pages of one listing.
+        # Without a search it is a status counter; only searches are counted
+        total = None
+        if cursor is None:
+            if search:
+                total = connection.execute(select(func.count(User.id)).filter(*filters)).scalar()
+            else:
+                counts = get_status_counts(connection)
+                total = counts.get(status, 0) if status and status != 'All' else sum(counts.values())
+        
+        return json_response({
             'success': True,
-            'users': [user.to_dict() for user in users],
-            'total': len(users)
-        }), 200
+            'users': users,
+            'total': total,
+            'limit': limit,
+            'has_more': has_more,
+            'next_cursor': users[-1]['token_number'] if has_more and not ranked else None
+        })
         
     except Exception as e:
         current_app.logger.error(f"Error fetching users: {str(e)}")
@@ -80,8 +134,10 @@ def update_user_status(user_id):
         old_status = user.status
         user.status = new_status
         user.updated_at = datetime.utcnow()
+        record_status_change(old_status, new_status)
         
         if old_status == 'Pending' and new_status == 'Completed':
+            record_completions([user.created_at], user.updated_at)
             completed_work = CompletedWork.query.first()
             if not completed_work:
                 completed_work = CompletedWork(count=0)
@@ -90,6 +146,13 @@ def update_user_status(user_id):
             completed_work.last_updated = datetime.utcnow()
         
         db.session.commit()
+        invalidate_responses(current_app)
+        if old_status != new_status:
+            index_tokens(current_app, new_status, [user.token_number])
+            publish_status_change(current_app, old_status, new_status, [(user.id, user.token_number)])
+        
+        if old_status == 'Pending' and new_status == 'Completed':
+            request_reminder_dispatch(current_app._get_current_object())
         
         return jsonify({
             'success': True,
@@ -102,37 +165,196 @@ def update_user_status(user_id):
         current_app.logger.error(f"Error updating user: {str(e)}")
         return jsonify({'error': 'Failed to update user'}), 500
 
-@admin_bp.route('/api/admin/stats', methods=['GET'])
+MAX_BULK_IDS = 1000
+
+def _is_integer(value):
+    # JSON true and false arrive as bools, which are ints to isinstance
+    return isinstance(value, int) and not isinstance(value, bool)
+
+@admin_bp.route('/api/admin/users/status', methods=['PUT'])
 @jwt_required()
-def get_stats():
+def bulk_update_user_status():
+    # Moves a list of users ({"ids": [...]}) or a token range ({"token_from": a,
+    # "token_to": b}, inclusive) to a status in one transaction, with one UPDATE per
+    # old status instead of a PUT per user
     try:
-        total_users = User.query.count()
-        pending = User.query.filter_by(status='Pending').count()
-        completed = User.query.filter_by(status='Completed').count()
+        data = request.get_json(silent=True) or {}
+        new_status = data.get('status')
+        
+        if new_status not in STATUSES:
+            return jsonify({'error': 'Invalid status'}), 400
+        
+        ids = data.get('ids')
+        token_from, token_to = data.get('token_from'), data.get('token_to')
+        if ids is not None:
+            if not isinstance(ids, list) or not ids or not all(_is_integer(user_id) for user_id in ids):
+                return jsonify({'error': 'ids must be a non-empty list of user ids'}), 400
+            if len(ids) > MAX_BULK_IDS:
+                return jsonify({'error': f'At most {MAX_BULK_IDS} ids per request'}), 400
+            selection = User.id.in_(ids)
+        elif _is_integer(token_from) and _is_integer(token_to) and token_from <= token_to:
+            selection = User.token_number.between(token_from, token_to)
+        else:
+            return jsonify({'error': 'Provide ids or token_from and token_to'}), 400
+        
+        matched = db.session.execute(select(func.count(User.id)).where(selection)).scalar()
+        now = datetime.utcnow()
+        # Only rows that actually change are touched, so the counters move by the
+        # number of real transitions
+        transitions = {}
+        for old_status in STATUSES:
+            if old_status == new_status:
+                continue
+            transitions[old_status] = db.session.execute(
+                update(User)
+                .where(selection, User.status == old_status)
+                .values(status=new_status, updated_at=now)
+                .returning(User.id, User.token_number, User.created_at)
+                .execution_options(synchronize_session=False)
+            ).all()
+            record_status_change(old_status, new_status, len(transitions[old_status]))
+        
+        completed = len(transitions.get('Pending', [])) if new_status == 'Completed' else 0
+        if completed:
+            record_completions([user.created_at for user in transitions['Pending']], now)
+            result = db.session.execute(
+                update(CompletedWork)
+                .values(count=CompletedWork.count + completed, last_updated=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.session.add(CompletedWork(count=completed, last_updated=now))
+        
+        db.session.commit()
+        updated = sum(len(users) for users in transitions.values())
+        if updated:
+            invalidate_responses(current_app)
+        for old_status, users in transitions.items():
+            index_tokens(current_app, new_status, [user.token_number for user in users])
+            publish_status_change(current_app, old_status, new_status,
+                                  [(user.id, user.token_number) for user in users])
+        if completed:
+            # One sweep catches up every reminder the batch made due
+            request_reminder_dispatch(current_app._get_current_object())
         
-        completed_work = CompletedWork.query.first()
-        completed_works_count = completed_work.count if completed_work else 0
+        return jsonify({
+            'success': True,
+            'message': f'{updated} users updated',
+            'matched': matched,
+            'updated': updated,
+            'unchanged': matched - updated
+        }), 200
         
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error updating users: {str(e)}")
+        return jsonify({'error': 'Failed to update users'}), 500
+
+@admin_bp.route('/api/admin/stats', methods=['GET'])
+@jwt_required()
+@cached_response(STATS_NAMESPACE)
+def get_stats():
+    try:
+        # Maintained counters, so this does not depend on the size of the users table
         return jsonify({
             'success': True,
-            'stats': {
-                'total': total_users,
-                'pending': pending,
-                'completed': completed,
-                'completed_works': completed_works_count
-            }
+            'stats': get_dashboard_stats()
         }), 200
         
     except Exception as e:
         current_app.logger.error(f"Error fetching stats: {str(e)}")
         return jsonify({'error': 'Failed to fetch stats'}), 500
 
+@admin_bp.route('/api/admin/cache', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    cache = current_app.extensions.get('response_cache')
+    return jsonify({
+        'success': True,
+        'enabled': cache is not None,
+        'stats': cache.stats() if cache is not None else None
+    }), 200
+
+@admin_bp.route('/api/admin/profiles', methods=['GET'])
+@jwt_required()
+def list_profiles():
+    # This worker's recent request profiles (see backend/services/profiler.py)
+    profiles = current_app.extensions.get('profiles', ())
+    return jsonify({
+        'success': True,
+        'enabled': bool(current_app.config.get('PROFILER_ENABLED')),
+        'profiles': [{key: value for key, value in profile.items() if key != 'stacks'} for profile in reversed(profiles)]
+    }), 200
+
+@admin_bp.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+def download_profile(profile_id):
+    profile = get_profile(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(profile['stacks'], mimetype='text/plain')
+
+@admin_bp.route('/api/admin/emails', methods=['GET'])
+@jwt_required()
+def get_email_outbox():
+    try:
+        status = request.args.get('status', '')
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        
+        query = select(EmailOutbox)
+        if status and status != 'All':
+            query = query.filter(EmailOutbox.status == status)
+        emails = db.session.scalars(
+            query.order_by(EmailOutbox.id.desc()).limit(limit),
+            bind_arguments=replica_bind_arguments()
+        ).all()
+        
+        counts = dict(read_connection().execute(
+            select(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status)
+        ).all())
+        
+        return jsonify({
+            'success': True,
+            'emails': [email.to_dict() for email in emails],
+            'counts': counts
+        }), 200
+        
+    except Exception as e:
+        current_app.logger.error(f"Error fetching email outbox: {str(e)}")
+        return jsonify({'error': 'Failed to fetch email outbox'}), 500
+
+@admin_bp.route('/api/admin/emails/<int:email_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_email(email_id):
+    try:
+        email = EmailOutbox.query.get(email_id)
+        if not email:
+            return jsonify({'error': 'Email not found'}), 404
+        if email.status != 'Failed':
+            return jsonify({'error': 'Only failed emails can be retried'}), 400
+        
+        email.status = 'Queued'
+        email.attempts = 0
+        email.next_attempt_at = datetime.utcnow()
+        db.session.commit()
+        notify_outbox()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Email queued for retry',
+            'email': email.to_dict()
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error retrying email: {str(e)}")
+        return jsonify({'error': 'Failed to retry email'}), 500
+
 @admin_bp.route('/api/admin/export/excel', methods=['GET'])
 @jwt_required()
 def export_excel():
     try:
-        users = User.query.order_by(User.token_number).all()
-        output = export_to_excel(users)
+        output = export_to_excel(read_connection())
         
         return send_file(
             output,
@@ -149,14 +371,17 @@ def export_excel():
 @jwt_required()
 def export_csv():
     try:
-        users = User.query.order_by(User.token_number).all()
-        output = export_to_csv(users)
+        filename = f'service_tokens_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         
-        return send_file(
-            output,
+        def generate():
+            # The connection is opened once streaming starts: the view's own session
+            # is closed as soon as it returns
+            yield from stream_csv(read_connection())
+        
+        return Response(
+            stream_with_context(generate()),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'service_tokens_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
     except Exception as e:
@@ -167,8 +392,7 @@ def export_csv():
 @jwt_required()
 def export_pdf():
     try:
-        users = User.query.order_by(User.token_number).all()
-        output = export_to_pdf(users)
+        output = export_to_pdf(read_connection())
         
         return send_file(
             output,
@@ -180,3 +404,64 @@ def export_pdf():
     except Exception as e:
         current_app.logger.error(f"Error exporting to PDF: {str(e)}")
         return jsonify({'error': 'Failed to export to PDF'}), 500
+
+@admin_bp.route('/api/admin/exports', methods=['POST'])
+@jwt_required()
+def create_export():
+    try:
+        data = request.json or {}
+        export_format = data.get('format')
+        
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'Format must be one of: {", ".join(EXPORT_FORMATS)}'}), 400
+        
+        job, cached = current_app.extensions['export_jobs'].submit(export_format)
+        
+        return jsonify({
+            'success': True,
+            'cached': cached,
+            'job': job.to_dict()
+        }), 200 if job.status == 'Completed' else 202
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error creating export: {str(e)}")
+        return jsonify({'error': 'Failed to create export'}), 500
+
+@admin_bp.route('/api/admin/exports/<job_id>', methods=['GET'])
+@jwt_required()
+def get_export(job_id):
+    job = db.session.get(ExportJob, job_id)
+    
+    if not job:
+        return jsonify({'error': 'Export not found'}), 404
+    
+    return jsonify({'job': job.to_dict()}), 200
+
+@admin_bp.route('/api/admin/exports/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_export(job_id):
+    try:
+        job = db.session.get(ExportJob, job_id)
+        
+        if not job:
+            return jsonify({'error': 'Export not found'}), 404
+        
+        if job.status == 'Expired':
+            return jsonify({'error': 'Export has expired, please export again'}), 410
+        
+        if job.status != 'Completed':
+            return jsonify({'error': f'Export is {job.status.lower()}'}), 409
+        
+        return send_file(
+            job.file_path,
+            mimetype=EXPORT_FORMATS[job.format]['mimetype'],
+            as_attachment=True,
+            download_name=job.filename
+        )
+        
+    except FileNotFoundError:
+        return jsonify({'error': 'Export has expired, please export again'}), 410
+    except Exception as e:
+        current_app.logger.error(f"Error downloading export: {str(e)}")
+        return jsonify({'error': 'Failed to download export'}), 500
@@ -1,6 +1,14 @@
-from flask import Blueprint, request, jsonify
-from backend.models import db, User, CompletedWork
-from backend.utils.email_service import send_confirmation_email
+from flask import Blueprint, request, jsonify, Response
+from backend.models import db
+from backend.services.email_outbox import notify_outbox
+from backend.services.scheduler_service import request_reminder_dispatch
+from backend.services.token_allocator import token_allocator
+from backend.services.submission_service import register_user, submission_response, validate_submission
+from backend.services.response_cache import invalidate_responses
+from backend.services.queue_estimator import queue_estimate
+from backend.services.token_index import index_tokens, token_status
+from backend.services.rate_limiter import rate_limited
+from backend.services.event_hub import TOKEN_CREATED, STREAM_PREAMBLE, KEEPALIVE, STREAM_HEADERS, publish_event, token_created_event
 from flask import current_app
 import traceback
 
@@ -9,65 +17,22 @@ user_bp = Blueprint('user', __name__)
 @user_bp.route('/api/submit', methods=['POST'])
 def submit_user():
     try:
-        data = request.json
+        fields, error = validate_submission(request.json)
+        if error:
+            return jsonify({'error': error}), 400
         
-        # Check if data exists
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-            
-        name = data.get('name')
-        email = data.get('email')
-        address = data.get('address')
-        contact_number = data.get('contact_number')
-        work_description = data.get('work_description')
+        new_token_number = token_allocator.allocate()
+        new_user = register_user(db.session, new_token_number, fields)
         
-        if not all([name, email, address, contact_number, work_description]):
-            return jsonify({'error': 'All fields are required'}), 400
-        
-        last_user = User.query.order_by(User.token_number.desc()).first()
-        new_token_number = (last_user.token_number + 1) if last_user else 1
-        
-        new_user = User(
-            token_number=new_token_number,
-            name=name,
-            email=email,
-            address=address,
-            contact_number=contact_number,
-            work_description=work_description,
-            status='Pending'
-        )
-        
-        db.session.add(new_user)
         db.session.commit()
+        notify_outbox()
+        invalidate_responses(current_app)
+        index_tokens(current_app, new_user.status, [new_user.token_number])
+        publish_event(current_app, TOKEN_CREATED, token_created_event(new_user))
+        # A token joining a short queue may already be within the reminder lead time
+        request_reminder_dispatch(current_app._get_current_object())
         
-        # Try to send confirmation email, but don't fail the request if it doesn't work
-        user_data = {
-            'token_number': new_token_number,
-            'name': name,
-            'email': email,
-            'contact_number': contact_number,
-            'address': address,
-            'work_description': work_description
-        }
-        
-        mail = current_app.extensions.get('mail')
-        if mail:
-            current_app.logger.info("Mail extension is available, attempting to send confirmation email")
-            email_sent = send_confirmation_email(mail, user_data)
-            if email_sent:
-                current_app.logger.info(f"Confirmation email sent successfully to {email}")
-            else:
-                current_app.logger.warning(f"Failed to send confirmation email to {email}")
-        else:
-            current_app.logger.warning("Mail extension not available, skipping email confirmation")
-            current_app.logger.info("Check if MAIL_USERNAME and MAIL_PASSWORD are set in environment variables")
-        
-        return jsonify({
-            'success': True,
-            'message': 'User registered successfully',
-            'token_number': new_token_number,
-            'user': new_user.to_dict()
-        }), 201
+        return jsonify(submission_response(new_user)), 201
         
     except Exception as e:
         db.session.rollback()
@@ -78,10 +43,58 @@ def submit_user():
 @user_bp.route('/api/next-token', methods=['GET'])
 def get_next_token():
     try:
-        last_user = User.query.order_by(User.token_number.desc()).first()
-        next_token = (last_user.token_number + 1) if last_user else 1
+        next_token = token_allocator.peek_next()
         return jsonify({'next_token': next_token}), 200
     except Exception as e:
         current_app.logger.error(f"Error getting next token: {str(e)}")
         current_app.logger.error(f"Traceback: {traceback.format_exc()}")
-        return jsonify({'error': 'Failed to get next token'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Failed to get next token'}), 500
+
+@user_bp.route('/api/token/<int:token_number>', methods=['GET'])
+@rate_limited('TOKEN_LOOKUP_RATE_LIMIT')
+def get_token_status(token_number):
+    # Public: a token's status and place in the queue, from the in-memory index
+    try:
+        status = token_status(token_number)
+        if status is None:
+            return jsonify({'error': 'Token not found'}), 404
+        return jsonify({'success': True, 'token': status}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error looking up token: {str(e)}")
+        current_app.logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({'error': 'Failed to look up token'}), 500
+
+@user_bp.route('/api/queue/<int:token_number>', methods=['GET'])
+def get_queue_estimate(token_number):
+    # Public: where a token is in the queue and roughly when it will be served
+    try:
+        estimate = queue_estimate(token_number)
+        if estimate is None:
+            return jsonify({'error': 'Token not found'}), 404
+        return jsonify({'success': True, 'queue': estimate}), 200
+    except Exception as e:
+        current_app.logger.error(f"Error estimating queue position: {str(e)}")
+        current_app.logger.error(f"Traceback: {traceback.format_exc()}")
+        return jsonify({'error': 'Failed to estimate queue position'}), 500
+
+@user_bp.route('/api/events', methods=['GET'])
+def stream_events():
+    # Server-Sent Events. Each subscriber holds a worker thread here, so this is only
+    # served by threaded workers; backend.asgi serves it with a coroutine instead.
+    if not current_app.config.get('EVENTS_STREAMING', True):
+        return jsonify({'error': 'Live updates are not available from this server'}), 503
+    subscription = current_app.extensions['event_hub'].subscribe()
+    if subscription is None:
+        return jsonify({'error': 'Too many subscribers, try again later'}), 503
+    keepalive = current_app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
+    
+    def stream():
+        try:
+            yield STREAM_PREAMBLE
+            while not subscription.closed:
+                events = subscription.wait(keepalive)
+                yield b''.join(events) if events else KEEPALIVE
+        finally:
+            subscription.close()
+    
+    return Response(stream(), mimetype='text/event-stream', headers=STREAM_HEADERS)
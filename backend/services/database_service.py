@@ -0,0 +1,80 @@
+from sqlalchemy import create_engine, event
+from ..models import db
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Engine setup shared by every worker: per-connection SQLite pragmas, and routing of
+# read-only admin queries to the optional read replica (the 'replica' bind). Replica
+# reads can lag the primary slightly, so anything that is read and then written, or
+# must see a write from the same request, stays on the primary.
+
+REPLICA_BIND = 'replica'
+# Async drivers for the ASGI handlers (backend/asgi.py), by database backend
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+def init_engines(app):
+    # Must run before the first connection is opened, so every pooled connection gets
+    # the pragmas
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite' and pragmas:
+                configure_sqlite(engine, pragmas)
+        if REPLICA_BIND in db.engines:
+            logger.info(f"Read-only admin queries use the replica at {db.engines[REPLICA_BIND].url!r}")
+
+
+def create_async_database_engine(app):
+    # An AsyncEngine on the same database as db.engine (whose URL Flask-SQLAlchemy has
+    # already resolved, e.g. relative SQLite paths into the instance folder), with the
+    # same pool options and pragmas
+    from sqlalchemy.ext.asyncio import create_async_engine
+    with app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend} databases")
+    engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS[backend]),
+                                 **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if backend == 'sqlite' and pragmas:
+        configure_sqlite(engine.sync_engine, pragmas)
+    return engine
+
+
+def create_worker_engine(database_uri, pragmas=None):
+    # An engine of its own for a pool process, which cannot use the app's, with the
+    # same pragmas on every connection it opens
+    engine = create_engine(database_uri)
+    if engine.dialect.name == 'sqlite' and pragmas:
+        configure_sqlite(engine, pragmas)
+    return engine
+
+
+def configure_sqlite(engine, pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        set_sqlite_pragmas(dbapi_connection, pragmas)
+
+    event.listen(engine, 'connect', on_connect)
+
+
+def set_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def replica_bind_arguments():
+    engine = db.engines.get(REPLICA_BIND)
+    return {'bind': engine} if engine is not None else None
+
+
+def read_connection():
+    # Connection for read-only queries: the replica when one is configured, otherwise
+    # the session's own connection to the primary
+    return db.session.connection(bind_arguments=replica_bind_arguments())
@@ -0,0 +1,204 @@
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, func, or_, and_
+from ..models import db, EmailOutbox
+from ..utils.email_service import build_confirmation_email, build_reminder_email
+from .metrics import EMAILS
+import json
+import logging
+import threading
+import traceback
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_BUILDERS = {
+    'confirmation': build_confirmation_email,
+    'reminder': build_reminder_email,
+}
+
+
+def enqueue_email(kind, user_data, user_id=None, session=None):
+    # Adds the email to the caller's session (db.session by default) so it is
+    # committed (or rolled back) together with the change that triggered it
+    entry = EmailOutbox(
+        kind=kind,
+        recipient=user_data['email'],
+        payload=json.dumps(user_data),
+        user_id=user_id
+    )
+    (session or db.session).add(entry)
+    return entry
+
+
+def notify_outbox(app=None):
+    app = app or current_app._get_current_object()
+    dispatcher = app.extensions.get('email_outbox')
+    if dispatcher:
+        dispatcher.notify()
+
+
+class OutboxDispatcher:
+    def __init__(self, app, mail):
+        self.app = app
+        self.mail = mail
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', 50)
+        self.max_attempts = app.config.get('OUTBOX_MAX_ATTEMPTS', 5)
+        self.retry_base = app.config.get('OUTBOX_RETRY_BASE_SECONDS', 30)
+        self.lock_timeout = app.config.get('OUTBOX_LOCK_TIMEOUT_SECONDS', 300)
+        self.workers = max(1, app.config.get('OUTBOX_WORKERS', 2))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='outbox')
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        app.extensions['email_outbox'] = self
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+        self._thread.start()
+        # Pick up anything left queued by a previous run
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def notify(self):
+        self._wake.set()
+
+    def _run(self):
+        timeout = None
+        while not self._stop.is_set():
+            # Sleeps until notified or until the next retry is due; no polling while idle
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                timeout = self.drain()
+            except Exception as e:
+                logger.error(f"Error draining email outbox: {str(e)}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                timeout = self.retry_base
+
+    def drain(self):
+        # Sends everything that is due and returns the seconds until the next retry,
+        # or None when nothing is waiting
+        with self.app.app_context():
+            while True:
+                entry_ids = self._claim_batch()
+                if not entry_ids:
+                    break
+                # One chunk per worker so each chunk goes out over a single SMTP connection
+                chunks = [entry_ids[i::self.workers] for i in range(self.workers)]
+                wait([self._pool.submit(self._deliver, chunk) for chunk in chunks if chunk])
+            return self._seconds_until_next_attempt()
+
+    def _due_condition(self, now):
+        stale = now - timedelta(seconds=self.lock_timeout)
+        return or_(
+            and_(EmailOutbox.status == 'Queued', EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == 'Sending', EmailOutbox.locked_at < stale)
+        )
+
+    def _claim_batch(self):
+        now = datetime.utcnow()
+        candidates = db.session.execute(
+            select(EmailOutbox.id)
+            .where(self._due_condition(now))
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+        ).scalars().all()
+
+        claimed = []
+        for entry_id in candidates:
+            # Conditional update so two workers (or processes) never claim the same row
+            result = db.session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == entry_id, self._due_condition(now))
+                .values(status='Sending', locked_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                claimed.append(entry_id)
+        db.session.commit()
+        return claimed
+
+    def _deliver(self, entry_ids):
+        with self.app.app_context():
+            entries = EmailOutbox.query.filter(EmailOutbox.id.in_(entry_ids)).order_by(EmailOutbox.id).all()
+            messages = []
+            for entry in entries:
+                entry.attempts += 1
+                try:
+                    messages.append(MESSAGE_BUILDERS[entry.kind](json.loads(entry.payload)))
+                except Exception as e:
+                    messages.append(e)
+
+            to_send = [msg for msg in messages if not isinstance(msg, Exception)]
+            send_errors = iter(self._send_bulk(to_send))
+            now = datetime.utcnow()
+            for entry, msg in zip(entries, messages):
+                error = msg if isinstance(msg, Exception) else next(send_errors)
+                if error is None:
+                    entry.status = 'Sent'
+                    entry.sent_at = now
+                    entry.last_error = None
+                    EMAILS.inc(kind=entry.kind, result='sent')
+                    logger.info(f"Sent {entry.kind} email to {entry.recipient}")
+                elif entry.attempts >= self.max_attempts:
+                    entry.status = 'Failed'
+                    entry.last_error = str(error)
+                    EMAILS.inc(kind=entry.kind, result='failed')
+                    logger.error(f"Giving up on {entry.kind} email to {entry.recipient} after {entry.attempts} attempts: {str(error)}")
+                else:
+                    delay = min(self.retry_base * 2 ** (entry.attempts - 1), 3600)
+                    entry.status = 'Queued'
+                    entry.last_error = str(error)
+                    entry.next_attempt_at = now + timedelta(seconds=delay)
+                    EMAILS.inc(kind=entry.kind, result='retry')
+                    logger.warning(f"Failed to send {entry.kind} email to {entry.recipient}, retrying in {delay}s: {str(error)}")
+                entry.locked_at = None
+            db.session.commit()
+
+    def _send_bulk(self, messages):
+        if not messages:
+            return []
+        transport = self.app.extensions.get('mail_transport')
+        if transport is not None:
+            return transport.send_bulk(messages)
+        errors = []
+        with self.mail.connect() as conn:
+            for msg in messages:
+                try:
+                    conn.send(msg)
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(e)
+        return errors
+
+    def _seconds_until_next_attempt(self):
+        next_attempt = db.session.execute(
+            select(func.min(EmailOutbox.next_attempt_at)).where(EmailOutbox.status == 'Queued')
+        ).scalar()
+        if next_attempt is None:
+            return None
+        return max((next_attempt - datetime.utcnow()).total_seconds(), 0)
+
+
+def start_outbox_dispatcher(app, mail):
+    try:
+        dispatcher = OutboxDispatcher(app, mail)
+        dispatcher.start()
+        logger.info("Email outbox dispatcher started successfully")
+        return dispatcher
+    except Exception as e:
+        logger.error(f"Error starting email outbox dispatcher: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+        return None
@@ -0,0 +1,257 @@
+from collections import defaultdict, deque
+from sqlalchemy import select, func
+from ..models import db, User
+import asyncio
+import json
+import logging
+import threading
+import traceback
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Live queue updates for /api/events (Server-Sent Events). The write paths publish
+# token-created, status-changed and now-serving events after they commit; the hub
+# encodes each event once and appends it to every subscriber's buffer. A subscriber
+# that falls EVENTS_BUFFER_SIZE events behind loses the oldest ones and is sent a
+# resync event, telling the client to refetch instead of trusting the stream.
+#
+# Subscribers are either threads (the Flask route) or coroutines (backend/asgi.py);
+# coroutines are woken with one call_soon_threadsafe per event loop, not one per
+# subscriber. The hub only reaches this process's subscribers. With
+# EVENTS_REDIS_URL (needs the redis package) events are also relayed through Redis
+# pub/sub, so every worker's subscribers see every worker's writes.
+
+TOKEN_CREATED = 'token-created'
+STATUS_CHANGED = 'status-changed'
+NOW_SERVING = 'now-serving'
+RESYNC = 'resync'
+
+# Sent when a stream opens (the client's reconnect delay) and when it has been idle,
+# so proxies do not time the connection out
+STREAM_PREAMBLE = b'retry: 3000\n\n'
+KEEPALIVE = b': keepalive\n\n'
+# Nginx and similar proxies must not buffer the stream
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def encode_event(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, hub, buffer_size, loop=None):
+        self.hub = hub
+        self.buffer_size = buffer_size
+        self.loop = loop
+        self.events = deque()
+        self.dropped = 0
+        self.closed = False
+        self.ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def push(self, event):
+        # Called with the hub lock held
+        if len(self.events) >= self.buffer_size:
+            self.events.popleft()
+            self.dropped += 1
+        self.events.append(event)
+
+    def drain(self):
+        # Everything buffered so far, with a resync event first if some was dropped
+        with self.hub.lock:
+            events = list(self.events)
+            self.events.clear()
+            self.ready.clear()
+            if self.dropped:
+                events.insert(0, encode_event(RESYNC, {'dropped': self.dropped}))
+                self.dropped = 0
+        return events
+
+    def wait(self, timeout):
+        # Thread subscribers: blocks until an event arrives or the timeout passes
+        self.ready.wait(timeout)
+        return self.drain()
+
+    async def wait_async(self, timeout):
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.drain()
+
+    def close(self):
+        self.closed = True
+        self.hub.unsubscribe(self)
+        if self.loop is None:
+            self.ready.set()
+
+
+class EventHub:
+    def __init__(self, buffer_size=100, max_subscribers=5000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.lock = threading.Lock()
+        self._threads = set()
+        self._coroutines = defaultdict(set)
+        self.backend = None
+        self.published = 0
+
+    @property
+    def subscriber_count(self):
+        return len(self._threads) + sum(len(subscriptions) for subscriptions in self._coroutines.values())
+
+    def subscribe(self, loop=None):
+        # Returns None when the process already has max_subscribers
+        with self.lock:
+            if self.subscriber_count >= self.max_subscribers:
+                return None
+            subscription = Subscription(self, self.buffer_size, loop)
+            if loop is None:
+                self._threads.add(subscription)
+            else:
+                self._coroutines[loop].add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            if subscription.loop is None:
+                self._threads.discard(subscription)
+            else:
+                subscriptions = self._coroutines.get(subscription.loop)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._coroutines[subscription.loop]
+
+    def publish(self, event_type, data):
+        self.dispatch(event_type, data)
+        if self.backend is not None:
+            self.backend.publish(event_type, data)
+
+    def dispatch(self, event_type, data):
+        # Delivers to this process's subscribers only
+        event = encode_event(event_type, data)
+        with self.lock:
+            self.published += 1
+            for subscription in self._threads:
+                subscription.push(event)
+                subscription.ready.set()
+            wake = []
+            for loop, subscriptions in self._coroutines.items():
+                for subscription in subscriptions:
+                    subscription.push(event)
+                wake.append((loop, list(subscriptions)))
+        for loop, subscriptions in wake:
+            try:
+                loop.call_soon_threadsafe(_set_ready, subscriptions)
+            except RuntimeError:
+                # The loop has been closed; its subscribers are gone
+                pass
+
+
+def _set_ready(subscriptions):
+    for subscription in subscriptions:
+        subscription.ready.set()
+
+
+class RedisEventBackend:
+    # Relays events between processes through a Redis pub/sub channel. Each process
+    # delivers its own events locally and skips them when they come back.
+
+    def __init__(self, hub, url, channel='service-token-events'):
+        import redis
+        self.hub = hub
+        self.client = redis.Redis.from_url(url)
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._pubsub = None
+        self._thread = None
+
+    def publish(self, event_type, data):
+        self.client.publish(self.channel, json.dumps({'origin': self.origin, 'type': event_type, 'data': data}))
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: self.handle})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_error)
+        self._thread.name = 'event-relay'
+
+    def stop(self):
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def _on_error(self, error, pubsub, thread):
+        logger.error(f"Event relay error: {str(error)}")
+
+    def handle(self, message):
+        event = json.loads(message['data'])
+        if event['origin'] != self.origin:
+            self.hub.dispatch(event['type'], event['data'])
+
+
+def init_event_hub(app):
+    hub = EventHub(app.config.get('EVENTS_BUFFER_SIZE', 100), app.config.get('EVENTS_MAX_SUBSCRIBERS', 5000))
+    redis_url = app.config.get('EVENTS_REDIS_URL')
+    if redis_url:
+        try:
+            hub.backend = RedisEventBackend(hub, redis_url)
+        except ImportError:
+            logger.warning("redis is not installed, events only reach this worker's subscribers")
+    app.extensions['event_hub'] = hub
+    return hub
+
+
+def start_event_relay(app):
+    hub = app.extensions.get('event_hub')
+    if hub is not None and hub.backend is not None:
+        try:
+            hub.backend.start()
+        except Exception as e:
+            logger.error(f"Error starting event relay: {str(e)}")
+
+
+def stop_event_relay(app):
+    hub = app.extensions.get('event_hub')
+    if hub is not None and hub.backend is not None:
+        hub.backend.stop()
+
+
+def publish_event(app, event_type, data):
+    # Call after the write has committed; a failure never fails the request
+    hub = app.extensions.get('event_hub')
+    if hub is None:
+        return
+    try:
+        hub.publish(event_type, data)
+    except Exception as e:
+        logger.error(f"Error publishing {event_type} event: {str(e)}")
+        logger.error(f"Traceback: {traceback.format_exc()}")
+
+
+def token_created_event(user):
+    return {'id': user.id, 'token_number': user.token_number, 'status': user.status}
+
+
+def now_serving(session=None):
+    # The lowest Pending token, served by the (status, token_number) index
+    session = session or db.session
+    return session.execute(select(func.min(User.token_number)).where(User.status == 'Pending')).scalar()
+
+
+def publish_status_change(app, old_status, new_status, users, session=None):
+    # users: (id, token_number) rows that moved from old_status to new_status
+    hub = app.extensions.get('event_hub')
+    if not users or hub is None or not (hub.subscriber_count or hub.backend):
+        return
+    publish_event(app, STATUS_CHANGED, {
+        'status': new_status,
+        'old_status': old_status,
+        'users': [{'id': user_id, 'token_number': token_number} for user_id, token_number in users]
+    })
+    publish_event(app, NOW_SERVING, {'token_number': now_serving(session)})
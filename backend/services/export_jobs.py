@@ -0,0 +1,214 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+from ..models import db, User, ExportJob
+from ..utils.export_service import stream_csv, export_to_excel, export_to_pdf, export_to_pdf_parallel
+from .database_service import create_worker_engine
+from .metrics import EXPORT_DURATION
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Exports are built in a process pool, off the web workers, and written to files that
+# the download endpoint serves. A finished export is reused for as long as the users
+# table is unchanged: the cache key is the format plus the row count and the latest
+# updated_at.
+
+EXPORT_FORMATS = {
+    'csv': {'extension': 'csv', 'mimetype': 'text/csv'},
+    'excel': {'extension': 'xlsx', 'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+    'pdf': {'extension': 'pdf', 'mimetype': 'application/pdf'},
+}
+ACTIVE_STATUSES = ('Queued', 'Running', 'Completed')
+
+
+def export_cache_key(export_format, session=None):
+    session = session or db.session
+    count, last_updated = session.execute(select(func.count(User.id), func.max(User.updated_at))).one()
+    return f"{export_format}:{count}:{last_updated.isoformat() if last_updated else ''}"
+
+
+def write_export(session, export_format, output, database_uri=None, pdf_workers=1, sqlite_pragmas=None):
+    if export_format == 'csv':
+        for chunk in stream_csv(session):
+            output.write(chunk.encode('utf-8'))
+    elif export_format == 'excel':
+        export_to_excel(session, output=output)
+    elif export_format == 'pdf' and pdf_workers > 1 and database_uri:
+        export_to_pdf_parallel(database_uri, output, pdf_workers, sqlite_pragmas)
+    elif export_format == 'pdf':
+        export_to_pdf(session, output=output)
+    else:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+
+def build_export(database_uri, job_id, pdf_workers=1, sqlite_pragmas=None):
+    # Runs in a pool process, so it uses its own engine rather than the app's
+    engine = create_worker_engine(database_uri, sqlite_pragmas)
+    try:
+        with Session(engine) as session:
+            job = session.get(ExportJob, job_id)
+            job.status = 'Running'
+            session.commit()
+
+            partial_path = f"{job.file_path}.part"
+            try:
+                with open(partial_path, 'wb') as output:
+                    write_export(session, job.format, output, database_uri, pdf_workers, sqlite_pragmas)
+                os.replace(partial_path, job.file_path)
+            except Exception as e:
+                session.rollback()
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                job.status = 'Failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                session.commit()
+                raise
+
+            job.status = 'Completed'
+            job.size = os.path.getsize(job.file_path)
+            job.finished_at = datetime.utcnow()
+            session.commit()
+            return job.size
+    finally:
+        engine.dispose()
+
+
+class ExportJobManager:
+    # Per-process front end of the export pool. The pool is created on first use and
+    # spawns fresh interpreters, so workers never inherit the scheduler and outbox
+    # threads of the web process.
+
+    def __init__(self, app):
+        self.app = app
+        self.directory = os.path.abspath(app.config.get('EXPORT_DIR') or os.path.join(app.instance_path, 'exports'))
+        self.max_workers = app.config.get('EXPORT_WORKERS', 1)
+        self._executor = None
+        self._lock = threading.Lock()
+        app.extensions['export_jobs'] = self
+
+    def submit(self, export_format):
+        # Returns (job, cached); a matching finished or in-flight job is reused
+        cache_key = export_cache_key(export_format)
+        stale_before = datetime.utcnow() - timedelta(seconds=self.app.config.get('EXPORT_JOB_TIMEOUT_SECONDS', 1800))
+        existing = ExportJob.query.filter(
+            ExportJob.cache_key == cache_key,
+            ExportJob.status.in_(ACTIVE_STATUSES),
+            (ExportJob.status == 'Completed') | (ExportJob.created_at >= stale_before)
+        ).order_by(ExportJob.created_at.desc()).first()
+        if existing and (existing.status != 'Completed' or os.path.exists(existing.file_path)):
+            return existing, True
+
+        os.makedirs(self.directory, exist_ok=True)
+        job_id = uuid.uuid4().hex
+        extension = EXPORT_FORMATS[export_format]['extension']
+        job = ExportJob(
+            id=job_id,
+            format=export_format,
+            status='Queued',
+            cache_key=cache_key,
+            filename=f'service_tokens_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}',
+            file_path=os.path.join(self.directory, f'{job_id}.{extension}')
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        database_uri = db.engine.url.render_as_string(hide_password=False)
+        started = time.perf_counter()
+        future = self._pool().submit(build_export, database_uri, job_id, self.app.config.get('PDF_EXPORT_WORKERS', 1),
+                                     self.app.config.get('SQLITE_PRAGMAS'))
+        future.add_done_callback(lambda done: self._finished(job_id, done, export_format, started))
+        return job, False
+
+    def stop(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _finished(self, job_id, future, export_format, started):
+        with self.app.app_context():
+            try:
+                error = future.exception() if not future.cancelled() else 'Cancelled'
+                EXPORT_DURATION.observe(time.perf_counter() - started, format=export_format,
+                                        status='Completed' if error is None else 'Failed')
+                if error is not None:
+                    logger.error(f"Export {job_id} failed: {error}")
+                    # The worker records its own failures; this covers a pool that died
+                    db.session.execute(
+                        update(ExportJob)
+                        .where(ExportJob.id == job_id, ExportJob.status.in_(('Queued', 'Running')))
+                        .values(status='Failed', error=str(error), finished_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+                    db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Error recording export {job_id}: {str(e)}")
+            finally:
+                db.session.remove()
+        evict_exports(self.app)
+
+
+def evict_exports(app):
+    # Expires finished exports past the age limit, then the oldest ones beyond the
+    # total size limit, and fails jobs whose worker never reported back
+    with app.app_context():
+        try:
+            now = datetime.utcnow()
+            max_age = timedelta(minutes=app.config.get('EXPORT_MAX_AGE_MINUTES', 1440))
+            max_bytes = app.config.get('EXPORT_MAX_TOTAL_MB', 500) * 1024 * 1024
+            timeout = timedelta(seconds=app.config.get('EXPORT_JOB_TIMEOUT_SECONDS', 1800))
+
+            db.session.execute(
+                update(ExportJob)
+                .where(ExportJob.status.in_(('Queued', 'Running')), ExportJob.created_at < now - timeout)
+                .values(status='Failed', error='Timed out', finished_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+            total = 0
+            expired = []
+            completed = ExportJob.query.filter_by(status='Completed').order_by(ExportJob.finished_at.desc()).all()
+            for job in completed:
+                total += job.size or 0
+                if job.finished_at < now - max_age or total > max_bytes:
+                    job.status = 'Expired'
+                    expired.append(job.file_path)
+            db.session.commit()
+
+            for path in expired:
+                if os.path.exists(path):
+                    os.remove(path)
+            if expired:
+                logger.info(f"Evicted {len(expired)} export files")
+            return len(expired)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error evicting exports: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return 0
+        finally:
+            db.session.remove()
+
+
+def init_export_jobs(app):
+    return ExportJobManager(app)
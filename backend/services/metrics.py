@@ -0,0 +1,299 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from flask import Response, current_app, g, request
+from flask_jwt_extended import verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import hmac
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Process-wide metrics in the Prometheus text format, served on /metrics:
+# - per-route request latency, and the queries and database time each request
+#   spent (from SQLAlchemy cursor events), so N+1 patterns show up as a route whose
+#   query count grows with the data
+# - emails sent, retried and failed, scheduler job runtimes and export durations
+#
+# Every worker process keeps its own values, as prometheus_client does without its
+# multiprocess mode: scrape each worker (or run one worker per container) rather
+# than a load-balanced address. Requests that run more than
+# METRICS_QUERY_WARN_THRESHOLD queries are also logged.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+EXPORT_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 900, 1800)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (plus +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+
+    def count(self, **labels):
+        entry = self._values.get(tuple(labels[name] for name in self.labelnames))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds', 'Time to build the response, by route.',
+    ('method', 'route', 'status'))
+REQUEST_QUERIES = REGISTRY.histogram(
+    'http_request_db_queries', 'Database queries run per request, by route.',
+    ('method', 'route'), QUERY_COUNT_BUCKETS)
+REQUEST_DB_TIME = REGISTRY.histogram(
+    'http_request_db_seconds', 'Time spent in database queries per request, by route.',
+    ('method', 'route'))
+DB_QUERIES = REGISTRY.counter(
+    'db_queries', 'Database queries, in requests or in background work.', ('context',))
+DB_TIME = REGISTRY.counter(
+    'db_query_seconds', 'Time spent in database queries, in requests or in background work.', ('context',))
+EMAILS = REGISTRY.counter(
+    'emails', 'Outbox delivery attempts by kind and result (sent, retry or failed).', ('kind', 'result'))
+SCHEDULER_JOB_DURATION = REGISTRY.histogram(
+    'scheduler_job_duration_seconds', 'Scheduler job runtimes.', ('job',), JOB_BUCKETS)
+SCHEDULER_JOB_FAILURES = REGISTRY.counter(
+    'scheduler_job_failures', 'Scheduler jobs that raised.', ('job',))
+EXPORT_DURATION = REGISTRY.histogram(
+    'export_duration_seconds', 'Background exports from submission to finish, by format and status.',
+    ('format', 'status'), EXPORT_BUCKETS)
+
+
+class QueryStats:
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# The queries of the request (Flask or native ASGI) running in this context, if any
+_request_queries = ContextVar('request_queries', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    elapsed = time.perf_counter() - started
+    stats = _request_queries.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+    context_label = 'request' if stats is not None else 'background'
+    DB_QUERIES.inc(context=context_label)
+    DB_TIME.inc(elapsed, context=context_label)
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_started'):
+        connection.info['query_started'].pop()
+
+
+_listening = False
+_listening_lock = threading.Lock()
+
+
+def instrument_queries():
+    # On the Engine class, so every engine (primary, replica and the async engine's
+    # sync side) is counted
+    global _listening
+    with _listening_lock:
+        if _listening:
+            return
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listening = True
+
+
+class RequestMetrics:
+    # Times one request and counts its queries; used by the Flask hooks below and by
+    # the native ASGI routes
+
+    def __init__(self, method, route):
+        self.method = method
+        self.route = route
+        self.stats = QueryStats()
+        self.started = time.perf_counter()
+        self._token = _request_queries.set(self.stats)
+
+    def finish(self, status, warn_threshold=None):
+        elapsed = time.perf_counter() - self.started
+        try:
+            _request_queries.reset(self._token)
+        except ValueError:
+            # Finished from another context than it started in
+            _request_queries.set(None)
+        REQUEST_DURATION.observe(elapsed, method=self.method, route=self.route, status=str(status))
+        REQUEST_QUERIES.observe(self.stats.queries, method=self.method, route=self.route)
+        REQUEST_DB_TIME.observe(self.stats.seconds, method=self.method, route=self.route)
+        if warn_threshold and self.stats.queries > warn_threshold:
+            logger.warning(f"{self.method} {self.route} ran {self.stats.queries} queries "
+                           f"({self.stats.seconds * 1000:.1f} ms)")
+        return elapsed
+
+
+def init_metrics(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    instrument_queries()
+
+    @app.before_request
+    def start_request_metrics():
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.request_metrics = RequestMetrics(request.method, route)
+
+    @app.after_request
+    def record_request_metrics(response):
+        metrics = g.pop('request_metrics', None)
+        if metrics is not None:
+            metrics.finish(response.status_code, app.config.get('METRICS_QUERY_WARN_THRESHOLD'))
+        return response
+
+    @app.teardown_request
+    def discard_request_metrics(error=None):
+        # after_request is skipped when a view raises past the error handlers
+        metrics = g.pop('request_metrics', None)
+        if metrics is not None:
+            metrics.finish(500)
+
+
+def monitoring_authorized():
+    # /metrics and request profiling are never public: the request must carry
+    # METRICS_TOKEN as a bearer token (when one is set) or an admin JWT
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    try:
+        return verify_jwt_in_request(optional=True) is not None
+    except Exception:
+        return False
+
+
+def metrics_response():
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return {'error': 'Metrics are disabled'}, 404
+    if not monitoring_authorized():
+        return {'error': 'Unauthorized'}, 401
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def timed_job(job):
+    # Records a scheduler job's runtime, and a failure if it raises
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                SCHEDULER_JOB_FAILURES.inc(job=job)
+                raise
+            finally:
+                SCHEDULER_JOB_DURATION.observe(time.perf_counter() - started, job=job)
+        return wrapper
+    return decorator
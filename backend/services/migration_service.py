@@ -0,0 +1,59 @@
+from flask import current_app
+from flask.cli import ScriptInfo
+from sqlalchemy import inspect
+from ..models import db
+import click
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+# Schema of databases created by db.create_all() before migrations existed (users
+# and completed_works); the revisions after it add every later table if missing
+BASELINE_REVISION = '0001'
+
+
+class MigrationCommands(click.Group):
+    # `flask db`: Flask-Migrate's command group, loaded on first use so alembic (and
+    # the mako and pygments it pulls in) is never imported by the web workers
+
+    def _commands(self, ctx):
+        load_migrations(ctx.ensure_object(ScriptInfo).load_app())
+        from flask_migrate.cli import db as commands
+        return commands
+
+    def parse_args(self, ctx, args):
+        # Take over the real group's options (--directory, --x-arg) and callback
+        # before they are parsed
+        commands = self._commands(ctx)
+        self.params, self.callback = commands.params, commands.callback
+        return super().parse_args(ctx, args)
+
+    def list_commands(self, ctx):
+        return self._commands(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands(ctx).get_command(ctx, name)
+
+
+def init_migrations(app):
+    app.cli.add_command(MigrationCommands('db', help='Perform database migrations.'))
+
+
+def load_migrations(app):
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=MIGRATIONS_DIRECTORY, render_as_batch=True)
+
+
+def upgrade_database():
+    # Brings the schema up to date. Databases from before migrations existed are
+    # stamped with the baseline first, so only the later revisions run on them.
+    from flask_migrate import stamp, upgrade
+    load_migrations(current_app)
+    tables = inspect(db.engine).get_table_names()
+    if 'users' in tables and 'alembic_version' not in tables:
+        logger.info(f"Existing database without migration history, stamping revision {BASELINE_REVISION}")
+        stamp(directory=MIGRATIONS_DIRECTORY, revision=BASELINE_REVISION)
+    upgrade(directory=MIGRATIONS_DIRECTORY)
@@ -0,0 +1,106 @@
+from collections import Counter, deque
+from flask import current_app, g, request
+import os
+import sys
+import threading
+import time
+import uuid
+from .metrics import monitoring_authorized
+
+# Sampling profiler for individual requests, for chasing a slow hot path in a
+# running worker. With PROFILER_ENABLED, a request sent with an "X-Profile: 1" header
+# has its thread's stack sampled every PROFILER_INTERVAL_MS by a helper thread; the
+# response carries an X-Profile-Id, and /api/admin/profiles/<id> returns the samples
+# as collapsed stacks (one "frame;frame;frame count" line per distinct stack), which
+# flamegraph.pl and speedscope read directly. Only requests authorized like /metrics
+# (METRICS_TOKEN or an admin JWT) are profiled; others, and requests without the
+# header, are not affected. The last PROFILER_KEEP profiles are kept per worker.
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, thread_id, interval_seconds=0.001):
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stopping.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def init_profiler(app):
+    profiles = deque(maxlen=app.config.get('PROFILER_KEEP', 20))
+    app.extensions['profiles'] = profiles
+
+    @app.before_request
+    def start_profiler():
+        if not app.config.get('PROFILER_ENABLED') or request.headers.get(PROFILE_HEADER) != '1':
+            return
+        if not monitoring_authorized():
+            return
+        profiler = SamplingProfiler(threading.get_ident(), app.config.get('PROFILER_INTERVAL_MS', 1) / 1000)
+        profiler.start()
+        g.profiler = profiler
+
+    @app.after_request
+    def stop_profiler(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        profile_id = uuid.uuid4().hex[:12]
+        profiles.append({
+            'id': profile_id,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(profiler.elapsed * 1000, 2),
+            'samples': profiler.samples,
+            'stacks': profiler.collapsed()
+        })
+        response.headers[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    @app.teardown_request
+    def discard_profiler(error=None):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+
+
+def get_profile(profile_id):
+    for profile in current_app.extensions.get('profiles', ()):
+        if profile['id'] == profile_id:
+            return profile
+    return None
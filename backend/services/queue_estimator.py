@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from ..models import db, User, ServiceTimeStats
+
+# Queue position and ETA for pending tokens. The service time is an exponentially
+# weighted mean over roughly the last SERVICE_TIME_WINDOW completions, kept in one
+# service_time_stats row and updated in the same transaction as every move to
+# Completed, so reading it never scans users. setup_database creates the row with
+# SERVICE_TIME_MINUTES, which stands until there are completions.
+#
+# A completion's duration runs from when its service could start (the later of its
+# created_at and the previous completion) to its updated_at; a batch completed in
+# one request shares that interval equally. Durations longer than
+# SERVICE_TIME_MAX_MINUTES are idle time (closed, breaks), not service, and skipped.
+
+STATS_ID = 1
+
+
+def _default_seconds():
+    return current_app.config.get('SERVICE_TIME_MINUTES', 15) * 60
+
+
+def init_service_time_stats():
+    # Creates the stats row up front, like the token sequence and the status
+    # counters, so concurrent first completions never race to insert it
+    try:
+        if db.session.get(ServiceTimeStats, STATS_ID) is None:
+            db.session.add(ServiceTimeStats(id=STATS_ID, mean_seconds=_default_seconds(), samples=0))
+            db.session.commit()
+    except IntegrityError:
+        # Another worker created the row at the same time
+        db.session.rollback()
+
+
+def record_completions(created_ats, completed_at, session=None):
+    # Call in the transaction that completes these users, after its first write, so
+    # the stats row read here is current
+    if not created_ats:
+        return
+    session = session or db.session
+    config = current_app.config
+    stats = session.execute(select(ServiceTimeStats).with_for_update()).scalar()
+    if stats is None:
+        # The database was not set up with setup_database; keep the default
+        return
+
+    started = min(created_ats)
+    if stats.last_completed_at is not None and stats.last_completed_at > started:
+        started = stats.last_completed_at
+    count = len(created_ats)
+    duration = (completed_at - started).total_seconds() / count
+
+    if 0 <= duration <= config.get('SERVICE_TIME_MAX_MINUTES', 120) * 60:
+        # count updates of the weighted mean with the same duration, in one step
+        alpha = 2 / (config.get('SERVICE_TIME_WINDOW', 20) + 1)
+        stats.mean_seconds = duration + (stats.mean_seconds - duration) * (1 - alpha) ** count
+        stats.samples += count
+    if stats.last_completed_at is None or completed_at > stats.last_completed_at:
+        stats.last_completed_at = completed_at
+
+
+def service_time_seconds(session=None):
+    session = session or db.session
+    mean_seconds = session.execute(select(ServiceTimeStats.mean_seconds)).scalar()
+    return mean_seconds if mean_seconds is not None else _default_seconds()
+
+
+def tokens_ahead(token_number, session=None):
+    # Pending tokens before this one, counted on the (status, token_number) index
+    session = session or db.session
+    return session.execute(
+        select(func.count()).select_from(User)
+        .where(User.status == 'Pending', User.token_number < token_number)
+    ).scalar()
+
+
+def reminder_positions(session=None):
+    # How many tokens at the front of the queue are within REMINDER_LEAD_MINUTES of
+    # their service: a token is due once the ones ahead of it fit in the lead time
+    lead_seconds = current_app.config.get('REMINDER_LEAD_MINUTES', 15) * 60
+    return int(lead_seconds // max(service_time_seconds(session), 1)) + 1
+
+
+def build_estimate(token_number, status, ahead, service_seconds):
+    # The estimate both /api/queue and /api/token return; ahead is None unless the
+    # token is Pending. The token at position 1 is next (or being served), with an
+    # ETA of 0.
+    estimate = {
+        'token_number': token_number,
+        'status': status,
+        'position': None,
+        'ahead': ahead,
+        'eta_minutes': None,
+        'estimated_start': None,
+        'service_time_minutes': round(service_seconds / 60, 1)
+    }
+    if ahead is not None:
+        wait_seconds = ahead * service_seconds
+        estimate.update({
+            'position': ahead + 1,
+            'eta_minutes': round(wait_seconds / 60),
+            'estimated_start': (datetime.utcnow() + timedelta(seconds=wait_seconds)).isoformat()
+        })
+    return estimate
+
+
+def queue_estimate(token_number, session=None):
+    # None for an unknown token; read from the database, so always current
+    session = session or db.session
+    user = session.execute(
+        select(User.token_number, User.status).where(User.token_number == token_number)
+    ).first()
+    if user is None:
+        return None
+    ahead = tokens_ahead(token_number, session) if user.status == 'Pending' else None
+    return build_estimate(user.token_number, user.status, ahead, service_time_seconds(session))
@@ -0,0 +1,55 @@
+from functools import wraps
+from flask import current_app, jsonify, request
+import math
+import threading
+import time
+
+# Per-client request limits for the public endpoints, counted per worker in fixed
+# one-minute windows. Behind a reverse proxy, request.remote_addr is the proxy unless
+# the app is wrapped in werkzeug's ProxyFix.
+
+
+class RateLimiter:
+    def __init__(self, limit, window_seconds=60):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._window = None
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        # Seconds until the client may try again, or 0 if this request is allowed
+        now = time.monotonic()
+        window = int(now // self.window_seconds)
+        with self._lock:
+            if window != self._window:
+                # Counts from the previous window can never matter again
+                self._window = window
+                self._counts.clear()
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if count <= self.limit:
+            return 0
+        return max(1, math.ceil((window + 1) * self.window_seconds - now))
+
+
+def rate_limited(config_key):
+    # Limits the view to config_key requests per client per minute
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            limit = current_app.config.get(config_key, 0)
+            if limit > 0:
+                limiters = current_app.extensions.setdefault('rate_limiters', {})
+                limiter = limiters.get(config_key)
+                if limiter is None:
+                    limiter = limiters.setdefault(config_key, RateLimiter(limit))
+                retry_after = limiter.hit(request.remote_addr)
+                if retry_after:
+                    response = jsonify({'error': 'Too many requests, please try again later'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cache for the admin dashboard's polling reads (/api/admin/stats and /api/admin/users).
+# Responses are stored per namespace and query string under the namespace's current
+# version; the write paths (submit and status update) bump the version after they
+# commit, so later reads miss and nothing stale is served. A response computed while
+# a write commits is stored under the old version and never read.
+#
+# Every cached response carries an ETag, so a poll with a matching If-None-Match gets
+# a 304 without a body. The in-process backend only sees this worker's writes; other
+# workers can serve a response up to RESPONSE_CACHE_TTL_SECONDS old. With
+# RESPONSE_CACHE_REDIS_URL (needs the redis package) the entries and versions are
+# shared, so a write in any worker invalidates every worker's reads.
+
+STATS_NAMESPACE = 'stats'
+USERS_NAMESPACE = 'users'
+# Everything a new or changed user shows up in
+USER_NAMESPACES = (STATS_NAMESPACE, USERS_NAMESPACE)
+
+
+class CachedResponse:
+    def __init__(self, body, mimetype, etag):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+
+
+class LocalCacheBackend:
+    # LRU over max_entries responses, each kept for at most the TTL
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            # Entries of older versions can never be read again
+            prefix = f"{namespace}:"
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def set(self, key, response, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    # Shared by every worker; Redis expires the entries and its maxmemory policy
+    # evicts them
+
+    def __init__(self, url, prefix='response-cache'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def version(self, namespace):
+        return int(self.client.get(f"{self.prefix}:version:{namespace}") or 0)
+
+    def bump(self, namespace):
+        self.client.incr(f"{self.prefix}:version:{namespace}")
+
+    def get(self, key):
+        values = self.client.hmget(f"{self.prefix}:{key}", 'body', 'mimetype', 'etag')
+        if values[0] is None:
+            return None
+        return CachedResponse(values[0], values[1].decode(), values[2].decode())
+
+    def set(self, key, response, ttl):
+        name = f"{self.prefix}:{key}"
+        pipeline = self.client.pipeline()
+        pipeline.hset(name, mapping={'body': response.body, 'mimetype': response.mimetype, 'etag': response.etag})
+        pipeline.expire(name, max(1, int(ttl)))
+        pipeline.execute()
+
+    def __len__(self):
+        return 0
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl=10):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def record(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def key(self, namespace, version):
+        # The query string with its parameters sorted, so ?a=1&b=2 and ?b=2&a=1 share
+        # an entry
+        params = '&'.join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+        return f"{namespace}:{version}:{request.path}?{params}"
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            try:
+                self.backend.bump(namespace)
+                self.record('invalidations')
+            except Exception as e:
+                logger.error(f"Error invalidating cached '{namespace}' responses: {str(e)}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'ttl_seconds': self.ttl,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
+
+
+def init_response_cache(app):
+    ttl = app.config.get('RESPONSE_CACHE_TTL_SECONDS', 10)
+    if ttl <= 0:
+        return None
+    backend = None
+    redis_url = app.config.get('RESPONSE_CACHE_REDIS_URL')
+    if redis_url:
+        try:
+            backend = RedisCacheBackend(redis_url)
+        except ImportError:
+            logger.warning("redis is not installed, admin responses are cached per worker")
+    if backend is None:
+        backend = LocalCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 128))
+    cache = ResponseCache(backend, ttl)
+    app.extensions['response_cache'] = cache
+    return cache
+
+
+def invalidate_responses(app, namespaces=USER_NAMESPACES):
+    # Call after the write has committed
+    cache = app.extensions.get('response_cache')
+    if cache is not None:
+        cache.invalidate(*namespaces)
+
+
+def conditional_response(body, mimetype, etag, status=200):
+    response = current_app.response_class(body, status=status, mimetype=mimetype)
+    response.set_etag(etag)
+    # The browser keeps the body but asks again every time
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+def cached_response(namespace):
+    # Serves the view's 200 responses from the cache, with an ETag. Goes below
+    # @jwt_required so only authorized requests reach the cache.
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('response_cache')
+            key = None
+            if cache is not None:
+                try:
+                    key = cache.key(namespace, cache.backend.version(namespace))
+                    entry = cache.backend.get(key)
+                except Exception as e:
+                    logger.error(f"Error reading cached '{namespace}' response: {str(e)}")
+                    entry = None
+                if entry is not None:
+                    cache.record('hits')
+                    response = conditional_response(entry.body, entry.mimetype, entry.etag)
+                    if response.status_code == 304:
+                        cache.record('not_modified')
+                    return response
+                cache.record('misses')
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            entry = CachedResponse(body, response.mimetype, hashlib.blake2b(body, digest_size=16).hexdigest())
+            if key is not None:
+                try:
+                    cache.backend.set(key, entry, cache.ttl)
+                except Exception as e:
+                    logger.error(f"Error caching '{namespace}' response: {str(e)}")
+            response = conditional_response(entry.body, entry.mimetype, entry.etag)
+            if response.status_code == 304 and cache is not None:
+                cache.record('not_modified')
+            return response
+        return wrapper
+    return decorator
@@ -1,68 +1,326 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.executors.pool import ThreadPoolExecutor
-from ..models import db, User, CompletedWork
-from ..utils.email_service import send_reminder_email
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, or_
+from sqlalchemy.exc import IntegrityError
+from ..models import db, User, CompletedWork, SchedulerLease
+from .email_outbox import enqueue_email, notify_outbox
+from .stats_service import reconcile_status_counters
+from .export_jobs import evict_exports
+from .queue_estimator import reminder_positions, service_time_seconds
+from .metrics import timed_job
 import logging
+import os
+import socket
+import threading
 import traceback
+import uuid
 
 logger = logging.getLogger(__name__)
 
-def check_and_send_reminders(app, mail):
+# A Pending token is owed its reminder once the tokens ahead of it are expected to
+# take no longer than REMINDER_LEAD_MINUTES, at the learnt service time (see
+# queue_estimator). At most this many are queued per sweep; the next completion's
+# sweep picks up the rest.
+MAX_REMINDERS_PER_SWEEP = 500
+
+
+@timed_job('reminder_sweep')
+def send_owed_reminders(app):
+    # Catch-up sweep: queues a reminder for every token that is owed one, in one query,
+    # so a burst of completions can never leave tokens behind
     with app.app_context():
         try:
+            # Until work is completed nobody has moved up the queue, so nobody is owed one
             completed_work = CompletedWork.query.first()
-            
-            if completed_work and completed_work.count > 0:
-                # For every completed work, send a reminder to the token (work_number + 2)
-                # When work #1 is completed, send reminder to token #3
-                # When work #2 is completed, send reminder to token #4
-                # When work #3 is completed, send reminder to token #5
-                # etc.
-                target_token_number = completed_work.count + 2
-                
-                # Check if reminder has already been sent for this token
-                target_user = User.query.filter_by(token_number=target_token_number, reminder_sent=False).first()
-                
-                if target_user:
-                    user_data = {
-                        'token_number': target_user.token_number,
-                        'name': target_user.name,
-                        'email': target_user.email,
-                        'work_description': target_user.work_description
-                    }
-                    
-                    if send_reminder_email(mail, user_data):
-                        target_user.reminder_sent = True
-                        db.session.commit()
-                        logger.info(f"Reminder sent to Token #{target_user.token_number} for completed work #{completed_work.count}")
-                    else:
-                        logger.error(f"Failed to send reminder to Token #{target_user.token_number}")
-                        
+            if not completed_work or completed_work.count <= 0:
+                return 0
+
+            service_seconds = service_time_seconds()
+            positions = min(reminder_positions(), MAX_REMINDERS_PER_SWEEP)
+            # The front of the queue, in order, from the (status, token_number) index
+            front = User.query.filter(
+                User.status == 'Pending'
+            ).order_by(User.token_number).limit(positions).all()
+
+            queued = 0
+            for ahead, user in enumerate(front):
+                if user.reminder_sent:
+                    continue
+                # Conditional update so a concurrent sweep can never queue the same reminder twice
+                claimed = db.session.execute(
+                    update(User)
+                    .where(User.id == user.id, User.reminder_sent == False)
+                    .values(reminder_sent=True)
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if claimed:
+                    minutes = round(ahead * service_seconds / 60)
+                    enqueue_email('reminder', {
+                        'token_number': user.token_number,
+                        'name': user.name,
+                        'email': user.email,
+                        'work_description': user.work_description,
+                        'minutes': minutes
+                    }, user_id=user.id)
+                    queued += 1
+                    logger.info(f"Reminder queued for Token #{user.token_number} ({ahead} ahead, about {minutes} minutes)")
+
+            db.session.commit()
+            if queued:
+                notify_outbox(app)
+            return queued
+
         except Exception as e:
-            error_msg = f"Error in scheduler task: {str(e)}"
+            db.session.rollback()
+            error_msg = f"Error in reminder dispatch: {str(e)}"
             logger.error(error_msg)
             logger.error(f"Traceback: {traceback.format_exc()}")
+            return 0
+
+
+class ReminderDispatcher:
+    # Runs the reminder sweep on the scheduler's executor whenever work is completed.
+    # Requests that arrive while a sweep is running trigger exactly one more sweep, so
+    # a completion committed mid-sweep is never missed and bursts collapse into one run.
+
+    JOB_ID = 'reminder_dispatch'
+
+    def __init__(self, app, scheduler=None):
+        self.app = app
+        self.scheduler = scheduler
+        self._lock = threading.Lock()
+        self._pending = False
+        self._running = False
+        app.extensions['reminder_dispatcher'] = self
+        if scheduler is not None:
+            scheduler.add_listener(self._on_job_event, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_ERROR)
+
+    def request(self):
+        with self._lock:
+            self._pending = True
+            if self._running:
+                return
+            self._running = True
+
+        if self.scheduler is not None and self.scheduler.running:
+            # No misfire grace limit: a run queued behind busy executor threads must
+            # still happen, or _running would never be cleared
+            self.scheduler.add_job(self._run, id=self.JOB_ID, name='Send owed reminders',
+                                   misfire_grace_time=None, replace_existing=True)
+        else:
+            self._run()
+
+    def _on_job_event(self, event):
+        # A run that was skipped (missed, or submitted while the previous run was still
+        # being counted as running) or that raised never cleared _running; clear it so
+        # the next request, or the one still pending, schedules a new run
+        if event.job_id != self.JOB_ID:
+            return
+        with self._lock:
+            self._running = False
+            pending = self._pending
+        if pending and event.code != EVENT_JOB_ERROR:
+            self.request()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+            send_owed_reminders(self.app)
+
+
+def request_reminder_dispatch(app):
+    dispatcher = app.extensions.get('reminder_dispatcher')
+    if dispatcher is not None:
+        dispatcher.request()
+    else:
+        send_owed_reminders(app)
+
+
+LEASE_NAME = 'scheduler'
+PERSISTENT_JOBSTORE = 'persistent'
+
+# Periodic jobs owned by the leader. They live in the database job store, so their
+# schedule survives restarts and leader changes; functions are referenced by name
+# because persisted jobs are pickled.
+LEADER_JOBS = [
+    {
+        'id': 'outbox_recovery',
+        'func': 'backend.services.scheduler_service:recover_outbox',
+        'name': 'Retry emails left behind by crashed workers',
+        'trigger': 'interval',
+        'config_minutes': 'OUTBOX_RECOVERY_MINUTES',
+    },
+    {
+        'id': 'stats_reconcile',
+        'func': 'backend.services.scheduler_service:reconcile_counters',
+        'name': 'Repair drift in the status counters',
+        'trigger': 'interval',
+        'config_minutes': 'STATS_RECONCILE_MINUTES',
+    },
+    {
+        'id': 'export_cleanup',
+        'func': 'backend.services.scheduler_service:cleanup_exports',
+        'name': 'Evict old export files',
+        'trigger': 'interval',
+        'config_minutes': 'EXPORT_CLEANUP_MINUTES',
+    },
+]
+
+_leader_app = None
+
+
+@timed_job('outbox_recovery')
+def recover_outbox():
+    if _leader_app is not None:
+        notify_outbox(_leader_app)
+
+
+@timed_job('stats_reconcile')
+def reconcile_counters():
+    if _leader_app is not None:
+        reconcile_status_counters(_leader_app)
+
+
+@timed_job('export_cleanup')
+def cleanup_exports():
+    if _leader_app is not None:
+        evict_exports(_leader_app)
+
+
+class SchedulerCoordinator:
+    # Lease-based leader election between worker processes. Every process keeps a
+    # small scheduler for its own event-driven work; the one that holds the lease
+    # row additionally attaches the persistent job store and runs the periodic jobs.
+
+    def __init__(self, app, scheduler):
+        self.app = app
+        self.scheduler = scheduler
+        self.identity = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = app.config.get('SCHEDULER_LEASE_SECONDS', 30)
+        self.is_leader = False
+        self._lock = threading.Lock()
+        app.extensions['scheduler_coordinator'] = self
+
+    def start(self):
+        self.scheduler.add_job(
+            self.heartbeat,
+            trigger='interval',
+            seconds=max(1, self.lease_seconds // 3),
+            id='leader_heartbeat',
+            name='Renew or acquire the scheduler lease',
+            next_run_time=datetime.now()
+        )
+
+    @timed_job('leader_heartbeat')
+    def heartbeat(self):
+        with self._lock, self.app.app_context():
+            try:
+                leading = self._renew_lease()
+            except Exception as e:
+                logger.error(f"Error renewing scheduler lease: {str(e)}")
+                leading = False
+
+            if leading and not self.is_leader:
+                self._become_leader()
+            elif not leading and self.is_leader:
+                self._step_down()
+
+    def shutdown(self):
+        global _leader_app
+        with self._lock:
+            if self.scheduler.running:
+                self.scheduler.shutdown(wait=False)
+            if self.is_leader:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    conn.execute(
+                        update(SchedulerLease)
+                        .where(SchedulerLease.name == LEASE_NAME, SchedulerLease.holder == self.identity)
+                        .values(expires_at=datetime.utcnow())
+                    )
+                self.is_leader = False
+                if _leader_app is self.app:
+                    _leader_app = None
+
+    def _renew_lease(self):
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.lease_seconds)
+        with db.engine.begin() as conn:
+            renewed = conn.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == LEASE_NAME,
+                    or_(SchedulerLease.holder == self.identity, SchedulerLease.expires_at < now)
+                )
+                .values(holder=self.identity, expires_at=expires_at)
+            ).rowcount
+            if renewed == 1:
+                return True
+            if conn.execute(select(SchedulerLease.name).where(SchedulerLease.name == LEASE_NAME)).first():
+                return False
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(SchedulerLease).values(name=LEASE_NAME, holder=self.identity, expires_at=expires_at))
+            return True
+        except IntegrityError:
+            return False
+
+    def _become_leader(self):
+        global _leader_app
+        logger.info(f"Scheduler lease acquired by {self.identity}")
+        self.is_leader = True
+        _leader_app = self.app
+
+        self.scheduler.add_jobstore(
+            SQLAlchemyJobStore(engine=db.engine, tablename='apscheduler_jobs'),
+            PERSISTENT_JOBSTORE
+        )
+        for job in LEADER_JOBS:
+            if self.scheduler.get_job(job['id'], jobstore=PERSISTENT_JOBSTORE) is None:
+                self.scheduler.add_job(
+                    job['func'],
+                    trigger=job['trigger'],
+                    minutes=self.app.config.get(job['config_minutes']),
+                    id=job['id'],
+                    name=job['name'],
+                    jobstore=PERSISTENT_JOBSTORE
+                )
+
+        # Catch up on reminders owed from before this leader started
+        request_reminder_dispatch(self.app)
+
+    def _step_down(self):
+        global _leader_app
+        logger.warning(f"Scheduler lease lost by {self.identity}")
+        self.is_leader = False
+        if _leader_app is self.app:
+            _leader_app = None
+        self.scheduler.remove_jobstore(PERSISTENT_JOBSTORE, shutdown=True)
+
 
 def start_scheduler(app, mail):
     try:
-        # Use ThreadPoolExecutor which is compatible with Windows
+        # The work is a reminder sweep, the lease heartbeat and a few short leader jobs,
+        # so a couple of threads is enough. Use ThreadPoolExecutor which is compatible with Windows
         executors = {
-            'default': ThreadPoolExecutor(20),
+            'default': ThreadPoolExecutor(app.config.get('SCHEDULER_MAX_WORKERS', 2)),
+        }
+        job_defaults = {
+            'coalesce': True,
+            'max_instances': 1,
         }
         
-        scheduler = BackgroundScheduler(executors=executors)
-        
-        scheduler.add_job(
-            func=lambda: check_and_send_reminders(app, mail),
-            trigger='interval',
-            minutes=1,
-            id='reminder_check',
-            name='Check and send reminders every minute',
-            replace_existing=True
-        )
-        
+        scheduler = BackgroundScheduler(executors=executors, job_defaults=job_defaults)
         scheduler.start()
+        
+        ReminderDispatcher(app, scheduler)
+        SchedulerCoordinator(app, scheduler).start()
         logger.info("Scheduler started successfully")
         
         return scheduler
@@ -70,4 +328,10 @@ def start_scheduler(app, mail):
         error_msg = f"Error starting scheduler: {str(e)}"
         logger.error(error_msg)
         logger.error(f"Traceback: {traceback.format_exc()}")
-        return None
\ No newline at end of file
+        return None
+
+
+def stop_scheduler(app):
+    coordinator = app.extensions.get('scheduler_coordinator')
+    if coordinator is not None:
+        coordinator.shutdown()
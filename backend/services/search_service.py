@@ -0,0 +1,169 @@
+from sqlalchemy import text, table, column, select, func, or_, inspect
+from ..models import db, User
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Admin search over name, email and contact number backed by a real index instead of
+# LIKE '%term%' table scans: an FTS5 table kept in sync by triggers on SQLite, and an
+# expression GIN index on Postgres. Other databases fall back to LIKE.
+
+users_fts = table('users_fts', column('rowid'), column('rank'))
+
+# Migration 0002 creates the index from its own frozen copy of these statements;
+# a change here needs a new revision as well
+
+# Contact numbers are also indexed with punctuation stripped, so "9876543210" finds
+# "98765-43210"
+SQLITE_DIGITS = "replace(replace(replace(replace(replace({0}, '-', ''), ' ', ''), '+', ''), '(', ''), ')', '')"
+SQLITE_FTS_VALUES = f"new.id, new.name, new.email, new.contact_number, {SQLITE_DIGITS.format('new.contact_number')}"
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name, email, contact_number, contact_digits, tokenize = 'unicode61', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+    f"INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits) VALUES ({SQLITE_FTS_VALUES}); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email, contact_number ON users BEGIN "
+    "DELETE FROM users_fts WHERE rowid = old.id; "
+    f"INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits) VALUES ({SQLITE_FTS_VALUES}); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+    "DELETE FROM users_fts WHERE rowid = old.id; END",
+]
+SQLITE_REBUILD = [
+    "DELETE FROM users_fts",
+    "INSERT INTO users_fts(rowid, name, email, contact_number, contact_digits) "
+    f"SELECT id, name, email, contact_number, {SQLITE_DIGITS.format('contact_number')} FROM users",
+]
+
+POSTGRES_DOCUMENT = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(contact_number, '') || ' ' || regexp_replace(coalesce(contact_number, ''), '[^0-9]', '', 'g'))"
+)
+POSTGRES_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_users_search ON users USING gin ({POSTGRES_DOCUMENT})",
+]
+
+
+def detect_search_backend(engine):
+    if engine.dialect.name == 'sqlite':
+        return 'fts5'
+    if engine.dialect.name == 'postgresql':
+        return 'postgres'
+    return 'like'
+
+
+def install_search_index(engine):
+    # The app gets the index from its migrations; this is for databases created without
+    # them, like the benchmark ones. Idempotent; creates the index and backfills it if
+    # it is out of step with users
+    backend = detect_search_backend(engine)
+    try:
+        with engine.begin() as conn:
+            if backend == 'fts5':
+                for statement in SQLITE_DDL:
+                    conn.execute(text(statement))
+                indexed = conn.execute(text("SELECT count(*) FROM users_fts")).scalar()
+                users = conn.execute(select(func.count(User.id))).scalar()
+                if indexed != users:
+                    logger.info(f"Rebuilding search index ({indexed} indexed, {users} users)")
+                    for statement in SQLITE_REBUILD:
+                        conn.execute(text(statement))
+            elif backend == 'postgres':
+                for statement in POSTGRES_DDL:
+                    conn.execute(text(statement))
+    except Exception as e:
+        logger.error(f"Search index unavailable, falling back to LIKE: {str(e)}")
+        backend = 'like'
+    return backend
+
+
+def init_search(app):
+    backend = detect_search_backend(db.engine)
+    if backend == 'fts5' and not inspect(db.engine).has_table('users_fts'):
+        logger.error("Search index missing, falling back to LIKE; run the database migrations")
+        backend = 'like'
+    app.extensions['user_search'] = backend
+
+
+def get_search_backend(app):
+    # Detected on first use instead of at startup; needs an app context
+    if 'user_search' not in app.extensions:
+        init_search(app)
+    return app.extensions['user_search']
+
+
+def _terms(search):
+    # Words without a letter or digit tokenize to nothing and would break the query
+    return [term for term in re.split(r'\s+', search.replace('"', ' ')) if re.search(r'\w', term)]
+
+
+def _fts5_query(search):
+    # Every word must match, each as a prefix: 'pat 98' -> '"pat"* AND "98"*'
+    return ' AND '.join(f'"{term}"*' for term in _terms(search))
+
+
+def _postgres_query(search):
+    terms = [re.sub(r"[^\w@.+-]", '', term) for term in _terms(search)]
+    return ' & '.join(f"'{term}':*" for term in terms if term)
+
+
+def _fts5_match(search):
+    return text('users_fts MATCH :fts_query').bindparams(fts_query=_fts5_query(search))
+
+
+def _token_number(search):
+    # Exact fast path for "123" or "#123"
+    candidate = search.strip().lstrip('#')
+    return int(candidate) if candidate.isdigit() else None
+
+
+def search_filter(search, backend):
+    token_number = _token_number(search)
+
+    if not _terms(search):
+        backend = 'like'
+
+    if backend == 'fts5':
+        matches = select(users_fts.c.rowid).where(_fts5_match(search))
+        condition = User.id.in_(matches)
+    elif backend == 'postgres':
+        condition = text(f"{POSTGRES_DOCUMENT} @@ to_tsquery('simple', :ts_query)").bindparams(
+            ts_query=_postgres_query(search)
+        )
+    else:
+        like = f"%{search}%"
+        condition = User.name.like(like) | User.email.like(like) | User.contact_number.like(like)
+
+    if token_number is not None:
+        return or_(User.token_number == token_number, condition)
+    return condition
+
+
+def ranked_search(query, search, backend):
+    # Best matches first; exact token number hits always come first
+    token_number = _token_number(search)
+    exact_first = (User.token_number == token_number).desc() if token_number is not None else None
+    if not _terms(search):
+        backend = 'like'
+
+    if backend == 'fts5':
+        ranked = (
+            select(users_fts.c.rowid.label('user_id'), users_fts.c.rank.label('rank'))
+            .where(_fts5_match(search))
+            .subquery()
+        )
+        query = query.filter(search_filter(search, backend)).outerjoin(ranked, ranked.c.user_id == User.id)
+        order = [ranked.c.rank.asc()]
+    elif backend == 'postgres':
+        query = query.filter(search_filter(search, backend))
+        order = [text(f"ts_rank({POSTGRES_DOCUMENT}, to_tsquery('simple', :ts_query)) DESC").bindparams(
+            ts_query=_postgres_query(search)
+        )]
+    else:
+        query = query.filter(search_filter(search, backend))
+        order = []
+
+    if exact_first is not None:
+        order.insert(0, exact_first)
+    return query.order_by(*order, User.token_number.desc())
@@ -0,0 +1,98 @@
+from sqlalchemy import select, update, insert, func
+from sqlalchemy.exc import IntegrityError
+from ..models import db, User, StatusCounter, CompletedWork
+import logging
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# Per-status user counts kept in status_counters, updated in the same transaction as
+# every insert and status change (the same idea as CompletedWork). Reading the stats
+# is then a couple of primary-key rows instead of COUNTs over users.
+
+STATUSES = ('Pending', 'Completed')
+
+
+def adjust_status_count(status, delta, session=None):
+    session = session or db.session
+    result = session.execute(
+        update(StatusCounter)
+        .where(StatusCounter.status == status)
+        .values(count=StatusCounter.count + delta)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # First user with this status; the reconcile job repairs any race here
+        session.add(StatusCounter(status=status, count=delta))
+
+
+def record_status_change(old_status, new_status, count=1):
+    if old_status == new_status or count == 0:
+        return
+    adjust_status_count(old_status, -count)
+    adjust_status_count(new_status, count)
+
+
+def count_users_by_status(session=None):
+    # Single-pass fallback and source of truth for reconciliation
+    session = session or db.session
+    rows = session.execute(select(User.status, func.count(User.id)).group_by(User.status)).all()
+    return {status: count for status, count in rows}
+
+
+def get_status_counts(session=None):
+    session = session or db.session
+    counts = {status: count for status, count in session.execute(select(StatusCounter.status, StatusCounter.count))}
+    if not counts:
+        return count_users_by_status(session)
+    return counts
+
+
+def get_stats():
+    counts = get_status_counts()
+    completed_work = CompletedWork.query.first()
+    return {
+        'total': sum(counts.values()),
+        'pending': counts.get('Pending', 0),
+        'completed': counts.get('Completed', 0),
+        'completed_works': completed_work.count if completed_work else 0
+    }
+
+
+def reconcile_status_counters(app=None):
+    # Recomputes the counters from users and repairs any drift
+    def reconcile():
+        try:
+            with db.engine.begin() as conn:
+                # Lock the counters first so no write can slip in between the count and the fix
+                stored = {
+                    status: count
+                    for status, count in conn.execute(select(StatusCounter.status, StatusCounter.count).with_for_update())
+                }
+                actual = count_users_by_status(conn)
+                for status in set(actual) | set(stored):
+                    expected = actual.get(status, 0)
+                    if stored.get(status) == expected:
+                        continue
+                    if status in stored:
+                        conn.execute(update(StatusCounter).where(StatusCounter.status == status).values(count=expected))
+                    else:
+                        conn.execute(insert(StatusCounter).values(status=status, count=expected))
+                    logger.warning(f"Status counter '{status}' drifted: stored {stored.get(status)}, actual {expected}")
+        except IntegrityError:
+            # Another worker reconciled at the same time
+            pass
+        except Exception as e:
+            logger.error(f"Error reconciling status counters: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+
+    if app is not None:
+        with app.app_context():
+            reconcile()
+    else:
+        reconcile()
+
+
+def init_status_counters():
+    if db.session.execute(select(func.count()).select_from(StatusCounter)).scalar() == 0:
+        reconcile_status_counters()
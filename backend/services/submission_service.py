@@ -0,0 +1,47 @@
+from ..models import User
+from .email_outbox import enqueue_email
+from .stats_service import adjust_status_count
+
+# The /api/submit transaction, shared by the Flask route and the ASGI handler (which
+# runs it on an AsyncSession through run_sync). The user row, the Pending counter and
+# the confirmation email are written in the caller's transaction; the outbox workers
+# send the email after the commit, so the request never waits on the SMTP server.
+
+SUBMISSION_FIELDS = ('name', 'email', 'address', 'contact_number', 'work_description')
+
+
+def validate_submission(data):
+    # Returns (fields, None), or (None, error message) for a 400 response
+    if not data:
+        return None, 'No data provided'
+    fields = {field: data.get(field) for field in SUBMISSION_FIELDS}
+    if not all(fields.values()):
+        return None, 'All fields are required'
+    return fields, None
+
+
+def register_user(session, token_number, fields):
+    new_user = User(token_number=token_number, status='Pending', **fields)
+    session.add(new_user)
+    session.flush()
+    adjust_status_count('Pending', 1, session=session)
+
+    user_data = {
+        'token_number': token_number,
+        'name': fields['name'],
+        'email': fields['email'],
+        'contact_number': fields['contact_number'],
+        'address': fields['address'],
+        'work_description': fields['work_description']
+    }
+    enqueue_email('confirmation', user_data, user_id=new_user.id, session=session)
+    return new_user
+
+
+def submission_response(new_user):
+    return {
+        'success': True,
+        'message': 'User registered successfully',
+        'token_number': new_user.token_number,
+        'user': new_user.to_dict()
+    }
@@ -0,0 +1,112 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+from ..models import db, User, TokenSequence
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+SEQUENCE_NAME = 'user_token'
+
+
+class TokenAllocator:
+    # Hands out token numbers from a single counter row instead of MAX(token_number) + 1.
+    #
+    # With a block size of 1 the counter is bumped inside the caller's transaction, so a
+    # rolled back submit also rolls back its token and numbering stays gap-free. With a
+    # larger block size each worker reserves a range in its own short transaction and
+    # serves tokens from memory; unused tokens of a block are lost when the worker exits.
+
+    def __init__(self, app=None):
+        self._lock = threading.RLock()
+        self._pid = None
+        self._next = 0
+        self._end = -1
+        self.block_size = 1
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.block_size = max(1, int(app.config.get('TOKEN_BLOCK_SIZE', 1)))
+        app.extensions['token_allocator'] = self
+
+    def sync_sequence(self):
+        # Creates the counter row on first start and moves it past any token that was
+        # inserted without going through the allocator. Needs an app context.
+        max_token = db.session.query(func.max(User.token_number)).scalar() or 0
+        try:
+            if db.session.get(TokenSequence, SEQUENCE_NAME) is None:
+                db.session.add(TokenSequence(name=SEQUENCE_NAME, value=max_token))
+            else:
+                db.session.execute(
+                    update(TokenSequence)
+                    .where(TokenSequence.name == SEQUENCE_NAME, TokenSequence.value < max_token)
+                    .values(value=max_token)
+                )
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created the row at the same time
+            db.session.rollback()
+
+    def allocate(self, session=None):
+        # session is the caller's transaction (db.session by default); it is only used
+        # with a block size of 1
+        if self.block_size == 1:
+            return self._increment(session or db.session, 1)
+
+        with self._lock:
+            token_number = self.take_reserved()
+            if token_number is None:
+                with db.engine.begin() as conn:
+                    self.reserve_block(conn)
+                token_number = self.take_reserved()
+            return token_number
+
+    def take_reserved(self):
+        # Next token of this process's reserved block, or None once it is used up
+        with self._lock:
+            if self._pid != os.getpid():
+                # Never share a reserved block with a forked child
+                self._pid = os.getpid()
+                self._next, self._end = 0, -1
+            if self._next > self._end:
+                return None
+            token_number = self._next
+            self._next += 1
+            return token_number
+
+    def reserve_block(self, executor):
+        # Reserves the next block_size tokens in the executor's transaction. The lock
+        # is only taken after the UPDATE, so async callers never hold it while waiting.
+        end = self._increment(executor, self.block_size)
+        with self._lock:
+            self._pid = os.getpid()
+            self._next, self._end = end - self.block_size + 1, end
+        logger.info(f"Reserved token block {end - self.block_size + 1}-{end}")
+
+    def peek_next(self, session=None):
+        with self._lock:
+            if self._pid == os.getpid() and self._next <= self._end:
+                return self._next
+        value = (session or db.session).execute(
+            select(TokenSequence.value).where(TokenSequence.name == SEQUENCE_NAME)
+        ).scalar()
+        return (value or 0) + 1
+
+    def _increment(self, executor, amount):
+        # The UPDATE takes the row (or SQLite database) write lock first, so the read
+        # below always sees our own increment and never a concurrent one.
+        result = executor.execute(
+            update(TokenSequence)
+            .where(TokenSequence.name == SEQUENCE_NAME)
+            .values(value=TokenSequence.value + amount)
+        )
+        if result.rowcount != 1:
+            raise RuntimeError('Token sequence is not initialised')
+        return executor.execute(
+            select(TokenSequence.value).where(TokenSequence.name == SEQUENCE_NAME)
+        ).scalar_one()
+
+
+token_allocator = TokenAllocator()
@@ -0,0 +1,227 @@
+from array import array
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, func
+from ..models import db, User
+from .queue_estimator import build_estimate, service_time_seconds
+import logging
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# In-memory token -> status index for the public /api/token/<n> lookup, so customers
+# asking "where is my token?" never reach the database in the common case.
+#
+# statuses is a bytearray indexed by token number (one byte per token: 0 unknown,
+# 1 Pending, 2 Completed) and pending is a Fenwick tree over the Pending flags in an
+# array('I'), so a token's queue position is a prefix sum in O(log n). Together
+# that is 5 bytes per token: 4.8 MB per 1M tokens, measured with
+# benchmarks/bench_token_index.py, against 106 MB for the same tokens as a dict of
+# (status, position) tuples. Loading 1M tokens takes about 2.4 s.
+#
+# Each worker loads the index when its background services start, and the submit
+# and status-update paths apply their own writes after committing. Writes made by
+# other workers are picked up every TOKEN_INDEX_REFRESH_SECONDS from the users
+# changed since the last refresh (the updated_at index), so a lookup can lag another
+# worker's write by at most that long. A token the index has not seen is read
+# through from the database.
+
+UNKNOWN, PENDING, COMPLETED = 0, 1, 2
+STATUS_CODES = {'Pending': PENDING, 'Completed': COMPLETED}
+STATUS_NAMES = {PENDING: 'Pending', COMPLETED: 'Completed'}
+
+# Rows committed slightly out of updated_at order are still caught by the next refresh
+REFRESH_OVERLAP = timedelta(seconds=60)
+# Room left for new tokens; growing copies and rebuilds the index
+MIN_GROWTH = 4096
+
+
+class TokenIndex:
+    def __init__(self, refresh_seconds=5):
+        self.refresh_seconds = refresh_seconds
+        self.lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # Index 0 is unused in both, token numbers start at 1
+        self.statuses = bytearray(1)
+        self.pending = array('I', [0])
+        self.service_seconds = None
+        self.loaded = False
+        self._refreshed_at = 0.0
+        self._synced_at = None
+
+    @property
+    def capacity(self):
+        return len(self.statuses) - 1
+
+    def memory_bytes(self):
+        return len(self.statuses) + len(self.pending) * self.pending.itemsize
+
+    def _grow(self, token_number):
+        # By a quarter at a time, so rebuilds stay rare without doubling the memory
+        size = max(token_number + 1, len(self.statuses) + max(len(self.statuses) // 4, MIN_GROWTH))
+        self.statuses.extend(bytes(size - len(self.statuses)))
+        self._rebuild()
+
+    def _rebuild(self):
+        # Linear-time Fenwick construction from the status bytes
+        size = len(self.statuses)
+        pending = array('I', bytes(size * 4))
+        statuses = self.statuses
+        for i in range(1, size):
+            if statuses[i] == PENDING:
+                pending[i] += 1
+            parent = i + (i & -i)
+            if parent < size:
+                pending[parent] += pending[i]
+        self.pending = pending
+
+    def _add(self, i, delta):
+        pending, size = self.pending, len(self.pending)
+        while i < size:
+            pending[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        # Pending tokens numbered 1..i
+        pending, total = self.pending, 0
+        while i > 0:
+            total += pending[i]
+            i -= i & -i
+        return total
+
+    def set_status(self, token_number, status):
+        code = STATUS_CODES.get(status, UNKNOWN)
+        with self.lock:
+            if token_number >= len(self.statuses):
+                if code == UNKNOWN:
+                    return
+                self._grow(token_number)
+            old = self.statuses[token_number]
+            if old == code:
+                return
+            self.statuses[token_number] = code
+            if old == PENDING:
+                self._add(token_number, -1)
+            if code == PENDING:
+                self._add(token_number, 1)
+
+    def lookup(self, token_number):
+        # (status, Pending tokens ahead) or None if the token is not in the index
+        with self.lock:
+            if token_number < 1 or token_number >= len(self.statuses):
+                return None
+            code = self.statuses[token_number]
+            if code == UNKNOWN:
+                return None
+            return STATUS_NAMES[code], self._prefix(token_number - 1) if code == PENDING else None
+
+    @property
+    def stale(self):
+        return time.monotonic() - self._refreshed_at >= self.refresh_seconds
+
+    def load(self, session=None):
+        session = session or db.session
+        synced_at = datetime.utcnow()
+        last_token = session.execute(select(func.max(User.token_number))).scalar() or 0
+        statuses = bytearray(last_token + 1 + MIN_GROWTH)
+        # Core rows on the session's connection: about twice as fast as ORM rows here
+        for token_number, status in session.connection().execute(
+            select(User.token_number, User.status).execution_options(yield_per=10000)
+        ):
+            if token_number >= len(statuses):
+                # Inserted since the max was read
+                statuses.extend(bytes(token_number + 1 + MIN_GROWTH - len(statuses)))
+            statuses[token_number] = STATUS_CODES.get(status, UNKNOWN)
+        service_seconds = service_time_seconds(session)
+        with self.lock:
+            self.statuses = statuses
+            self._rebuild()
+            self.service_seconds = service_seconds
+            self.loaded = True
+            self._synced_at = synced_at
+            self._refreshed_at = time.monotonic()
+
+    def ensure_loaded(self, session=None):
+        # Loads on first use. Concurrent first lookups wait for one load rather than
+        # each reading the whole table
+        if self.loaded:
+            return
+        with self._load_lock:
+            if not self.loaded:
+                self.load(session)
+
+    def refresh(self, session=None):
+        # Applies the users changed since the last refresh; one caller at a time,
+        # the others keep answering from the current state
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            session = session or db.session
+            synced_at = datetime.utcnow()
+            rows = session.execute(
+                select(User.token_number, User.status).where(User.updated_at >= self._synced_at - REFRESH_OVERLAP)
+            ).all()
+            for token_number, status in rows:
+                self.set_status(token_number, status)
+            self.service_seconds = service_time_seconds(session)
+            self._synced_at = synced_at
+            self._refreshed_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+
+def init_token_index(app):
+    index = TokenIndex(app.config.get('TOKEN_INDEX_REFRESH_SECONDS', 5))
+    app.extensions['token_index'] = index
+    return index
+
+
+def load_token_index(app):
+    index = app.extensions.get('token_index')
+    if index is None:
+        return
+    with app.app_context():
+        try:
+            started = time.perf_counter()
+            index.load()
+            logger.info(f"Token index loaded: {index.capacity} tokens, {index.memory_bytes() / 1024 / 1024:.1f} MB "
+                        f"in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"Error loading token index: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+
+
+def index_tokens(app, status, token_numbers):
+    # Call after the write has committed
+    index = app.extensions.get('token_index')
+    if index is None or not index.loaded:
+        return
+    for token_number in token_numbers:
+        index.set_status(token_number, status)
+
+
+def token_status(token_number):
+    # The public lookup, inside an app context: the same estimate as queue_estimate,
+    # from the index instead of the database. None for an unknown token.
+    index = current_app.extensions['token_index']
+    if not index.loaded:
+        index.ensure_loaded()
+    elif index.stale:
+        index.refresh()
+
+    entry = index.lookup(token_number)
+    if entry is None:
+        # Not seen yet (another worker's submit since the last refresh): read through
+        status = db.session.execute(select(User.status).where(User.token_number == token_number)).scalar()
+        if status is None:
+            return None
+        index.set_status(token_number, status)
+        entry = index.lookup(token_number)
+        if entry is None:
+            return None
+
+    status, ahead = entry
+    return build_estimate(token_number, status, ahead, index.service_seconds)
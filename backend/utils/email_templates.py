@@ -0,0 +1,87 @@
+from functools import lru_cache
+from html.parser import HTMLParser
+from jinja2 import BaseLoader, Environment, PackageLoader
+import re
+
+# Email bodies live in backend/templates/email. Templates are compiled once and
+# cached; the text/plain part is derived from the HTML template source itself, so
+# the two versions can never drift apart.
+
+EMAIL_TEMPLATES = ('confirmation', 'reminder')
+
+PARAGRAPH_TAGS = {'div', 'h1', 'h2', 'h3'}
+LINE_TAGS = {'p', 'br', 'tr', 'li'}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in PARAGRAPH_TAGS:
+            self.parts.append('\n\n')
+        elif tag in LINE_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        self.handle_starttag(tag, None)
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+    def text(self):
+        lines = [re.sub(r'[ \t\r\f\v]+', ' ', line).strip() for line in ''.join(self.parts).split('\n')]
+        return collapse_blank_lines('\n'.join(lines))
+
+
+def collapse_blank_lines(text):
+    return re.sub(r'\n\s*\n\s*\n+', '\n\n', text).strip() + '\n'
+
+
+def html_to_text(source):
+    # Works on template source as well as rendered HTML: Jinja tags are plain text
+    # to the HTML parser and pass through untouched
+    extractor = _TextExtractor()
+    extractor.feed(source)
+    extractor.close()
+    return extractor.text()
+
+
+class _TextLoader(BaseLoader):
+    def __init__(self, html_loader):
+        self.html_loader = html_loader
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = self.html_loader.get_source(environment, template)
+        return html_to_text(source), filename, uptodate
+
+
+_html_env = Environment(
+    loader=PackageLoader('backend', 'templates/email'),
+    autoescape=True,
+    auto_reload=False,
+    cache_size=-1
+)
+_text_env = Environment(
+    loader=_TextLoader(_html_env.loader),
+    autoescape=False,
+    auto_reload=False,
+    cache_size=-1
+)
+
+
+@lru_cache(maxsize=None)
+def get_email_templates(name):
+    return _html_env.get_template(f'{name}.html'), _text_env.get_template(f'{name}.html')
+
+
+def load_email_templates():
+    for name in EMAIL_TEMPLATES:
+        get_email_templates(name)
+
+
+def render_email(name, context):
+    # Returns (html, text). User fields are HTML-escaped in the HTML part only.
+    html_template, text_template = get_email_templates(name)
+    return html_template.render(context), collapse_blank_lines(text_template.render(context))
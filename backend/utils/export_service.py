@@ -1,91 +1,260 @@
-import pandas as pd
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from tempfile import SpooledTemporaryFile, TemporaryDirectory
 from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from backend.models import User
+from backend.services.database_service import create_worker_engine
+from backend.utils.user_serializer import iter_user_rows, format_columns
+import csv
+import multiprocessing
+import os
 
-def export_to_excel(users):
-    data = []
-    for user in users:
-        data.append({
-            'Token Number': user.token_number,
-            'Name': user.name,
-            'Email': user.email,
-            'Contact Number': user.contact_number,
-            'Address': user.address,
-            'Work Description': user.work_description,
-            'Status': user.status,
-            'Created At': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
-            'Updated At': user.updated_at.strftime('%Y-%m-%d %H:%M:%S') if user.updated_at else ''
-        })
-    
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Service Tokens')
+# reportlab, openpyxl (which loads numpy when it is installed) and pypdf are imported
+# by the functions that use them, so only the processes that build an export pay for
+# loading them
+
+EXPORT_COLUMNS = [
+    ('Token Number', 'token_number'),
+    ('Name', 'name'),
+    ('Email', 'email'),
+    ('Contact Number', 'contact_number'),
+    ('Address', 'address'),
+    ('Work Description', 'work_description'),
+    ('Status', 'status'),
+    ('Created At', 'created_at'),
+    ('Updated At', 'updated_at'),
+]
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+EXPORT_FIELDS = [field for _, field in EXPORT_COLUMNS]
+EXPORT_BATCH_SIZE = 2000
+EXCEL_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+PDF_COLUMNS = [
+    ('Token', 'token_number'),
+    ('Name', 'name'),
+    ('Email', 'email'),
+    ('Contact', 'contact_number'),
+    ('Status', 'status'),
+]
+PDF_HEADERS = [header for header, _ in PDF_COLUMNS]
+PDF_FIELDS = [field for _, field in PDF_COLUMNS]
+# In points, the same values as reportlab.lib.units and reportlab.lib.pagesizes.A4
+INCH = 72.0
+MM = INCH / 2.54 * 0.1
+PDF_COLUMN_WIDTHS = [0.8*INCH, 1.5*INCH, 2*INCH, 1.2*INCH, 1*INCH]
+PDF_PAGE_SIZE = (210*MM, 297*MM)
+PDF_MARGIN = 0.5*INCH
+PDF_CONTENT_WIDTH = PDF_PAGE_SIZE[0] - 2 * PDF_MARGIN
+# Leaves room for the page number under the table
+PDF_CONTENT_HEIGHT = PDF_PAGE_SIZE[1] - 2.5 * PDF_MARGIN
+
+def iter_export_rows(session, batch_size=EXPORT_BATCH_SIZE):
+    # Export rows in token order, a batch at a time, with dates as export text
+    for rows in iter_user_rows(session, EXPORT_FIELDS, batch_size):
+        yield format_columns(EXPORT_FIELDS, rows, style='export')
+
+def export_to_excel(session, batch_size=EXPORT_BATCH_SIZE, output=None):
+    # Write-only workbook: rows are written straight to disk as they are fetched instead
+    # of building the whole sheet in memory. Unless an output file is given the result
+    # is spooled, so small exports stay in memory and large ones go to a temp file that
+    # send_file streams.
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Service Tokens')
+    header_font = Font(bold=True)
+    header = []
+    for title in EXPORT_HEADERS:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = header_font
+        header.append(cell)
+    sheet.append(header)
+
+    for rows in iter_export_rows(session, batch_size):
+        for row in rows:
+            sheet.append(row)
+
+    if output is None:
+        output = SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_SIZE)
+    workbook.save(output)
     output.seek(0)
     return output
 
-def export_to_csv(users):
-    data = []
-    for user in users:
-        data.append({
-            'Token Number': user.token_number,
-            'Name': user.name,
-            'Email': user.email,
-            'Contact Number': user.contact_number,
-            'Address': user.address,
-            'Work Description': user.work_description,
-            'Status': user.status,
-            'Created At': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
-            'Updated At': user.updated_at.strftime('%Y-%m-%d %H:%M:%S') if user.updated_at else ''
-        })
-    
-    df = pd.DataFrame(data)
-    output = BytesIO()
-    df.to_csv(output, index=False)
+def stream_csv(session, batch_size=EXPORT_BATCH_SIZE):
+    # Yields the CSV in chunks of batch_size rows, so memory stays flat and the first
+    # bytes go out before the last rows are even read
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_HEADERS)
+    for rows in iter_export_rows(session, batch_size):
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining
+
+def plan_pdf_report(session):
+    # Everything the pages need besides their rows: the summary, the timestamp and
+    # the page layout. Plain values, so it can be handed to other processes.
+    styles = _pdf_styles()
+    counts = dict(session.execute(select(User.status, func.count(User.id)).group_by(User.status)).all())
+    total = sum(counts.values())
+    report = {
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'counts': counts,
+        'total': total,
+    }
+    intro_height = sum(
+        flowable.wrap(PDF_CONTENT_WIDTH, PDF_CONTENT_HEIGHT)[1] + flowable.getSpaceAfter()
+        for flowable in _pdf_intro(report)
+    )
+    report['first_page_rows'] = int((PDF_CONTENT_HEIGHT - intro_height - styles['header_height']) // styles['row_height'])
+    report['rows_per_page'] = int((PDF_CONTENT_HEIGHT - styles['header_height']) // styles['row_height'])
+    report['pages'] = 1 + -(-max(0, total - report['first_page_rows']) // report['rows_per_page'])
+    return report
+
+def render_pdf_pages(session, output, report, first_page=1, last_page=None, batch_size=EXPORT_BATCH_SIZE):
+    # Draws one fixed-size table per page straight onto the canvas, so only a page of
+    # rows is ever laid out at a time. A page range can be rendered on its own and
+    # merged with the others afterwards.
+    from reportlab.pdfgen.canvas import Canvas
+
+    last_page = last_page or report['pages']
+    start, _ = _pdf_page_rows(report, first_page)
+    _, end = _pdf_page_rows(report, last_page)
+
+    canvas = Canvas(output, pagesize=PDF_PAGE_SIZE, pageCompression=1)
+    canvas.setTitle('Service Token Report')
+    page_number = first_page
+    page_start, page_end = _pdf_page_rows(report, page_number)
+    page = []
+    for rows in iter_user_rows(session, PDF_FIELDS, batch_size, offset=start, limit=end - start):
+        for row in rows:
+            page.append(_pdf_row(row))
+            if len(page) == page_end - page_start and page_number < last_page:
+                _draw_pdf_page(canvas, report, page_number, page)
+                page_number += 1
+                page_start, page_end = _pdf_page_rows(report, page_number)
+                page = []
+    _draw_pdf_page(canvas, report, page_number, page)
+    canvas.save()
+    return output
+
+def export_to_pdf(session, output=None, batch_size=EXPORT_BATCH_SIZE):
+    output = output if output is not None else BytesIO()
+    render_pdf_pages(session, output, plan_pdf_report(session), batch_size=batch_size)
     output.seek(0)
     return output
 
-def export_to_pdf(users):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
-    elements = []
-    
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#4F46E5'),
-        spaceAfter=30,
-        alignment=1
+def render_pdf_part(database_uri, report, first_page, last_page, path, sqlite_pragmas=None):
+    # Pool entry point for export_to_pdf_parallel
+    engine = create_worker_engine(database_uri, sqlite_pragmas)
+    try:
+        with Session(engine) as session, open(path, 'wb') as output:
+            render_pdf_pages(session, output, report, first_page, last_page)
+        return path
+    finally:
+        engine.dispose()
+
+def export_to_pdf_parallel(database_uri, output, workers=2, sqlite_pragmas=None):
+    # Renders contiguous page ranges in separate processes and merges them in order.
+    # Needs pypdf; without it (or with one worker) the report is rendered serially.
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        PdfWriter = None
+
+    engine = create_worker_engine(database_uri, sqlite_pragmas)
+    try:
+        with Session(engine) as session:
+            report = plan_pdf_report(session)
+            if PdfWriter is None or workers <= 1 or report['pages'] < 2 * workers:
+                render_pdf_pages(session, output, report)
+                return output
+    finally:
+        engine.dispose()
+
+    pages_per_part = -(-report['pages'] // workers)
+    ranges = [(first, min(first + pages_per_part - 1, report['pages']))
+              for first in range(1, report['pages'] + 1, pages_per_part)]
+    with TemporaryDirectory() as tmp, ProcessPoolExecutor(
+        max_workers=len(ranges), mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        futures = [
+            pool.submit(render_pdf_part, database_uri, report, first, last, os.path.join(tmp, f'part_{first}.pdf'),
+                        sqlite_pragmas)
+            for first, last in ranges
+        ]
+        writer = PdfWriter()
+        for future in futures:
+            writer.append(future.result())
+        writer.write(output)
+    return output
+
+def _pdf_page_rows(report, page_number):
+    # Row offsets [start, end) shown on a page; the first page also holds the summary
+    if page_number == 1:
+        return 0, report['first_page_rows']
+    start = report['first_page_rows'] + (page_number - 2) * report['rows_per_page']
+    return start, start + report['rows_per_page']
+
+def _pdf_row(row):
+    token_number, name, email, contact_number, status = row
+    return [str(token_number), name[:20], email[:25], contact_number, status]
+
+def _pdf_intro(report):
+    from reportlab.platypus import Table, Paragraph
+
+    styles = _pdf_styles()
+    counts = report['counts']
+    # Users without a status (NULL) come last
+    others = sorted((status for status in counts if status not in ('Pending', 'Completed')),
+                    key=lambda status: (status is None, status or ''))
+    statuses = ['Pending', 'Completed'] + others
+    summary = Table(
+        [['Total'] + ['No status' if status is None else status for status in statuses],
+         [str(report['total'])] + [str(counts.get(status, 0)) for status in statuses]],
+        style=styles['summary']
     )
-    
-    title = Paragraph("Service Token Report", title_style)
-    elements.append(title)
-    
-    subtitle = Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal'])
-    elements.append(subtitle)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    data = [['Token', 'Name', 'Email', 'Contact', 'Status']]
-    
-    for user in users:
-        data.append([
-            str(user.token_number),
-            user.name[:20] if len(user.name) > 20 else user.name,
-            user.email[:25] if len(user.email) > 25 else user.email,
-            user.contact_number,
-            user.status
-        ])
-    
-    table = Table(data, colWidths=[0.8*inch, 1.5*inch, 2*inch, 1.2*inch, 1*inch])
-    
-    table.setStyle(TableStyle([
+    summary.spaceAfter = 0.3*INCH
+    return [
+        Paragraph("Service Token Report", styles['title']),
+        Paragraph(f"Generated on: {report['generated_at']}", styles['subtitle']),
+        summary,
+    ]
+
+def _draw_pdf_page(canvas, report, page_number, rows):
+    from reportlab.platypus import Table
+
+    styles = _pdf_styles()
+    top = PDF_PAGE_SIZE[1] - PDF_MARGIN
+    flowables = _pdf_intro(report) if page_number == 1 else []
+    flowables.append(Table([PDF_HEADERS] + rows, colWidths=PDF_COLUMN_WIDTHS, style=styles['table']))
+
+    for flowable in flowables:
+        width, height = flowable.wrapOn(canvas, PDF_CONTENT_WIDTH, PDF_CONTENT_HEIGHT)
+        flowable.drawOn(canvas, (PDF_PAGE_SIZE[0] - width) / 2, top - height)
+        top -= height + flowable.getSpaceAfter()
+
+    canvas.setFont('Helvetica', 8)
+    canvas.drawCentredString(PDF_PAGE_SIZE[0] / 2, PDF_MARGIN / 2, f"Page {page_number} of {report['pages']}")
+    canvas.showPage()
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    # Built once per process and shared by every page
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    table = TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F46E5')),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -99,10 +268,29 @@ def export_to_pdf(users):
         ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
         ('GRID', (0, 0), (-1, -1), 1, colors.black),
         ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    
-    buffer.seek(0)
-    return buffer
+    ])
+    # Cells are single-line strings, so every body row has the same height
+    header_height = Table([PDF_HEADERS], colWidths=PDF_COLUMN_WIDTHS, style=table).wrap(0, 0)[1]
+    row_height = Table([PDF_HEADERS, PDF_HEADERS], colWidths=PDF_COLUMN_WIDTHS, style=table).wrap(0, 0)[1] - header_height
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#4F46E5'),
+            spaceAfter=30,
+            alignment=1
+        ),
+        'subtitle': ParagraphStyle('Subtitle', parent=styles['Normal'], spaceAfter=12),
+        'summary': TableStyle([
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#4F46E5')),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('BOX', (0, 0), (-1, -1), 1, colors.black),
+            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ]),
+        'table': table,
+        'header_height': header_height,
+        'row_height': row_height,
+    }
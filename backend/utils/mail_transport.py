@@ -0,0 +1,136 @@
+import logging
+import queue
+import smtplib
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a pooled connection is thrown away and reopened. SMTP reply
+# errors (4xx/5xx) are OSErrors too but leave the connection usable.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+# How long a sender waits for an idle connection before checking again whether a
+# discarded one has left room to open a new one
+CHECKOUT_WAIT_SECONDS = 1
+
+
+class PooledMailTransport:
+    # Keeps a few long-lived Flask-Mail connections open so we do not pay for a
+    # TCP + TLS + AUTH handshake on every message. Connections are opened lazily,
+    # checked with NOOP after being idle and reopened when the server drops them.
+
+    def __init__(self, mail, size=2, max_idle_seconds=60):
+        self.mail = mail
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open_count = 0
+
+    def send(self, msg):
+        self.send_bulk([msg], raise_errors=True)
+
+    def send_bulk(self, messages, raise_errors=False):
+        # Sends all messages over one connection and returns one error (or None)
+        # per message. A dropped connection is reopened once per message.
+        errors = []
+        try:
+            conn = self._checkout()
+        except Exception:
+            # Opening is retried per message below so each one gets its own error
+            conn = None
+        try:
+            for msg in messages:
+                error = None
+                for attempt in range(2):
+                    try:
+                        if conn is None:
+                            conn = self._checkout()
+                        conn.send(msg)
+                        error = None
+                        break
+                    except CONNECTION_ERRORS as e:
+                        error = e
+                        self._discard(conn)
+                        conn = None
+                    except Exception as e:
+                        error = e
+                        break
+                if error is not None and raise_errors:
+                    raise error
+                errors.append(error)
+        finally:
+            if conn is not None:
+                self._checkin(conn)
+        return errors
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def _open(self):
+        # Opens a connection if the pool has room, else returns None. The slot is
+        # taken before connecting, so concurrent callers never exceed size.
+        with self._lock:
+            if self._open_count >= self.size:
+                return None
+            self._open_count += 1
+        try:
+            conn = self.mail.connect()
+            conn.__enter__()
+        except BaseException:
+            with self._lock:
+                self._open_count -= 1
+            raise
+        return conn
+
+    def _discard(self, conn):
+        if conn is None:
+            return
+        with self._lock:
+            self._open_count -= 1
+        try:
+            conn.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, idle_since = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+                if conn is not None:
+                    return conn
+                try:
+                    conn, idle_since = self._idle.get(timeout=CHECKOUT_WAIT_SECONDS)
+                except queue.Empty:
+                    # Connections that failed are discarded, not checked in: look
+                    # again for room to open one
+                    continue
+
+            if time.monotonic() - idle_since < self.max_idle_seconds or conn.host is None:
+                return conn
+            try:
+                conn.host.noop()
+                return conn
+            except CONNECTION_ERRORS:
+                logger.info("Dropping stale SMTP connection")
+                self._discard(conn)
+
+    def _checkin(self, conn):
+        self._idle.put((conn, time.monotonic()))
+
+
+def init_mail_transport(app, mail):
+    transport = PooledMailTransport(
+        mail,
+        size=app.config.get('MAIL_POOL_SIZE', 2),
+        max_idle_seconds=app.config.get('MAIL_POOL_MAX_IDLE_SECONDS', 60)
+    )
+    app.extensions['mail_transport'] = transport
+    return transport
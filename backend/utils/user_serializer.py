@@ -0,0 +1,86 @@
+from datetime import datetime
+from operator import methodcaller
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from backend.models import User
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bulk serialization of User rows for the admin listing and the exports. Rows are
+# plain column tuples from a Core select, never ORM objects, and formatting is done
+# a column at a time: the datetime columns are converted with one map() each instead
+# of a per-row, per-field isinstance check.
+
+USER_FIELDS = (
+    'id', 'token_number', 'name', 'email', 'address', 'contact_number',
+    'work_description', 'status', 'created_at', 'updated_at', 'reminder_sent'
+)
+DATETIME_FIELDS = ('created_at', 'updated_at')
+USER_BATCH_SIZE = 2000
+
+# 'iso' matches User.to_dict(); 'export' is the '%Y-%m-%d %H:%M:%S' text of the exports
+DATETIME_FORMATS = {
+    'iso': (methodcaller('isoformat'), None),
+    'export': (methodcaller('isoformat', ' ', 'seconds'), ''),
+}
+
+
+def select_users(fields):
+    # Table columns rather than ORM attributes, so results are never hydrated
+    return select(*[User.__table__.c[field] for field in fields])
+
+
+def iter_user_rows(session, fields, batch_size=USER_BATCH_SIZE, offset=0, limit=None):
+    # Batches of rows in token order, streamed with a server-side cursor where the
+    # database has one. Takes a Session or a Connection (e.g. one to the read replica).
+    statement = select_users(fields).order_by(User.token_number)
+    if offset:
+        statement = statement.offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
+    connection = session.connection() if isinstance(session, Session) else session
+    result = connection.execute(statement.execution_options(yield_per=batch_size))
+    for rows in result.partitions():
+        yield rows
+
+
+def format_columns(fields, rows, style='iso'):
+    # Returns the rows as tuples with their datetime columns formatted
+    indices = [index for index, field in enumerate(fields) if field in DATETIME_FIELDS]
+    if not rows or not indices:
+        return rows
+
+    formatter, empty = DATETIME_FORMATS[style]
+    columns = list(zip(*rows))
+    for index in indices:
+        column = columns[index]
+        if None in column:
+            columns[index] = [formatter(value) if value is not None else empty for value in column]
+        else:
+            columns[index] = list(map(formatter, column))
+    return list(zip(*columns))
+
+
+def serialize_users(fields, rows):
+    return [dict(zip(fields, row)) for row in format_columns(fields, rows)]
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
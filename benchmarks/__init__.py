@@ -0,0 +1,4 @@
+# Benchmarks and the tools they share. benchmarks/run.py is the suite: it seeds a
+# database with benchmarks/seed.py and runs the scenarios in benchmarks/scenarios.py
+# against it, mail going to benchmarks/smtp_sink.py, writing the results as JSON.
+# The bench_*.py scripts each measure one change in isolation.
@@ -0,0 +1,71 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select
+
+from backend.models import User
+from backend.services.search_service import install_search_index, search_filter, ranked_search
+from benchmarks.seed import seed_users
+
+# Admin search latency: LIKE '%term%' over three columns vs the FTS5 index, at
+# several table sizes. Each query fetches the first page of 50 like the dashboard.
+#
+#   python benchmarks/bench_admin_search.py --sizes 10000 100000 1000000
+
+TERMS = ['priya', 'pat', 'shah98', 'novak.anna', '9812', 'garcia chen', '4242']
+REPEAT = 5
+
+
+def like_filter(term):
+    like = f"%{term}%"
+    condition = User.name.like(like) | User.email.like(like) | User.contact_number.like(like)
+    if term.isdigit():
+        condition = condition | (User.token_number == int(term))
+    return condition
+
+
+def measure(conn, statement):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        rows = conn.execute(statement).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def run(sizes):
+    columns = [User.id, User.token_number, User.name, User.email, User.contact_number, User.status]
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            started = time.perf_counter()
+            seed_users(engine, size)
+            seeded = time.perf_counter() - started
+            started = time.perf_counter()
+            backend = install_search_index(engine)
+            indexed = time.perf_counter() - started
+            print(f"users={size} (seed {seeded:.1f}s, index build {indexed:.1f}s, backend {backend})")
+            print(f"  {'term':<14} {'LIKE ms':>9} {'FTS ms':>9} {'ranked ms':>10}")
+
+            with engine.connect() as conn:
+                for term in TERMS:
+                    like_ms, _ = measure(conn, select(*columns).where(like_filter(term))
+                                         .order_by(User.token_number.desc()).limit(50))
+                    fts_ms, _ = measure(conn, select(*columns).where(search_filter(term, backend))
+                                        .order_by(User.token_number.desc()).limit(50))
+                    ranked_ms, _ = measure(conn, ranked_search(select(*columns), term, backend).limit(50))
+                    print(f"  {term:<14} {like_ms:9.2f} {fts_ms:9.2f} {ranked_ms:10.2f}")
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+    run(args.sizes)
@@ -0,0 +1,99 @@
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Admin user listing on a large seeded database: the old "load every row and
+# to_dict() it" listing vs keyset pages of /api/admin/users.
+#
+#   python benchmarks/bench_admin_users.py --rows 500000 --pages 20
+
+
+def build_app(db_path):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+    return create_app(BenchConfig)
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed * 1000, peak / 1024 / 1024
+
+
+def run(db_path, rows, pages, limit, fields):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import func
+    from backend.models import db, User
+    from benchmarks.seed import seed_users
+
+    app = build_app(db_path)
+    with app.app_context():
+        existing = db.session.query(func.count(User.id)).scalar() if os.path.exists(db_path) and os.path.getsize(db_path) else 0
+        if existing < rows:
+            started = time.perf_counter()
+            db.create_all()
+            seed_users(db.engine, rows - existing)
+            print(f"seeded {rows - existing} users in {time.perf_counter() - started:.1f}s")
+        token = create_access_token(identity='bench')
+
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+    print(f"rows={rows} limit={limit} fields={fields or 'all'}")
+
+    cursor = None
+    for page in range(1, pages + 1):
+        params = {'limit': limit}
+        if fields:
+            params['fields'] = fields
+        if cursor:
+            params['cursor'] = cursor
+        response, elapsed, peak = timed(lambda: client.get('/api/admin/users', query_string=params, headers=headers))
+        body = response.get_json()
+        print(f"  page {page:<3} ({len(body['users'])} rows)          {elapsed:9.1f} ms  peak alloc {peak:8.1f} MB  max RSS {rss_mb():7.1f} MB")
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+
+    # Last, because max RSS never goes back down
+    def legacy_listing():
+        with app.app_context():
+            users = User.query.order_by(User.token_number.desc()).all()
+            return [user.to_dict() for user in users]
+
+    _, elapsed, peak = timed(legacy_listing)
+    print(f"  legacy .all() + to_dict()      {elapsed:9.1f} ms  peak alloc {peak:8.1f} MB  max RSS {rss_mb():7.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--pages', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--fields', default='')
+    parser.add_argument('--db', help='reuse a seeded SQLite file between runs')
+    args = parser.parse_args()
+
+    if args.db:
+        run(os.path.abspath(args.db), args.rows, args.pages, args.limit, args.fields)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(os.path.join(tmp, 'bench.db'), args.rows, args.pages, args.limit, args.fields)
+
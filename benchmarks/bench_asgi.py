@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# /api/submit and /api/next-token under many concurrent clients, served three ways
+# from a fresh SQLite file each: gunicorn sync workers (the Render setup), gunicorn
+# gthread workers, and uvicorn serving backend.asgi. Each client opens a connection
+# per request (Connection: close) and submits or asks for the next token at random
+# for --seconds; the clients run in this process on an asyncio loop. Requests/s
+# count successful responses only; latencies are per request, in ms, overall and
+# per endpoint.
+#
+#   python benchmarks/bench_asgi.py --clients 500 --seconds 20 --workers 2
+
+SERVERS = ('gunicorn-sync', 'gunicorn-gthread', 'uvicorn')
+
+PAYLOAD = json.dumps({
+    'name': 'Bench User',
+    'email': 'bench@example.com',
+    'address': '1 Bench Street',
+    'contact_number': '555-0100',
+    'work_description': 'Benchmark submission'
+}).encode()
+
+
+def bench_config():
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        MAIL_SUPPRESS_SEND = True
+
+    return BenchConfig
+
+
+def bench_wsgi_app():
+    from backend.app import create_app
+    return create_app(bench_config())
+
+
+def bench_asgi_app():
+    from backend.asgi import create_asgi_app
+    return create_asgi_app(bench_config())
+
+
+def server_command(server, port, workers):
+    bind = f'127.0.0.1:{port}'
+    if server == 'gunicorn-sync':
+        return ['gunicorn', '--bind', bind, '--workers', str(workers),
+                'benchmarks.bench_asgi:bench_wsgi_app()']
+    if server == 'gunicorn-gthread':
+        return ['gunicorn', '--bind', bind, '--workers', str(workers), '--threads', '16',
+                '--worker-class', 'gthread', 'benchmarks.bench_asgi:bench_wsgi_app()']
+    return ['uvicorn', '--factory', 'benchmarks.bench_asgi:bench_asgi_app', '--host', '127.0.0.1',
+            '--port', str(port), '--workers', str(workers), '--log-level', 'warning', '--no-access-log']
+
+
+async def http_request(port, method, path, body=b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        headers = f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n'
+        if body:
+            headers += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+        writer.write(headers.encode() + b'\r\n' + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def client(port, deadline, submit_ratio, results):
+    while time.perf_counter() < deadline:
+        submit = random.random() < submit_ratio
+        started = time.perf_counter()
+        try:
+            if submit:
+                status = await http_request(port, 'POST', '/api/submit', PAYLOAD)
+            else:
+                status = await http_request(port, 'GET', '/api/next-token')
+        except (OSError, IndexError, ValueError):
+            status = None
+        expected = 201 if submit else 200
+        if status == expected:
+            results['submit' if submit else 'next-token'].append((time.perf_counter() - started) * 1000)
+        else:
+            results['failures'] += 1
+
+
+async def drive(port, clients, seconds, submit_ratio):
+    results = {'submit': [], 'next-token': [], 'failures': 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*[client(port, deadline, submit_ratio, results) for _ in range(clients)])
+    return results
+
+
+async def wait_until_up(port, process, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if await http_request(port, 'GET', '/api/health') == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def run_server(tmp, server, port, args):
+    db_path = os.path.join(tmp, f'{server}.db')
+    env = dict(os.environ, PYTHONPATH=ROOT, DATABASE_URL=f'sqlite:///{db_path}',
+               EXPORT_DIR=os.path.join(tmp, 'exports'))
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'backend.app', 'init-db'],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    process = subprocess.Popen(server_command(server, port, args.workers), cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_until_up(port, process))
+        asyncio.run(drive(port, 20, 2, args.submit_ratio))
+        results = asyncio.run(drive(port, args.clients, args.seconds, args.submit_ratio))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=30)
+
+    columns = []
+    for latencies in (results['submit'] + results['next-token'], results['submit'], results['next-token']):
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+        columns.append(f"{statistics.median(latencies) if latencies else 0:9.1f} {p99:9.1f}")
+    total = len(results['submit']) + len(results['next-token'])
+    print(f"  {server:<17} {total / args.seconds:9.1f} {results['failures']:9d} {'  '.join(columns)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--seconds', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--submit-ratio', type=float, default=0.5)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    args = parser.parse_args()
+
+    print(f"clients={args.clients} seconds={args.seconds} workers={args.workers} "
+          f"submit ratio={args.submit_ratio}")
+    print(f"  {'':<17} {'':>9} {'':>9} {'all requests':>19}  {'submit':>19}  {'next-token':>19}")
+    print(f"  {'server':<17} {'req/s':>9} {'failed':>9}" + f"  {'p50 ms':>9} {'p99 ms':>9}" * 3)
+    with tempfile.TemporaryDirectory() as tmp:
+        for server in args.servers:
+            run_server(tmp, server, args.port, args)
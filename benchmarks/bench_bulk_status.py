@@ -0,0 +1,107 @@
+import argparse
+import logging
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Marking a batch of Pending users Completed on a seeded database: one PUT per user
+# (/api/admin/users/<id>) vs one bulk request by ids and by token range
+# (/api/admin/users/status). Each run uses a fresh copy of the seeded file, and every
+# variant must end with the same counters. Times are per batch, in ms.
+#
+#   python benchmarks/bench_bulk_status.py --rows 100000 --batch 200 --runs 5
+
+VARIANTS = ('put-loop', 'bulk-ids', 'bulk-range')
+
+
+def build_app(db_path):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        MAIL_SUPPRESS_SEND = True
+
+    return create_app(BenchConfig)
+
+
+def run_variant(db_path, variant, batch):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+    from backend.models import db, User
+
+    app = build_app(db_path)
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="bench")}'}
+        # The oldest Pending tokens, as a day's finished jobs would be
+        users = db.session.execute(
+            select(User.id, User.token_number).where(User.status == 'Pending')
+            .order_by(User.token_number).limit(batch)
+        ).all()
+
+    started = time.perf_counter()
+    if variant == 'put-loop':
+        for user in users:
+            assert client.put(f'/api/admin/users/{user.id}', json={'status': 'Completed'},
+                              headers=headers).status_code == 200
+    elif variant == 'bulk-ids':
+        response = client.put('/api/admin/users/status', headers=headers,
+                              json={'status': 'Completed', 'ids': [user.id for user in users]})
+        assert response.get_json()['updated'] == len(users)
+    else:
+        # The range also holds already completed tokens, which are left alone
+        response = client.put('/api/admin/users/status', headers=headers, json={
+            'status': 'Completed', 'token_from': users[0].token_number, 'token_to': users[-1].token_number
+        })
+        assert response.get_json()['updated'] == len(users)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    stats = client.get('/api/admin/stats', headers=headers).get_json()['stats']
+    app.extensions['export_jobs'].stop()
+    return elapsed, stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from backend.app import setup_database
+    from backend.models import db
+    from benchmarks.seed import seed_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seeded = os.path.join(tmp, 'seeded.db')
+        engine = create_engine(f'sqlite:///{seeded}')
+        seed_users(engine, args.rows)
+        engine.dispose()
+        app = build_app(seeded)
+        setup_database(app)
+        with app.app_context():
+            # Closing the last connection checkpoints the WAL into the file we copy
+            db.engine.dispose()
+        logging.disable(logging.CRITICAL)
+
+        print(f"rows={args.rows} batch={args.batch} runs={args.runs}")
+        print(f"  {'variant':<11} {'median ms':>10} {'min ms':>10} {'ms/user':>10}  end state")
+        for variant in VARIANTS:
+            timings, end_states = [], set()
+            for run in range(args.runs):
+                db_path = os.path.join(tmp, f'{variant}-{run}.db')
+                shutil.copy(seeded, db_path)
+                elapsed, stats = run_variant(db_path, variant, args.batch)
+                timings.append(elapsed)
+                end_states.add(tuple(sorted(stats.items())))
+                os.remove(db_path)
+            median = statistics.median(timings)
+            print(f"  {variant:<11} {median:10.1f} {min(timings):10.1f} {median / args.batch:10.3f}  "
+                  f"{dict(end_states.pop()) if len(end_states) == 1 else 'differs between runs'}")
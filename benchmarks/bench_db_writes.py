@@ -0,0 +1,150 @@
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# SQLite write throughput for /api/submit with and without the connection pragmas:
+# the default rollback journal with synchronous=FULL vs WAL with synchronous=NORMAL
+# and a busy timeout. Writer processes (like gunicorn workers) submit for --seconds
+# while reader processes page through the admin listing, on a fresh seeded file per
+# variant. Latencies are per submit, in ms.
+#
+#   python benchmarks/bench_db_writes.py --writers 4 --readers 2 --seconds 20
+
+VARIANTS = ('default', 'tuned')
+
+
+def build_app(db_path, variant):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLALCHEMY_BINDS = {}
+        SQLITE_PRAGMAS = Config.SQLITE_PRAGMAS if variant == 'tuned' else {}
+        MAIL_SUPPRESS_SEND = True
+
+    return create_app(BenchConfig)
+
+
+def writer(db_path, variant, seconds, start_event, results):
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    app = build_app(db_path, variant)
+    client = app.test_client()
+    payload = {
+        'name': 'Bench User',
+        'email': 'bench@example.com',
+        'address': '1 Bench Street',
+        'contact_number': '555-0100',
+        'work_description': 'Benchmark submission'
+    }
+    latencies, failures = [], 0
+    start_event.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = client.post('/api/submit', json=payload)
+        if response.status_code == 201:
+            latencies.append((time.perf_counter() - started) * 1000)
+        else:
+            failures += 1
+    results.put(('writer', latencies, failures))
+
+
+def reader(db_path, variant, seconds, start_event, results):
+    from backend.models import db, User
+    from backend.utils.user_serializer import USER_FIELDS, select_users
+
+    app = build_app(db_path, variant)
+    query = select_users(USER_FIELDS).order_by(User.token_number.desc()).limit(50)
+    pages, failures = 0, 0
+    start_event.wait()
+    deadline = time.perf_counter() + seconds
+    with app.app_context():
+        while time.perf_counter() < deadline:
+            try:
+                with db.engine.connect() as conn:
+                    # A listing walked page by page inside one read transaction
+                    cursor = None
+                    for _ in range(20):
+                        page = query if cursor is None else query.where(User.token_number < cursor)
+                        rows = conn.execute(page).all()
+                        cursor = rows[-1].token_number
+                    pages += 20
+            except Exception:
+                failures += 1
+    results.put(('reader', pages, failures))
+
+
+def run_variant(tmp, variant, writers, readers, seconds, seed_rows):
+    from sqlalchemy import create_engine
+    from backend.app import setup_database
+    from backend.models import db
+    from benchmarks.seed import seed_users
+
+    db_path = os.path.join(tmp, f'{variant}.db')
+    engine = create_engine(f'sqlite:///{db_path}')
+    seed_users(engine, seed_rows)
+    engine.dispose()
+    app = build_app(db_path, variant)
+    setup_database(app)
+    with app.app_context():
+        journal_mode = db.session.connection().exec_driver_sql('PRAGMA journal_mode').scalar()
+        db.session.remove()
+        db.engine.dispose()
+
+    start_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=writer, args=(db_path, variant, seconds, start_event, results))
+        for _ in range(writers)
+    ] + [
+        multiprocessing.Process(target=reader, args=(db_path, variant, seconds, start_event, results))
+        for _ in range(readers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(1)
+    start_event.set()
+
+    latencies, write_failures, pages, read_failures = [], 0, 0, 0
+    for _ in processes:
+        kind, value, failures = results.get()
+        if kind == 'writer':
+            latencies.extend(value)
+            write_failures += failures
+        else:
+            pages += value
+            read_failures += failures
+    for process in processes:
+        process.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    print(f"  {variant:<8} {journal_mode:<8} {len(latencies) / seconds:9.1f} {write_failures:9d} "
+          f"{statistics.median(latencies) if latencies else 0:9.1f} {p99:9.1f} "
+          f"{pages / seconds:9.1f} {read_failures:9d}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--seconds', type=int, default=20)
+    parser.add_argument('--seed-rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"writers={args.writers} readers={args.readers} seconds={args.seconds} seeded rows={args.seed_rows}")
+    print(f"  {'variant':<8} {'journal':<8} {'writes/s':>9} {'failed':>9} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'pages/s':>9} {'failed':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for variant in VARIANTS:
+            run_variant(tmp, variant, args.writers, args.readers, args.seconds, args.seed_rows)
@@ -0,0 +1,81 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.utils.email_templates import load_email_templates, render_email
+
+# Email body rendering: the old per-call f-string (HTML only, unescaped) vs the
+# precompiled Jinja templates (escaped HTML plus text/plain part).
+#
+#   python benchmarks/bench_email_render.py --messages 10000
+
+
+def legacy_confirmation_html(user_data):
+    # Copy of the f-string body send_confirmation_email used before the templates
+    return f"""
+            <html>
+                <body style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+                    <div style="background-color: #4F46E5; color: white; padding: 20px; border-radius: 8px 8px 0 0;">
+                        <h1 style="margin: 0;">Service Request Confirmed</h1>
+                    </div>
+                    <div style="background-color: #f9fafb; padding: 30px; border: 1px solid #e5e7eb; border-radius: 0 0 8px 8px;">
+                        <h2 style="color: #1f2937;">Hello {user_data['name']},</h2>
+                        <p style="color: #4b5563; font-size: 16px;">Your service request has been successfully registered!</p>
+
+                        <div style="background-color: white; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4F46E5;">
+                            <h3 style="margin-top: 0; color: #4F46E5;">Token Number: #{user_data['token_number']}</h3>
+                            <p style="margin: 5px 0;"><strong>Name:</strong> {user_data['name']}</p>
+                            <p style="margin: 5px 0;"><strong>Email:</strong> {user_data['email']}</p>
+                            <p style="margin: 5px 0;"><strong>Contact:</strong> {user_data['contact_number']}</p>
+                            <p style="margin: 5px 0;"><strong>Address:</strong> {user_data['address']}</p>
+                            <p style="margin: 5px 0;"><strong>Work Description:</strong> {user_data['work_description']}</p>
+                        </div>
+
+                        <p style="color: #6b7280;">Please keep this token number for your records. We will contact you soon regarding your service.</p>
+
+                        <p style="color: #9ca3af; font-size: 14px; margin-top: 30px;">Thank you for choosing our service!</p>
+                    </div>
+                </body>
+            </html>
+            """
+
+
+def make_users(count):
+    return [
+        {
+            'token_number': i,
+            'name': f'User <{i}> & Sons',
+            'email': f'user{i}@example.com',
+            'contact_number': '555-0100',
+            'address': f'{i} Bench Street',
+            'work_description': 'Replace the "main" valve & check pressure'
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label, users, render):
+    started = time.perf_counter()
+    for user_data in users:
+        render(user_data)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed * 1000:8.1f} ms  ({len(users) / elapsed:9.0f} msg/s)")
+
+
+def run(count):
+    users = make_users(count)
+    started = time.perf_counter()
+    load_email_templates()
+    print(f"messages={count} (template compile: {(time.perf_counter() - started) * 1000:.1f} ms, once per process)")
+    measure('legacy f-string (html only)', users, legacy_confirmation_html)
+    measure('jinja templates (html + text)', users, lambda user_data: render_email('confirmation', user_data))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=10000)
+    args = parser.parse_args()
+    run(args.messages)
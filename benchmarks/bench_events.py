@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Cost of idle /api/events subscribers on one uvicorn worker serving backend.asgi:
+# the worker's RSS and CPU time before and after --subscribers clients connect and
+# sit idle for --idle seconds (keepalives included), then the fan-out latency from
+# a submit's response to its token-created event reaching every subscriber.
+#
+#   python benchmarks/bench_events.py --subscribers 1000 --idle 30 --events 20
+
+PAYLOAD = json.dumps({
+    'name': 'Bench User',
+    'email': 'bench@example.com',
+    'address': '1 Bench Street',
+    'contact_number': '555-0100',
+    'work_description': 'Benchmark submission'
+}).encode()
+
+
+def process_stats(pid):
+    # (RSS in MB, CPU seconds used so far)
+    with open(f'/proc/{pid}/status') as status:
+        rss_kb = next(int(line.split()[1]) for line in status if line.startswith('VmRSS:'))
+    with open(f'/proc/{pid}/stat') as stat:
+        fields = stat.read().rsplit(')', 1)[1].split()
+    ticks = int(fields[11]) + int(fields[12])
+    return rss_kb / 1024, ticks / os.sysconf('SC_CLK_TCK')
+
+
+async def http_request(port, method, path, body=b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        headers = f'{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n'
+        if body:
+            headers += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+        writer.write(headers.encode() + b'\r\n' + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1]), response.split(b'\r\n\r\n', 1)[1]
+
+
+async def subscribe(port, received, connected):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(b'GET /api/events HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n')
+    await writer.drain()
+    await reader.readuntil(b'\r\n\r\n')
+    connected.append(writer)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            if line.startswith(b'data: ') and b'"token_number"' in line:
+                token_number = json.loads(line[6:])['token_number']
+                received.setdefault(token_number, []).append(time.perf_counter())
+    except (OSError, asyncio.CancelledError):
+        pass
+
+
+async def wait_until_up(port, process, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if (await http_request(port, 'GET', '/api/health'))[0] == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+async def run(port, pid, args):
+    await asyncio.sleep(1)
+    rss_before, cpu_before = process_stats(pid)
+
+    received, connected = {}, []
+    started = time.perf_counter()
+    tasks = [asyncio.ensure_future(subscribe(port, received, connected)) for _ in range(args.subscribers)]
+    while len(connected) < args.subscribers:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - started
+    await asyncio.sleep(1)
+    rss_connected, cpu_connected = process_stats(pid)
+
+    await asyncio.sleep(args.idle)
+    rss_idle, cpu_idle = process_stats(pid)
+
+    latencies, fanouts = [], []
+    for _ in range(args.events):
+        sent = time.perf_counter()
+        status, body = await http_request(port, 'POST', '/api/submit', PAYLOAD)
+        token_number = json.loads(body)['token_number']
+        while len(received.get(token_number, [])) < args.subscribers:
+            await asyncio.sleep(0.001)
+        arrivals = received[token_number]
+        latencies.extend((arrival - sent) * 1000 for arrival in arrivals)
+        fanouts.append((max(arrivals) - sent) * 1000)
+        await asyncio.sleep(0.2)
+
+    for writer in connected:
+        writer.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    print(f"subscribers={args.subscribers} idle={args.idle}s events={args.events}")
+    print(f"  connect all subscribers     {connect_seconds * 1000:9.0f} ms")
+    print(f"  worker RSS before           {rss_before:9.1f} MB")
+    print(f"  worker RSS connected        {rss_connected:9.1f} MB  ({(rss_connected - rss_before) * 1024 / args.subscribers:.1f} KB per subscriber)")
+    print(f"  worker RSS after idle       {rss_idle:9.1f} MB")
+    print(f"  worker CPU while idle       {(cpu_idle - cpu_connected) / args.idle * 100:9.2f} %  "
+          f"({cpu_idle - cpu_connected:.2f} s over {args.idle} s)")
+    print(f"  delivery p50 / p99          {statistics.median(latencies):9.1f} / {latencies[int(len(latencies) * 0.99)]:.1f} ms "
+          f"(submit sent to event received)")
+    print(f"  fan-out to all, median      {statistics.median(fanouts):9.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--idle', type=int, default=30)
+    parser.add_argument('--events', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    # Two sockets per subscriber (client and server end), inherited by the server
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=ROOT, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'events.db')}",
+                   EXPORT_DIR=os.path.join(tmp, 'exports'), EVENTS_MAX_SUBSCRIBERS=str(args.subscribers + 10))
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'backend.app', 'init-db'],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+        # One worker, so the uvicorn process is the worker being measured
+        process = subprocess.Popen(
+            ['uvicorn', '--factory', 'benchmarks.bench_asgi:bench_asgi_app', '--host', '127.0.0.1',
+             '--port', str(args.port), '--log-level', 'warning', '--no-access-log', '--timeout-graceful-shutdown', '5'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            asyncio.run(wait_until_up(args.port, process))
+            asyncio.run(run(args.port, process.pid, args))
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
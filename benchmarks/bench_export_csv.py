@@ -0,0 +1,128 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# CSV export on a large seeded database: the old pandas export (every User loaded,
+# then a DataFrame, then the whole file in a BytesIO) vs the streamed response. Each
+# variant runs in its own process so max RSS is measured separately. The legacy
+# variant needs pandas, which is no longer in requirements.txt.
+#
+#   python benchmarks/bench_export_csv.py --rows 1000000
+
+
+def build_app(db_path):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+    return create_app(BenchConfig)
+
+
+def legacy_export(users):
+    # export_to_csv as it was before streaming
+    import pandas as pd
+    from io import BytesIO
+
+    data = []
+    for user in users:
+        data.append({
+            'Token Number': user.token_number,
+            'Name': user.name,
+            'Email': user.email,
+            'Contact Number': user.contact_number,
+            'Address': user.address,
+            'Work Description': user.work_description,
+            'Status': user.status,
+            'Created At': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
+            'Updated At': user.updated_at.strftime('%Y-%m-%d %H:%M:%S') if user.updated_at else ''
+        })
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    df.to_csv(output, index=False, encoding='utf-8')
+    output.seek(0)
+    return output
+
+
+def measure(db_path, variant, results):
+    from flask_jwt_extended import create_access_token
+    from backend.models import User
+
+    app = build_app(db_path)
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+
+    if variant == 'legacy':
+        with app.app_context():
+            output = legacy_export(User.query.order_by(User.token_number).all())
+            first_byte = time.perf_counter() - started
+            size = len(output.getvalue())
+    else:
+        with app.app_context():
+            token = create_access_token(identity='bench')
+        response = app.test_client().get(
+            '/api/admin/export/csv',
+            headers={'Authorization': f'Bearer {token}'},
+            buffered=False
+        )
+        for chunk in response.response:
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+        response.close()
+
+    results[variant] = {
+        'first_byte_ms': first_byte * 1000,
+        'total_s': time.perf_counter() - started,
+        'mb': size / 1024 / 1024,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(db_path, rows):
+    from sqlalchemy import create_engine, func, select
+    from backend.models import User
+    from benchmarks.seed import seed_users
+
+    engine = create_engine(f'sqlite:///{db_path}')
+    existing = 0
+    if os.path.exists(db_path) and os.path.getsize(db_path):
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count(User.id))).scalar()
+    if existing < rows:
+        started = time.perf_counter()
+        seed_users(engine, rows - existing)
+        print(f"seeded {rows - existing} users in {time.perf_counter() - started:.1f}s")
+    engine.dispose()
+
+    print(f"rows={rows}")
+    print(f"  {'variant':<10} {'first byte':>12} {'total':>9} {'size':>9} {'max RSS':>10}")
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        for variant in ('streamed', 'legacy'):
+            process = multiprocessing.Process(target=measure, args=(db_path, variant, results))
+            process.start()
+            process.join()
+            r = results[variant]
+            print(f"  {variant:<10} {r['first_byte_ms']:9.1f} ms {r['total_s']:7.1f} s {r['mb']:6.1f} MB {r['max_rss_mb']:7.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--db', help='reuse a seeded SQLite file between runs')
+    args = parser.parse_args()
+
+    if args.db:
+        run(os.path.abspath(args.db), args.rows)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(os.path.join(tmp, 'bench.db'), args.rows)
@@ -0,0 +1,115 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.bench_export_csv import build_app
+
+# Excel export on a large seeded database: the old pandas export (list of dicts, a
+# DataFrame, then pd.ExcelWriter holding the whole workbook in memory) vs the
+# write-only openpyxl export. Each variant runs in its own process so max RSS is
+# measured separately. The legacy variant needs pandas, which is no longer in
+# requirements.txt.
+#
+#   python benchmarks/bench_export_excel.py --sizes 100000 1000000
+
+
+def legacy_export(users):
+    # export_to_excel as it was before the write-only workbook
+    import pandas as pd
+    from io import BytesIO
+
+    data = []
+    for user in users:
+        data.append({
+            'Token Number': user.token_number,
+            'Name': user.name,
+            'Email': user.email,
+            'Contact Number': user.contact_number,
+            'Address': user.address,
+            'Work Description': user.work_description,
+            'Status': user.status,
+            'Created At': user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
+            'Updated At': user.updated_at.strftime('%Y-%m-%d %H:%M:%S') if user.updated_at else ''
+        })
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Service Tokens')
+    output.seek(0)
+    return output
+
+
+def measure(db_path, variant, results):
+    from flask_jwt_extended import create_access_token
+    from backend.models import User
+
+    app = build_app(db_path)
+    started = time.perf_counter()
+    size = 0
+
+    if variant == 'legacy':
+        with app.app_context():
+            output = legacy_export(User.query.order_by(User.token_number).all())
+            size = len(output.getvalue())
+    else:
+        with app.app_context():
+            token = create_access_token(identity='bench')
+        response = app.test_client().get(
+            '/api/admin/export/excel',
+            headers={'Authorization': f'Bearer {token}'},
+            buffered=False
+        )
+        for chunk in response.response:
+            size += len(chunk)
+        response.close()
+
+    results[variant] = {
+        'total_s': time.perf_counter() - started,
+        'mb': size / 1024 / 1024,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(tmp, sizes, variants):
+    from sqlalchemy import create_engine
+    from benchmarks.seed import seed_users
+
+    for rows in sizes:
+        db_path = os.path.join(tmp, f'bench_{rows}.db')
+        if not os.path.exists(db_path):
+            engine = create_engine(f'sqlite:///{db_path}')
+            seed_users(engine, rows)
+            engine.dispose()
+
+        print(f"rows={rows}")
+        print(f"  {'variant':<10} {'total':>9} {'rows/s':>10} {'size':>9} {'max RSS':>10}")
+        with multiprocessing.Manager() as manager:
+            results = manager.dict()
+            for variant in variants:
+                process = multiprocessing.Process(target=measure, args=(db_path, variant, results))
+                process.start()
+                process.join()
+                r = results[variant]
+                print(f"  {variant:<10} {r['total_s']:7.1f} s {rows / r['total_s']:10.0f} {r['mb']:6.1f} MB {r['max_rss_mb']:7.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--skip-legacy', action='store_true', help='the legacy export needs several GB at 1M rows')
+    parser.add_argument('--dir', help='keep seeded SQLite files here between runs')
+    args = parser.parse_args()
+
+    variants = ['write_only'] if args.skip_legacy else ['write_only', 'legacy']
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        run(os.path.abspath(args.dir), args.sizes, variants)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(tmp, args.sizes, variants)
@@ -0,0 +1,130 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# PDF export on a seeded database: the old single-Table SimpleDocTemplate report vs the
+# page-by-page renderer, serially and split across processes. Each variant runs in its
+# own process so max RSS is measured separately; for the parallel variant it is the
+# parent's, children render into temp files.
+#
+#   python benchmarks/bench_export_pdf.py --sizes 10000 100000 --workers 4
+
+
+def legacy_export(users):
+    # export_to_pdf as it was before page-by-page rendering
+    from io import BytesIO
+    from datetime import datetime
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.units import inch
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch)
+    elements = []
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24,
+                                 textColor=colors.HexColor('#4F46E5'), spaceAfter=30, alignment=1)
+    elements.append(Paragraph("Service Token Report", title_style))
+    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    data = [['Token', 'Name', 'Email', 'Contact', 'Status']]
+    for user in users:
+        data.append([str(user.token_number), user.name[:20], user.email[:25], user.contact_number, user.status])
+    table = Table(data, colWidths=[0.8*inch, 1.5*inch, 2*inch, 1.2*inch, 1*inch])
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4F46E5')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+    ]))
+    elements.append(table)
+    doc.build(elements)
+    buffer.seek(0)
+    return buffer, doc.page
+
+
+def measure(database_uri, variant, workers, results):
+    from io import BytesIO
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from backend.models import User
+    from backend.utils.export_service import export_to_pdf, export_to_pdf_parallel, plan_pdf_report
+
+    engine = create_engine(database_uri)
+    started = time.perf_counter()
+    with Session(engine) as session:
+        if variant == 'legacy':
+            output, pages = legacy_export(session.scalars(select(User).order_by(User.token_number)).all())
+        elif variant == 'chunked':
+            pages = plan_pdf_report(session)['pages']
+            output = export_to_pdf(session)
+        else:
+            pages = plan_pdf_report(session)['pages']
+            output = export_to_pdf_parallel(database_uri, BytesIO(), workers)
+
+    results[variant] = {
+        'total_s': time.perf_counter() - started,
+        'pages': pages,
+        'mb': len(output.getvalue()) / 1024 / 1024,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(tmp, sizes, variants, workers):
+    from sqlalchemy import create_engine
+    from benchmarks.seed import seed_users
+
+    for rows in sizes:
+        db_path = os.path.join(tmp, f'bench_{rows}.db')
+        if not os.path.exists(db_path):
+            engine = create_engine(f'sqlite:///{db_path}')
+            seed_users(engine, rows)
+            engine.dispose()
+
+        print(f"rows={rows}")
+        print(f"  {'variant':<14} {'total':>9} {'pages':>7} {'pages/s':>9} {'size':>9} {'max RSS':>10}")
+        with multiprocessing.Manager() as manager:
+            results = manager.dict()
+            for variant in variants:
+                process = multiprocessing.Process(target=measure, args=(f'sqlite:///{db_path}', variant, workers, results))
+                process.start()
+                process.join()
+                r = results[variant]
+                label = f'parallel x{workers}' if variant == 'parallel' else variant
+                print(f"  {label:<14} {r['total_s']:7.1f} s {r['pages']:7d} {r['pages'] / r['total_s']:9.1f} "
+                      f"{r['mb']:6.1f} MB {r['max_rss_mb']:7.1f} MB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--skip-legacy', action='store_true')
+    parser.add_argument('--dir', help='keep seeded SQLite files here between runs')
+    args = parser.parse_args()
+
+    variants = ['chunked', 'parallel'] if args.skip_legacy else ['chunked', 'parallel', 'legacy']
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        run(os.path.abspath(args.dir), args.sizes, variants, args.workers)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(tmp, args.sizes, variants, args.workers)
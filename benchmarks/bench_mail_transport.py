@@ -0,0 +1,96 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.smtp_sink import SMTPSink
+
+# Mail throughput against a local SMTP sink: one connection per message (plain
+# mail.send) vs the pooled transport, single-message and bulk.
+#
+#   python benchmarks/bench_mail_transport.py --messages 2000 --pool-size 4
+
+
+def build_app(sink, pool_size):
+    from flask import Flask
+    from flask_mail import Mail
+    from backend.config import Config
+    from backend.utils.mail_transport import init_mail_transport
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(MAIL_SERVER=sink.host, MAIL_PORT=sink.port, MAIL_USE_TLS=False,
+                      MAIL_USERNAME='', MAIL_PASSWORD='', MAIL_POOL_SIZE=pool_size)
+    mail = Mail(app)
+    init_mail_transport(app, mail)
+    return app, mail
+
+
+def make_messages(count):
+    from backend.utils.email_service import build_confirmation_email
+
+    return [
+        build_confirmation_email({
+            'token_number': i,
+            'name': f'User {i}',
+            'email': f'user{i}@example.com',
+            'contact_number': '555-0100',
+            'address': '1 Bench Street',
+            'work_description': 'Benchmark message'
+        })
+        for i in range(count)
+    ]
+
+
+def measure(label, sink, count, send):
+    sink.messages.clear()
+    sink.connections = 0
+    started = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - started
+    assert len(sink.messages) == count, f"{label}: sink got {len(sink.messages)} of {count}"
+    print(f"  {label:<28} {count / elapsed:8.1f} msg/s  over {sink.connections} connections")
+
+
+def run(count, pool_size):
+    with SMTPSink() as sink:
+        app, mail = build_app(sink, pool_size)
+        transport = app.extensions['mail_transport']
+        chunk = max(1, count // pool_size)
+
+        with app.app_context():
+            messages = make_messages(count)
+            print(f"messages={count} pool_size={pool_size}")
+
+            def per_message_connection():
+                for msg in messages:
+                    mail.send(msg)
+
+            def pooled_single():
+                for msg in messages:
+                    transport.send(msg)
+
+            def pooled_bulk():
+                def worker(batch):
+                    with app.app_context():
+                        transport.send_bulk(batch)
+                with ThreadPoolExecutor(pool_size) as pool:
+                    list(pool.map(worker, [messages[i:i + chunk] for i in range(0, count, chunk)]))
+
+            measure('mail.send (new connection)', sink, count, per_message_connection)
+            transport.close()
+            measure('pooled send', sink, count, pooled_single)
+            transport.close()
+            measure('pooled send_bulk', sink, count, pooled_bulk)
+            transport.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+    run(args.messages, args.pool_size)
@@ -0,0 +1,87 @@
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Cost of the request instrumentation: the same requests against an app with
+# METRICS_ENABLED off and on (latency histograms plus per-request query counting),
+# and with a request profiled by the sampling profiler. The disabled app runs first,
+# because the query hooks, once installed, are process-wide. Times are per request,
+# in microseconds.
+#
+#   python benchmarks/bench_metrics.py --rows 10000 --requests 2000
+
+ROUTES = ('/api/token/{token}', '/api/admin/stats', '/api/admin/users?limit=50')
+
+
+def build_app(db_path, **settings):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        MAIL_SUPPRESS_SEND = True
+        TOKEN_LOOKUP_RATE_LIMIT = 0
+        RESPONSE_CACHE_TTL_SECONDS = 0
+
+    for name, value in settings.items():
+        setattr(BenchConfig, name, value)
+    return create_app(BenchConfig)
+
+
+def measure(app, route, count, headers):
+    from flask_jwt_extended import create_access_token
+    client = app.test_client()
+    with app.app_context():
+        headers = dict(headers, Authorization=f'Bearer {create_access_token(identity="bench")}')
+    path = route.format(token=count // 2 or 1)
+    client.get(path, headers=headers)
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        assert client.get(path, headers=headers).status_code == 200
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from backend.app import setup_database
+    from benchmarks.seed import seed_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        engine = create_engine(f'sqlite:///{db_path}')
+        seed_users(engine, args.rows)
+        engine.dispose()
+        setup_database(build_app(db_path))
+        logging.disable(logging.CRITICAL)
+
+        variants = (
+            ('metrics off', build_app(db_path, METRICS_ENABLED=False), {}),
+            ('metrics on', build_app(db_path), {}),
+            ('profiled', build_app(db_path, PROFILER_ENABLED=True, METRICS_TOKEN='bench'),
+             {'X-Profile': '1', 'Authorization': 'Bearer bench'}),
+        )
+        results = {route: {} for route in ROUTES}
+        for label, app, headers in variants:
+            for route in ROUTES:
+                results[route][label] = measure(app, route, args.requests, headers)
+            app.extensions['export_jobs'].stop()
+
+        print(f"rows={args.rows} requests={args.requests}, median us per request")
+        print(f"  {'route':<28}" + ''.join(f"{label:>14}" for label, _, _ in variants) + f"{'overhead':>12}")
+        for route in ROUTES:
+            row = results[route]
+            overhead = row['metrics on'] - row['metrics off']
+            print(f"  {route:<28}" + ''.join(f"{row[label]:14.1f}" for label, _, _ in variants) + f"{overhead:12.1f}")
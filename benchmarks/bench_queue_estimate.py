@@ -0,0 +1,78 @@
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Public queue lookups (/api/queue/<token>) on a seeded database, for tokens at the
+# front, middle and back of the Pending queue (the tokens-ahead count grows with
+# the position), and the reminder sweep that runs after every completion. Times are
+# per call, in ms.
+#
+#   python benchmarks/bench_queue_estimate.py --rows 100000 --lookups 200
+
+
+def build_app(db_path):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        MAIL_SUPPRESS_SEND = True
+
+    return create_app(BenchConfig)
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, select, func
+    from backend.app import setup_database
+    from backend.models import db, User
+    from backend.services.scheduler_service import send_owed_reminders
+    from benchmarks.seed import seed_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'queue.db')
+        engine = create_engine(f'sqlite:///{db_path}')
+        seed_users(engine, args.rows)
+        engine.dispose()
+        app = build_app(db_path)
+        setup_database(app)
+        logging.disable(logging.CRITICAL)
+        client = app.test_client()
+
+        with app.app_context():
+            first, last, pending = db.session.execute(
+                select(func.min(User.token_number), func.max(User.token_number), func.count(User.id))
+                .where(User.status == 'Pending')
+            ).one()
+
+        print(f"rows={args.rows} pending={pending} lookups={args.lookups}")
+        print(f"  {'lookup':<22} {'median ms':>10} {'max ms':>10}")
+        for label, token_number in (('front of queue', first), ('middle of queue', (first + last) // 2),
+                                    ('back of queue', last)):
+            def lookup():
+                assert client.get(f'/api/queue/{token_number}').status_code == 200
+            median, worst = timed(lookup, args.lookups)
+            print(f"  {label:<22} {median:10.3f} {worst:10.3f}")
+
+        median, worst = timed(lambda: send_owed_reminders(app), 20)
+        print(f"  {'reminder sweep':<22} {median:10.3f} {worst:10.3f}")
+        app.extensions['export_jobs'].stop()
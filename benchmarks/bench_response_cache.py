@@ -0,0 +1,98 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The admin dashboard's polling on a seeded database, with the response cache off,
+# on, and on with If-None-Match: each poll fetches /api/admin/stats and the first
+# page of /api/admin/users (all users and Pending only), and a submit lands every
+# --write-every polls. Latencies are per poll (three requests), in ms.
+#
+#   python benchmarks/bench_response_cache.py --rows 200000 --polls 500 --write-every 20
+
+VARIANTS = ('off', 'cache', 'cache+etag')
+
+PAYLOAD = {
+    'name': 'Bench User',
+    'email': 'bench@example.com',
+    'address': '1 Bench Street',
+    'contact_number': '555-0100',
+    'work_description': 'Benchmark submission'
+}
+POLL = ('/api/admin/stats', '/api/admin/users?limit=50', '/api/admin/users?limit=50&status=Pending')
+
+
+def build_app(db_path, variant):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        MAIL_SUPPRESS_SEND = True
+        RESPONSE_CACHE_TTL_SECONDS = 0 if variant == 'off' else 300
+
+    return create_app(BenchConfig)
+
+
+def run_variant(db_path, variant, polls, write_every):
+    import logging
+    from flask_jwt_extended import create_access_token
+    logging.disable(logging.CRITICAL)
+
+    app = build_app(db_path, variant)
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity="bench")}'}
+    client = app.test_client()
+    etags = {}
+    latencies, not_modified, bytes_sent = [], 0, 0
+    for poll in range(polls):
+        if write_every and poll % write_every == 0:
+            client.post('/api/submit', json=PAYLOAD)
+        started = time.perf_counter()
+        for url in POLL:
+            request_headers = headers
+            if variant == 'cache+etag' and url in etags:
+                request_headers = {**headers, 'If-None-Match': etags[url]}
+            response = client.get(url, headers=request_headers)
+            if response.status_code == 304:
+                not_modified += 1
+            elif 'ETag' in response.headers:
+                etags[url] = response.headers['ETag']
+            bytes_sent += len(response.data)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    cache = app.extensions.get('response_cache')
+    hit_rate = cache.stats()['hit_rate'] if cache else None
+    latencies.sort()
+    print(f"  {variant:<11} {statistics.median(latencies):9.2f} {latencies[int(len(latencies) * 0.99)]:9.2f} "
+          f"{polls / (sum(latencies) / 1000):9.1f} {hit_rate if hit_rate is not None else '-':>9} "
+          f"{not_modified:9d} {bytes_sent / polls / 1024:9.1f}")
+    app.extensions['export_jobs'].stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--write-every', type=int, default=20)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine
+    from backend.app import setup_database
+    from benchmarks.seed import seed_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"rows={args.rows} polls={args.polls} write every={args.write_every} polls")
+        print(f"  {'variant':<11} {'p50 ms':>9} {'p99 ms':>9} {'polls/s':>9} {'hit rate':>9} "
+              f"{'304s':>9} {'KB/poll':>9}")
+        for variant in VARIANTS:
+            db_path = os.path.join(tmp, f'{variant}.db')
+            engine = create_engine(f'sqlite:///{db_path}')
+            seed_users(engine, args.rows)
+            engine.dispose()
+            setup_database(build_app(db_path, variant))
+            run_variant(db_path, variant, args.polls, args.write_every)
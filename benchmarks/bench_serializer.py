@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from backend.models import User
+from backend.utils import user_serializer
+from backend.utils.user_serializer import USER_FIELDS, select_users, serialize_users, format_columns
+from benchmarks.seed import seed_users
+
+# User row serialization: ORM objects + to_dict() + json.dumps (the old listing path)
+# vs Core tuples + column-wise formatting + orjson, and the same with the stdlib json
+# fallback. Also the export row formatting, per-row vs column-wise. Times are the
+# median of --repeat runs, in ms.
+#
+#   python benchmarks/bench_serializer.py --sizes 1000 10000 100000
+
+EXPORT_FIELDS = ['token_number', 'name', 'email', 'contact_number', 'address',
+                 'work_description', 'status', 'created_at', 'updated_at']
+
+
+def legacy_export_row(row):
+    return [value.strftime('%Y-%m-%d %H:%M:%S') if hasattr(value, 'strftime') else value for value in row]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def run(engine, sizes, repeat):
+    print(f"  {'rows':>7} {'path':<24} {'fetch':>9} {'format':>9} {'encode':>9} {'total':>9}")
+    with Session(engine) as session:
+        for size in sizes:
+            statement = select(User).order_by(User.token_number).limit(size)
+            fetch_orm, users = timed(lambda: session.scalars(statement).all(), repeat)
+            format_orm, dicts = timed(lambda: [user.to_dict() for user in users], repeat)
+            encode_std, _ = timed(lambda: json.dumps(dicts), repeat)
+            session.expunge_all()
+
+            columns = select_users(USER_FIELDS).order_by(User.token_number).limit(size)
+            fetch_core, rows = timed(lambda: session.connection().execute(columns).all(), repeat)
+            format_core, payload = timed(lambda: serialize_users(USER_FIELDS, rows), repeat)
+            assert payload == dicts
+            encode_fast, _ = timed(lambda: user_serializer.dumps(payload), repeat)
+            encode_fallback, _ = timed(
+                lambda: json.dumps(payload, separators=(',', ':'), default=user_serializer._json_default), repeat
+            )
+
+            encoder = 'orjson' if user_serializer.orjson is not None else 'json'
+            for label, fetch, fmt, encode in (
+                ('ORM + to_dict + json', fetch_orm, format_orm, encode_std),
+                (f'Core + columns + {encoder}', fetch_core, format_core, encode_fast),
+                ('Core + columns + json', fetch_core, format_core, encode_fallback),
+            ):
+                print(f"  {size:7d} {label:<24} {fetch:9.1f} {fmt:9.1f} {encode:9.1f} {fetch + fmt + encode:9.1f}")
+
+            export = select_users(EXPORT_FIELDS).order_by(User.token_number).limit(size)
+            export_rows = session.connection().execute(export).all()
+            per_row, _ = timed(lambda: [legacy_export_row(row) for row in export_rows], repeat)
+            by_column, _ = timed(lambda: format_columns(EXPORT_FIELDS, export_rows, style='export'), repeat)
+            print(f"  {size:7d} {'export rows per-row':<24} {'':>9} {per_row:9.1f}")
+            print(f"  {size:7d} {'export rows by column':<24} {'':>9} {by_column:9.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        seed_users(engine, max(args.sizes))
+        run(engine, args.sizes, args.repeat)
+        engine.dispose()
@@ -0,0 +1,107 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Cold start of one web worker, each run in a fresh interpreter: importing
+# backend.app, building the app, starting the worker's background services (what
+# the gunicorn post_worker_init hook does) and serving a first request, then the
+# worker's RSS. The -X importtime output of the runs is summed per top-level package
+# to show where the import time goes. --root measures another checkout, e.g. an
+# older commit, with the same script.
+#
+#   python benchmarks/bench_startup.py --runs 5
+#   python benchmarks/bench_startup.py --runs 5 --root /tmp/old-checkout
+
+WORKER = r'''
+import json, os, sys, time
+started = time.perf_counter()
+import backend.app as module
+imported = time.perf_counter()
+# Older trees build the app at import time
+app = getattr(module, 'app', None) or module.create_app()
+created = time.perf_counter()
+if hasattr(module, 'start_background_services'):
+    module.start_background_services(app)
+services = time.perf_counter()
+app.test_client().get('/health')
+ready = time.perf_counter()
+with open('/proc/self/status') as status:
+    rss_kb = next(int(line.split()[1]) for line in status if line.startswith('VmRSS:'))
+heavy = ['reportlab', 'openpyxl', 'numpy', 'pandas', 'pypdf', 'alembic', 'apscheduler']
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'create_ms': (created - imported) * 1000,
+    'services_ms': (services - created) * 1000,
+    'total_ms': (ready - started) * 1000,
+    'rss_mb': rss_kb / 1024,
+    'modules': len(sys.modules),
+    'loaded': [name for name in heavy if name in sys.modules],
+}), flush=True)
+# Skip interpreter shutdown; the background threads are daemons
+os._exit(0)
+'''
+
+
+def run_worker(root, env):
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', WORKER],
+        cwd=root, env=env, capture_output=True, text=True
+    )
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        raise RuntimeError(process.stderr[-2000:])
+    return json.loads(lines[-1]), parse_importtime(process.stderr)
+
+
+def parse_importtime(stderr):
+    # 'import time: self [us] | cumulative | imported package', nested names indented
+    by_package = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        by_package[name.strip().split('.')[0]] += int(self_us)
+    return by_package
+
+
+def run(root, runs, top):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=root, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+                   EXPORT_DIR=os.path.join(tmp, 'exports'), MAIL_SUPPRESS_SEND='1')
+        if subprocess.run([sys.executable, '-m', 'flask', '--app', 'backend.app', 'init-db'],
+                          cwd=root, env=env, capture_output=True).returncode != 0:
+            # Trees without the command set the schema up while starting; warm it once
+            run_worker(root, env)
+
+        results, packages = [], Counter()
+        for _ in range(runs):
+            result, by_package = run_worker(root, env)
+            results.append(result)
+            packages.update(by_package)
+
+    print(f"root={root} runs={runs} (medians)")
+    for key, label in (('import_ms', 'import backend.app'), ('create_ms', 'create_app()'),
+                       ('services_ms', 'background services'), ('total_ms', 'ready to serve')):
+        print(f"  {label:<22} {statistics.median(r[key] for r in results):8.0f} ms")
+    print(f"  {'worker RSS':<22} {statistics.median(r['rss_mb'] for r in results):8.1f} MB")
+    print(f"  {'modules loaded':<22} {statistics.median(r['modules'] for r in results):8.0f}")
+    print(f"  {'heavy packages':<22} {', '.join(results[-1]['loaded']) or '-'}")
+    print(f"  import time by package (self time, mean per run):")
+    for name, total_us in packages.most_common(top):
+        print(f"    {name:<20} {total_us / runs / 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12)
+    parser.add_argument('--root', default=ROOT)
+    args = parser.parse_args()
+    run(os.path.abspath(args.root), args.runs, args.top)
@@ -0,0 +1,100 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Concurrency benchmark for /api/submit: N worker processes (like gunicorn workers)
+# hammer one SQLite file and we check that every token was handed out exactly once.
+#
+#   python benchmarks/bench_token_allocator.py --clients 8 --requests 200 --block-size 1
+
+
+def build_app(db_path, block_size):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        SQLITE_PRAGMAS = {**Config.SQLITE_PRAGMAS, 'busy_timeout': 60000}
+        MAIL_SUPPRESS_SEND = True
+        TOKEN_BLOCK_SIZE = block_size
+
+    return create_app(BenchConfig)
+
+
+def client_worker(db_path, block_size, requests, start_event, results):
+    import logging
+    logging.disable(logging.CRITICAL)
+
+    app = build_app(db_path, block_size)
+    client = app.test_client()
+    payload = {
+        'name': 'Bench User',
+        'email': 'bench@example.com',
+        'address': '1 Bench Street',
+        'contact_number': '555-0100',
+        'work_description': 'Benchmark submission'
+    }
+    failures = 0
+    start_event.wait()
+    for _ in range(requests):
+        response = client.post('/api/submit', json=payload)
+        if response.status_code != 201:
+            failures += 1
+    results.put(failures)
+
+
+def run(clients, requests, block_size):
+    from sqlalchemy import func
+    from backend.app import setup_database
+    from backend.models import db, User
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        app = build_app(db_path, block_size)
+        setup_database(app)
+
+        start_event = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=client_worker, args=(db_path, block_size, requests, start_event, results))
+            for _ in range(clients)
+        ]
+        for worker in workers:
+            worker.start()
+        time.sleep(1)
+
+        started = time.perf_counter()
+        start_event.set()
+        failures = sum(results.get() for _ in workers)
+        elapsed = time.perf_counter() - started
+        for worker in workers:
+            worker.join()
+
+        with app.app_context():
+            rows = db.session.query(func.count(User.id)).scalar()
+            distinct = db.session.query(func.count(func.distinct(User.token_number))).scalar()
+            max_token = db.session.query(func.max(User.token_number)).scalar() or 0
+
+        expected = clients * requests
+        print(f"clients={clients} requests/client={requests} block_size={block_size}")
+        print(f"  submits/sec:      {expected / elapsed:.1f}")
+        print(f"  failed submits:   {failures}")
+        print(f"  rows inserted:    {rows} (expected {expected})")
+        print(f"  duplicate tokens: {rows - distinct}")
+        print(f"  unused tokens:    {max_token - rows}")
+        return failures == 0 and rows == expected and distinct == rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--block-size', type=int, default=1)
+    args = parser.parse_args()
+    ok = run(args.clients, args.requests, args.block_size)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,110 @@
+import argparse
+import gc
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The in-memory token index behind /api/token/<n> on a seeded database: the time and
+# memory to load it, its size per 1M tokens next to the same data as a dict, and
+# lookups from the index itself, through /api/token and through the database-backed
+# /api/queue. Lookup times are per call, in microseconds.
+#
+#   python benchmarks/bench_token_index.py --rows 1000000 --lookups 2000
+
+
+def build_app(db_path):
+    from backend.app import create_app
+    from backend.config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+        MAIL_SUPPRESS_SEND = True
+        TOKEN_LOOKUP_RATE_LIMIT = 0
+
+    return create_app(BenchConfig)
+
+
+def timed_us(fn, token_numbers):
+    timings = []
+    for token_number in token_numbers:
+        started = time.perf_counter()
+        fn(token_number)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99)]
+
+
+def dict_size(rows):
+    # The naive alternative: {token_number: (status, position)}
+    gc.collect()
+    tracemalloc.start()
+    position, table = 0, {}
+    for token_number, status in rows:
+        if status == 'Pending':
+            position += 1
+        table[token_number] = (status, position if status == 'Pending' else None)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=2000)
+    args = parser.parse_args()
+
+    from sqlalchemy import create_engine, select
+    from backend.app import setup_database
+    from backend.models import db, User
+    from benchmarks.seed import seed_users
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'tokens.db')
+        engine = create_engine(f'sqlite:///{db_path}')
+        seed_users(engine, args.rows)
+        engine.dispose()
+        app = build_app(db_path)
+        setup_database(app)
+        logging.disable(logging.CRITICAL)
+        index = app.extensions['token_index']
+
+        with app.app_context():
+            started = time.perf_counter()
+            index.load()
+            load_seconds = time.perf_counter() - started
+            # Again under tracemalloc (which slows it down) for the peak
+            gc.collect()
+            tracemalloc.start()
+            index.load()
+            _, load_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            naive_bytes = dict_size(db.session.execute(select(User.token_number, User.status)).all())
+
+        per_million = 1000000 / args.rows
+        print(f"rows={args.rows} lookups={args.lookups}")
+        print(f"  load                   {load_seconds * 1000:10.0f} ms  (peak {load_peak / 1024 / 1024:.1f} MB traced)")
+        print(f"  index size             {index.memory_bytes() / 1024 / 1024:10.2f} MB  "
+              f"({index.memory_bytes() * per_million / 1024 / 1024:.2f} MB per 1M tokens)")
+        print(f"  same data as a dict    {naive_bytes / 1024 / 1024:10.2f} MB  "
+              f"({naive_bytes * per_million / 1024 / 1024:.2f} MB per 1M tokens)")
+
+        rng = random.Random(1)
+        token_numbers = [rng.randint(1, args.rows) for _ in range(args.lookups)]
+        client = app.test_client()
+        print(f"  {'lookup':<22} {'median us':>10} {'p99 us':>10}")
+        for label, fn in (
+            ('index.lookup', index.lookup),
+            ('GET /api/token/<n>', lambda n: client.get(f'/api/token/{n}')),
+            ('GET /api/queue/<n>', lambda n: client.get(f'/api/queue/{n}')),
+        ):
+            median, p99 = timed_us(fn, token_numbers)
+            print(f"  {label:<22} {median:10.1f} {p99:10.1f}")
+        app.extensions['export_jobs'].stop()
@@ -0,0 +1,148 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# The benchmark suite: seeds a fresh SQLite file with --users users (the same rows for
+# the same --seed), runs the scenarios in benchmarks/scenarios.py against it with mail
+# going to a local SMTP sink, and writes the results as JSON, with the commit and the
+# environment they were measured on. Everything runs offline, in this process.
+# --compare prints every number next to the one in an earlier results file.
+#
+#   python -m benchmarks.run --users 100000
+#   python -m benchmarks.run --users 100000 --scenarios search admin_polling \
+#       --compare benchmarks/results/<earlier>.json
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+FORMAT_VERSION = 1
+
+
+def git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True,
+                              timeout=30).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    packages = {}
+    for name in ('flask', 'sqlalchemy', 'flask-sqlalchemy', 'openpyxl', 'reportlab'):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'packages': packages
+    }
+
+
+def flatten(results, prefix=''):
+    # {'search': {'newest': {'p50_ms': 1.2}}} -> {'search.newest.p50_ms': 1.2}
+    values = {}
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def compare(current, baseline):
+    old, new = flatten(baseline['scenarios']), flatten(current['scenarios'])
+    print(f"\nAgainst {baseline.get('commit') or 'unknown commit'} ({baseline.get('started_at')}, "
+          f"users={baseline['params']['users']})")
+    width = max((len(name) for name in new), default=10)
+    for name, value in new.items():
+        if name not in old:
+            continue
+        before = old[name]
+        change = f'{(value - before) / before * 100:+.1f}%' if before else ''
+        print(f"  {name:<{width}} {before:>12} {value:>12} {change:>9}")
+
+
+def run(args):
+    from sqlalchemy import create_engine
+    from backend.app import create_app, setup_database
+    from backend.config import Config
+    from benchmarks.scenarios import SCENARIOS, Harness
+    from benchmarks.seed import seed_users
+    from benchmarks.smtp_sink import SMTPSink
+
+    results = {
+        'format': FORMAT_VERSION,
+        'started_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'environment': environment(),
+        'params': {'users': args.users, 'seed': args.seed, 'scenarios': args.scenarios},
+        'scenarios': {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp, SMTPSink() as sink:
+        db_path = os.path.join(tmp, 'bench.db')
+        engine = create_engine(f'sqlite:///{db_path}')
+        started = time.perf_counter()
+        seed_users(engine, args.users, seed=args.seed)
+        engine.dispose()
+        results['seed_seconds'] = round(time.perf_counter() - started, 3)
+
+        class SetupConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+        started = time.perf_counter()
+        setup_database(create_app(SetupConfig))
+        results['setup_seconds'] = round(time.perf_counter() - started, 3)
+        print(f"users={args.users} seeded in {results['seed_seconds']}s, set up in {results['setup_seconds']}s")
+
+        harness = Harness(db_path, sink)
+        try:
+            for name in args.scenarios:
+                started = time.perf_counter()
+                results['scenarios'][name] = SCENARIOS[name](harness)
+                print(f"  {name} ({time.perf_counter() - started:.1f}s): {json.dumps(results['scenarios'][name])}")
+        finally:
+            harness.stop()
+    return results
+
+
+if __name__ == '__main__':
+    from benchmarks.scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--output', help=f'Results file (default: a new file in {RESULTS_DIR})')
+    parser.add_argument('--compare', help='An earlier results file to compare with')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = run(args)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(results['commit'] or 'nocommit')[:8]}-{args.users}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
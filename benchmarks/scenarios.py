@@ -0,0 +1,212 @@
+import os
+import statistics
+import threading
+import time
+
+from benchmarks.seed import generate_users
+
+# Scenario drivers for benchmarks/run.py. Each one drives the app in process through
+# Flask's test client, so it measures the application and the database rather than
+# an HTTP server, and returns a dict of plain numbers for the results file. Latencies
+# are in milliseconds, durations in seconds.
+#
+# A Harness is one app over a seeded SQLite file, with its background services
+# running and mail going to a local SMTPSink, so nothing leaves the machine.
+
+SEARCH_TERMS = ['priya', 'pat', 'shah98', 'novak', 'anna.novak', '9812', 'garcia chen', '4242', 'gmail']
+EXPORT_FORMATS = ('csv', 'excel', 'pdf')
+
+
+def summarize(timings):
+    # Latency summary of a list of milliseconds
+    if not timings:
+        return {'count': 0}
+    ordered = sorted(timings)
+
+    def percentile(fraction):
+        return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 3)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': percentile(0.5),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(ordered[-1], 3)
+    }
+
+
+def wait_for(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class Harness:
+    def __init__(self, db_path, sink, **settings):
+        from flask_jwt_extended import create_access_token
+        from backend.app import create_app, start_background_services
+        from backend.config import Config
+
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(db_path)}'
+            MAIL_SERVER = sink.host
+            MAIL_PORT = sink.port
+            MAIL_USE_TLS = False
+            MAIL_USERNAME = ''
+            MAIL_PASSWORD = ''
+            OUTBOX_RETRY_BASE_SECONDS = 0
+            TOKEN_LOOKUP_RATE_LIMIT = 0
+
+        for name, value in settings.items():
+            setattr(BenchConfig, name, value)
+
+        self.sink = sink
+        self.app = create_app(BenchConfig)
+        start_background_services(self.app)
+        with self.app.app_context():
+            self.admin_headers = {'Authorization': f'Bearer {create_access_token(identity="bench")}'}
+
+    def client(self):
+        return self.app.test_client()
+
+    def stop(self):
+        from backend.app import stop_background_services
+        stop_background_services(self.app)
+        self.app.extensions['export_jobs'].stop()
+
+
+def submit_burst(harness, requests=500, threads=8, seed=7):
+    # requests submissions from threads concurrent clients, then the time until the
+    # outbox has delivered every confirmation to the sink
+    payloads = [
+        {field: row[field] for field in ('name', 'email', 'address', 'contact_number', 'work_description')}
+        for batch in generate_users(requests, seed=seed) for row in batch
+    ]
+    timings, failures = [], []
+    lock = threading.Lock()
+    delivered_before = len(harness.sink.messages)
+
+    def client(share):
+        test_client = harness.client()
+        local_timings, local_failures = [], 0
+        for payload in share:
+            started = time.perf_counter()
+            response = test_client.post('/api/submit', json=payload)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code == 201:
+                local_timings.append(elapsed)
+            else:
+                local_failures += 1
+        with lock:
+            timings.extend(local_timings)
+            failures.append(local_failures)
+
+    workers = [threading.Thread(target=client, args=(payloads[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    submitted = len(timings)
+    delivered = wait_for(lambda: len(harness.sink.messages) - delivered_before >= submitted, timeout=120)
+    drained = time.perf_counter() - started
+    return {
+        'threads': threads,
+        'requests_per_second': round(submitted / elapsed, 1),
+        'failures': sum(failures),
+        'latency': summarize(timings),
+        'emails_delivered': len(harness.sink.messages) - delivered_before,
+        'all_emails_seconds': round(drained, 3) if delivered else None
+    }
+
+
+def admin_polling(harness, polls=300, update_every=20):
+    # The dashboard loop: stats plus the first page of users, with the ETags of the
+    # previous poll, and a status change every update_every polls
+    test_client = harness.client()
+    headers = harness.admin_headers
+    etags = {}
+    timings = {'stats': [], 'users': [], 'update': []}
+    not_modified = 0
+    for poll in range(polls):
+        if poll and poll % update_every == 0:
+            page = test_client.get('/api/admin/users?status=Pending&limit=1', headers=headers).get_json()
+            if page['users']:
+                started = time.perf_counter()
+                test_client.put(f"/api/admin/users/{page['users'][0]['id']}", json={'status': 'Completed'},
+                                headers=headers)
+                timings['update'].append((time.perf_counter() - started) * 1000)
+        for name, path in (('stats', '/api/admin/stats'), ('users', '/api/admin/users?limit=50')):
+            request_headers = dict(headers)
+            if name in etags:
+                request_headers['If-None-Match'] = etags[name]
+            started = time.perf_counter()
+            response = test_client.get(path, headers=request_headers)
+            timings[name].append((time.perf_counter() - started) * 1000)
+            if response.status_code == 304:
+                not_modified += 1
+            elif response.headers.get('ETag'):
+                etags[name] = response.headers['ETag']
+    return {
+        'polls': polls,
+        'not_modified_ratio': round(not_modified / (polls * 2), 3),
+        **{name: summarize(values) for name, values in timings.items()}
+    }
+
+
+def search(harness, repeat=5):
+    # Admin search for a first page of 50, newest first and by relevance. The response
+    # cache is cleared before each request, so every one runs the query.
+    from backend.services.response_cache import invalidate_responses
+
+    test_client = harness.client()
+    timings = {'newest': [], 'relevance': []}
+    for _ in range(repeat):
+        for term in SEARCH_TERMS:
+            for order in timings:
+                query = {'search': term, 'limit': 50}
+                if order == 'relevance':
+                    query['order'] = 'relevance'
+                invalidate_responses(harness.app)
+                started = time.perf_counter()
+                response = test_client.get('/api/admin/users', query_string=query, headers=harness.admin_headers)
+                timings[order].append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"Search for {term!r} failed with {response.status_code}")
+    return {'terms': len(SEARCH_TERMS), **{order: summarize(values) for order, values in timings.items()}}
+
+
+def export(harness, export_format):
+    # One full download of the export, read as it streams
+    test_client = harness.client()
+    started = time.perf_counter()
+    response = test_client.get(f'/api/admin/export/{export_format}', headers=harness.admin_headers,
+                               buffered=False)
+    first_byte, size = None, 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    response.close()
+    return {
+        'status': response.status_code,
+        'seconds': round(time.perf_counter() - started, 3),
+        'first_byte_seconds': round(first_byte or 0, 3),
+        'bytes': size
+    }
+
+
+# In run order: the read-only scenarios see exactly the seeded data
+SCENARIOS = {
+    'search': search,
+    **{f'export_{export_format}': (lambda harness, export_format=export_format: export(harness, export_format))
+       for export_format in EXPORT_FORMATS},
+    'admin_polling': admin_polling,
+    'submit_burst': submit_burst
+}
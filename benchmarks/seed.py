@@ -0,0 +1,193 @@
+import argparse
+import math
+import os
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import column, insert, func, select, table
+
+from backend.models import db, User, CompletedWork
+
+# Bulk seeding for benchmarks and tests: plain Core executemany in batches, no ORM
+# objects. The data looks like a real counter's: names drawn with a long-tailed
+# (Zipf) frequency, mostly webmail addresses, Indian mobile numbers, addresses spread
+# over Ahmedabad's areas, and a mix of short and detailed work descriptions. Tokens
+# arrive at random through a year of opening hours (09:00-19:00, closed on Sundays)
+# and the oldest completed_ratio of them are Completed, each after a log-normal
+# service time, with the rest Pending behind them. The same seed always gives the same rows.
+#
+#   python -m benchmarks.seed --db /tmp/bench.db --users 1000000
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Sneha', 'John', 'Maria', 'Wei', 'Fatima', 'Carlos', 'Anna',
+               'Vivaan', 'Diya', 'Arjun', 'Ananya', 'Krish', 'Isha', 'Rohan', 'Kavya', 'Nikhil', 'Pooja',
+               'Amit', 'Neha', 'Sanjay', 'Meera', 'Hiren', 'Jinal', 'Dhruv', 'Riya', 'Yash', 'Hetal']
+LAST_NAMES = ['Patel', 'Shah', 'Mehta', 'Smith', 'Garcia', 'Chen', 'Khan', 'Silva', 'Novak', 'Desai',
+              'Joshi', 'Trivedi', 'Parmar', 'Chauhan', 'Modi', 'Pandya', 'Bhatt', 'Vyas', 'Rana', 'Solanki',
+              'Thakkar', 'Gandhi', 'Dave', 'Raval', 'Kapadia']
+EMAIL_DOMAINS = [('gmail.com', 62), ('yahoo.com', 14), ('outlook.com', 10), ('hotmail.com', 6),
+                 ('rediffmail.com', 4), ('example.com', 4)]
+AREAS = ['Navrangpura', 'Satellite', 'Maninagar', 'Bopal', 'Vastrapur', 'Naranpura', 'Chandkheda',
+         'Ghatlodia', 'Paldi', 'Thaltej', 'Nikol', 'Vejalpur', 'Gota', 'Isanpur', 'Sabarmati']
+STREETS = ['Main Street', 'Station Road', 'CG Road', 'SG Highway', 'Ashram Road', 'Relief Road',
+           'Society Lane', 'Ring Road']
+WORK = [
+    ('AC service and gas refill', 30),
+    ('AC not cooling', 14),
+    ('Split AC installation', 9),
+    ('Refrigerator not cooling, compressor noise', 8),
+    ('Washing machine drum not spinning', 8),
+    ('Water purifier filter change', 7),
+    ('Microwave not heating', 5),
+    ('Geyser leaking from the inlet pipe', 5),
+    ('Annual maintenance visit for two window ACs and one split AC, please call before coming '
+     'as the building gate is locked after 6 pm', 4),
+    ('Ceiling fan regulator replacement and wiring check in two bedrooms', 4),
+    ('Uninstall the old AC in the hall and install it in the bedroom, bracket and extra copper '
+     'pipe needed, parking available in the basement', 3),
+    ('Inverter battery not charging', 3),
+]
+
+OPENS_AT, CLOSES_AT = 9, 19
+MEDIAN_SERVICE_MINUTES = 20
+STARTED_AT = datetime(2025, 1, 1, OPENS_AT)
+BLOCK_SIZE = 10000
+
+
+def _zipf_weights(count):
+    return [1 / rank for rank in range(1, count + 1)]
+
+
+def _next_opening(clock):
+    # The next day the counter is open, at opening time
+    day = (clock + timedelta(days=1)).replace(hour=OPENS_AT, minute=0, second=0, microsecond=0)
+    while day.weekday() == 6:
+        day += timedelta(days=1)
+    return day
+
+
+def _after_open_minutes(clock, minutes):
+    # clock moved on by this many minutes of opening hours
+    while True:
+        left = (clock.replace(hour=CLOSES_AT, minute=0, second=0, microsecond=0) - clock).total_seconds() / 60
+        if minutes < left:
+            return clock + timedelta(minutes=minutes)
+        minutes -= left
+        clock = _next_opening(clock)
+
+
+def _timestamp(value):
+    # The format SQLAlchemy's SQLite DateTime stores, written directly so the inserts
+    # skip the per-value bind processing
+    return value.isoformat(' ', 'microseconds')
+
+
+# Untyped columns: parameters go to the driver as they are
+_users = table('users', *(column(name) for name in (
+    'token_number', 'name', 'email', 'address', 'contact_number', 'work_description',
+    'status', 'created_at', 'updated_at', 'reminder_sent')))
+
+
+def generate_users(count, offset=0, completed_ratio=0.6, seed=42, span_days=365):
+    # Yields blocks of user rows (dicts) for tokens offset+1 .. offset+count, arriving
+    # over about span_days. Categorical fields are drawn a block at a time; the blocks
+    # are always BLOCK_SIZE rows, so the rows do not depend on how they are inserted.
+    rng = random.Random(seed)
+    completed = int(count * completed_ratio)
+    open_minutes = span_days * 6 / 7 * (CLOSES_AT - OPENS_AT) * 60
+    mean_arrival = open_minutes / max(count, 1)
+    service_mu = math.log(MEDIAN_SERVICE_MINUTES)
+    domains, domain_weights = zip(*EMAIL_DOMAINS)
+    work, work_weights = zip(*WORK)
+
+    clock = STARTED_AT
+    for start in range(0, count, BLOCK_SIZE):
+        size = min(BLOCK_SIZE, count - start)
+        firsts = rng.choices(FIRST_NAMES, _zipf_weights(len(FIRST_NAMES)), k=size)
+        lasts = rng.choices(LAST_NAMES, _zipf_weights(len(LAST_NAMES)), k=size)
+        picked_domains = rng.choices(domains, domain_weights, k=size)
+        picked_work = rng.choices(work, work_weights, k=size)
+        streets = rng.choices(STREETS, k=size)
+        areas = rng.choices(AREAS, k=size)
+        rows = []
+        for j in range(size):
+            i = start + j
+            token_number = offset + i + 1
+            clock = _after_open_minutes(clock, rng.expovariate(1 / mean_arrival))
+            created_at = _timestamp(clock)
+            done = i < completed
+            if done:
+                service_minutes = min(max(rng.lognormvariate(service_mu, 0.5), 5), 120)
+                updated_at = _timestamp(clock + timedelta(minutes=service_minutes))
+            else:
+                updated_at = created_at
+            first, last = firsts[j], lasts[j]
+            rows.append({
+                'token_number': token_number,
+                'name': f'{first} {last}',
+                'email': f'{first.lower()}.{last.lower()}{token_number}@{picked_domains[j]}',
+                'address': f'{int(rng.random() * 999) + 1}, {streets[j]}, {areas[j]}, Ahmedabad',
+                'contact_number': f'{"9876"[int(rng.random() * 4)]}{int(rng.random() * 1e9):09d}',
+                'work_description': picked_work[j],
+                'status': 'Completed' if done else 'Pending',
+                'created_at': created_at,
+                'updated_at': updated_at,
+                # The first Pending tokens have had their reminder already
+                'reminder_sent': done or i < completed + 2,
+            })
+        yield rows
+
+
+def seed_users(engine, count, batch_size=10000, completed_ratio=0.6, seed=42):
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        offset = conn.execute(select(func.max(User.token_number))).scalar() or 0
+    # Into an empty table, building the indexes once at the end is about twice as fast
+    # as maintaining them row by row
+    indexes = User.__table__.indexes if offset == 0 else ()
+    with engine.begin() as conn:
+        for index in indexes:
+            index.drop(conn, checkfirst=True)
+
+    for rows in generate_users(count, offset, completed_ratio, seed):
+        for start in range(0, len(rows), batch_size):
+            with engine.begin() as conn:
+                conn.execute(insert(_users), rows[start:start + batch_size])
+
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn, checkfirst=True)
+
+    with engine.begin() as conn:
+        conn.execute(CompletedWork.__table__.delete())
+        conn.execute(insert(CompletedWork), [{'count': int(count * completed_ratio), 'last_updated': datetime.utcnow()}])
+
+
+if __name__ == '__main__':
+    import time
+
+    from sqlalchemy import create_engine
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', required=True, help='SQLite file to create or add to')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--completed-ratio', type=float, default=0.6)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(f'sqlite:///{os.path.abspath(args.db)}')
+    started = time.perf_counter()
+    seed_users(engine, args.users, completed_ratio=args.completed_ratio, seed=args.seed)
+    engine.dispose()
+    seeded = time.perf_counter() - started
+
+    # Migrations, search index and counters, as `flask init-db` would
+    from backend.app import create_app, setup_database
+    from backend.config import Config
+
+    class SeedConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(args.db)}'
+
+    setup_database(create_app(SeedConfig))
+    print(f"Seeded {args.users} users into {args.db} in {seeded:.1f}s "
+          f"({args.users / seeded:,.0f} rows/s), set up in {time.perf_counter() - started - seeded:.1f}s")
@@ -0,0 +1,110 @@
+import socketserver
+import threading
+
+# A tiny in-process SMTP server that accepts everything and keeps the messages in
+# memory. Good enough to stand in for a real mail server in tests and benchmarks.
+#
+#   sink = SMTPSink().start()
+#   app.config['MAIL_SERVER'], app.config['MAIL_PORT'] = sink.host, sink.port
+#   ...
+#   sink.messages  -> list of (mail_from, rcpt_tos, raw_data)
+#   sink.stop()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        self.reply('220 smtp-sink ready')
+        mail_from, rcpt_tos = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250-smtp-sink')
+                self.reply('250 8BITMIME')
+            elif verb == 'MAIL':
+                mail_from, rcpt_tos = command[10:].strip(' <>'), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                rcpt_tos.append(command[8:].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                chunks = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk == b'.\r\n':
+                        break
+                    chunks.append(chunk)
+                with sink.lock:
+                    if sink.fail_next > 0:
+                        sink.fail_next -= 1
+                        self.reply('451 Temporary failure')
+                        continue
+                    sink.messages.append((mail_from, rcpt_tos, b''.join(chunks)))
+                self.reply('250 OK')
+            elif verb in ('RSET', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _ThreadedServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    def __init__(self, host='127.0.0.1', port=0):
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        # Number of upcoming messages to reject with a 451, to exercise retries
+        self.fail_next = 0
+        self._server = _ThreadedServer((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=1025)
+    args = parser.parse_args()
+    with SMTPSink(port=args.port) as sink:
+        print(f"SMTP sink listening on {sink.host}:{sink.port}")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"{len(sink.messages)} messages over {sink.connections} connections")
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# Add the repository root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from backend.app import create_app, setup_database, stop_background_services
+from backend.config import Config
+from benchmarks.smtp_sink import SMTPSink
+
+
+@pytest.fixture
+def smtp_sink():
+    with SMTPSink() as sink:
+        yield sink
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    # Builds apps on a temporary SQLite database. Keyword arguments override the
+    # config; mail is suppressed unless it goes to a sink. Every app built is
+    # stopped at teardown, whatever the test started on it.
+    apps = []
+
+    def make(sink=None, setup=True, **settings):
+        settings.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+        if sink is None:
+            settings.setdefault('MAIL_SUPPRESS_SEND', True)
+        else:
+            settings.update(MAIL_SERVER=sink.host, MAIL_PORT=sink.port, MAIL_USE_TLS=False,
+                            MAIL_USERNAME='', MAIL_PASSWORD='')
+        app = create_app(type('TestConfig', (Config,), settings))
+        apps.append(app)
+        if setup:
+            setup_database(app)
+        return app
+
+    yield make
+    for app in apps:
+        stop_background_services(app)
+        app.extensions['mail_transport'].close()
+        app.extensions['export_jobs'].stop()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers():
+    # Tokens only depend on the JWT settings, so they work with any test app
+    jwt_app = Flask(__name__)
+    jwt_app.config.from_object(Config)
+    JWTManager(jwt_app)
+    with jwt_app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity="admin")}'}
@@ -9,6 +9,7 @@ const AdminDashboard = () => {
   const [search, setSearch] = useState('')
   const [statusFilter, setStatusFilter] = useState('All')
   const [loading, setLoading] = useState(false)
+  const [nextCursor, setNextCursor] = useState(null)
   const navigate = useNavigate()
 
   useEffect(() => {
@@ -20,11 +21,16 @@ const AdminDashboard = () => {
     filterUsers()
   }, [search, statusFilter, users])
 
-  const fetchUsers = async () => {
+  const fetchUsers = async (cursor = null) => {
     setLoading(true)
     try {
-      const response = await adminApi.getUsers({ search, status: statusFilter })
-      setUsers(response.data.users)
+      const params = { search, status: statusFilter }
+      if (cursor) {
+        params.cursor = cursor
+      }
+      const response = await adminApi.getUsers(params)
+      setUsers(cursor ? [...users, ...response.data.users] : response.data.users)
+      setNextCursor(response.data.next_cursor)
     } catch (error) {
       console.error('Error fetching users:', error)
       if (error.response?.status === 401) {
@@ -77,30 +83,21 @@ const AdminDashboard = () => {
 
   const handleExport = async (format) => {
     try {
-      let response
-      let filename
-      
-      switch(format) {
-        case 'excel':
-          response = await adminApi.exportExcel()
-          filename = `service_tokens_${new Date().toISOString().slice(0,10)}.xlsx`
-          break
-        case 'csv':
-          response = await adminApi.exportCSV()
-          filename = `service_tokens_${new Date().toISOString().slice(0,10)}.csv`
-          break
-        case 'pdf':
-          response = await adminApi.exportPDF()
-          filename = `service_tokens_${new Date().toISOString().slice(0,10)}.pdf`
-          break
-        default:
-          return
+      // Exports are built in the background; poll the job until its file is ready
+      let { data: { job } } = await adminApi.createExport(format)
+      while (job.status === 'Queued' || job.status === 'Running') {
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        ;({ data: { job } } = await adminApi.getExport(job.id))
+      }
+      if (job.status !== 'Completed') {
+        throw new Error(job.error || `Export ${job.status.toLowerCase()}`)
       }
 
+      const response = await adminApi.downloadExport(job.id)
       const url = window.URL.createObjectURL(new Blob([response.data]))
       const link = document.createElement('a')
       link.href = url
-      link.setAttribute('download', filename)
+      link.setAttribute('download', job.filename)
       document.body.appendChild(link)
       link.click()
       link.remove()
@@ -288,6 +285,17 @@ const AdminDashboard = () => {
               </table>
             )}
           </div>
+
+          {nextCursor && !loading && (
+            <div className="p-4 text-center border-t border-gray-200">
+              <button
+                onClick={() => fetchUsers(nextCursor)}
+                className="btn-primary text-sm"
+              >
+                Load more
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>
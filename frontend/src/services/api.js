@@ -38,7 +38,10 @@ export const adminApi = {
   getStats: () => api.get('/api/admin/stats'),
   exportExcel: () => api.get('/api/admin/export/excel', { responseType: 'blob' }),
   exportCSV: () => api.get('/api/admin/export/csv', { responseType: 'blob' }),
-  exportPDF: () => api.get('/api/admin/export/pdf', { responseType: 'blob' })
+  exportPDF: () => api.get('/api/admin/export/pdf', { responseType: 'blob' }),
+  createExport: (format) => api.post('/api/admin/exports', { format }),
+  getExport: (jobId) => api.get(`/api/admin/exports/${jobId}`),
+  downloadExport: (jobId) => api.get(`/api/admin/exports/${jobId}/download`, { responseType: 'blob' })
 }
 
 export default api
\ No newline at end of file
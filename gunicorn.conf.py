@@ -0,0 +1,32 @@
+# Gunicorn settings, read from the working directory when gunicorn starts:
+#
+#   gunicorn --bind 0.0.0.0:$PORT 'backend.app:create_app()'
+#
+# Building the app has no side effects, so the background threads (email outbox and
+# scheduler) are started here, in each worker after it has forked, and never in the
+# master. Run `flask --app backend.app init-db` before starting the workers.
+#
+# Uvicorn workers serving backend.asgi start the services from the ASGI lifespan
+# instead, so only Flask apps are started here. Live updates (/api/events) need the
+# ASGI app or threaded workers (--worker-class gthread); sync workers answer 503.
+
+
+def post_worker_init(worker):
+    from flask import Flask
+    from gunicorn.workers.sync import SyncWorker
+    from backend.app import start_background_services
+    if isinstance(worker.wsgi, Flask):
+        if isinstance(worker, SyncWorker):
+            # A sync worker has one thread, which an open /api/events stream would
+            # keep forever: the route answers 503 there
+            worker.wsgi.config['EVENTS_STREAMING'] = False
+        start_background_services(worker.wsgi)
+
+
+def worker_exit(server, worker):
+    # Hands the scheduler lease over straight away instead of letting it expire
+    from flask import Flask
+    app = getattr(worker, 'wsgi', None)
+    if isinstance(app, Flask):
+        from backend.app import stop_background_services
+        stop_background_services(app)
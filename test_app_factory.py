@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import threading
+
+from backend.app import setup_database, start_background_services, stop_background_services
+
+
+def test_create_app_has_no_side_effects(make_app, tmp_path):
+    before = set(threading.enumerate())
+    app = make_app(setup=False)
+
+    # No threads, no scheduler, no outbox dispatcher and no database file
+    assert set(threading.enumerate()) - before == set()
+    for name in ('reminder_dispatcher', 'scheduler_coordinator', 'email_outbox'):
+        assert name not in app.extensions
+    assert not os.path.exists(tmp_path / 'test.db')
+
+    # Only start_background_services starts them, and stopping leaves nothing behind
+    setup_database(app)
+    assert set(threading.enumerate()) - before == set()
+    start_background_services(app)
+    started = {thread.name for thread in set(threading.enumerate()) - before}
+    assert 'outbox-dispatcher' in started and app.extensions['scheduler_coordinator'] is not None
+    stop_background_services(app)
+    assert not any(thread.is_alive() for thread in set(threading.enumerate()) - before
+                   if thread.name == 'outbox-dispatcher')
+
+
+def test_heavy_export_libraries_load_on_first_use():
+    # In a fresh interpreter, since this one has imported them already
+    script = (
+        "import sys\n"
+        "from backend.app import create_app\n"
+        "create_app()\n"
+        "print(sorted(name for name in ('openpyxl', 'reportlab', 'pypdf') if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == '[]'
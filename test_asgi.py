@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+
+from backend.asgi import AsgiApp
+from backend.models import db, EmailOutbox, StatusCounter, User
+
+USER_DATA = {
+    "name": "Test User",
+    "email": "test@example.com",
+    "address": "123 Test Street",
+    "contact_number": "123-456-7890",
+    "work_description": "Test work description"
+}
+
+
+async def call(app, method, path, body=None, content_type=b'application/json'):
+    # One HTTP request through the ASGI interface, returning (status, JSON body)
+    messages = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'headers': [(b'content-type', content_type)],
+             'client': ('127.0.0.1', 50000), 'server': ('testserver', 80)}
+    await app(scope, receive, send)
+    payload = b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body')
+    return sent[0]['status'], json.loads(payload)
+
+
+async def lifespan(app, event):
+    messages = [{'type': f'lifespan.{event}'}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    task = asyncio.ensure_future(app({'type': 'lifespan'}, receive, send))
+    while not sent:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    assert sent[0]['type'] == f'lifespan.{event}.complete'
+
+
+async def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+def test_asgi_submit_and_next_token_match_the_flask_routes(smtp_sink, make_app):
+    flask_app = make_app(sink=smtp_sink)
+    app = AsgiApp(flask_app)
+
+    async def scenario():
+        await lifespan(app, 'startup')
+        try:
+            assert await call(app, 'GET', '/api/next-token') == (200, {'next_token': 1})
+
+            status, body = await call(app, 'POST', '/api/submit', USER_DATA)
+            assert status == 201
+            assert body['success'] is True
+            assert body['token_number'] == 1
+            assert body['user']['name'] == 'Test User'
+            assert body['user']['status'] == 'Pending'
+
+            # The confirmation goes through the outbox, after the response
+            assert await wait_for(lambda: len(smtp_sink.messages) == 1)
+            assert smtp_sink.messages[0][1] == ['test@example.com']
+
+            assert await call(app, 'POST', '/api/submit', {'name': 'Only A Name'}) == \
+                (400, {'error': 'All fields are required'})
+            assert await call(app, 'POST', '/api/submit', USER_DATA, content_type=b'text/plain') == \
+                (500, {'error': 'Failed to submit user data. Please try again.'})
+
+            # Concurrent submissions get distinct tokens
+            results = await asyncio.gather(*[call(app, 'POST', '/api/submit', USER_DATA) for _ in range(10)])
+            assert sorted(body['token_number'] for _, body in results) == list(range(2, 12))
+            assert await call(app, 'GET', '/api/next-token') == (200, {'next_token': 12})
+
+            # Everything else is served by the Flask app
+            assert await call(app, 'GET', '/api/health') == (200, {'status': 'healthy'})
+        finally:
+            await lifespan(app, 'shutdown')
+
+    asyncio.run(scenario())
+
+    with flask_app.app_context():
+        assert User.query.count() == 11
+        assert db.session.get(StatusCounter, 'Pending').count == 11
+        assert EmailOutbox.query.count() == 11
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine
+
+from benchmarks.run import compare, flatten
+from benchmarks.scenarios import Harness, admin_polling, export, search, submit_burst
+from benchmarks.seed import CLOSES_AT, OPENS_AT, generate_users, seed_users
+
+
+def test_generated_users_are_reproducible_and_realistic():
+    rows = [row for batch in generate_users(1000) for row in batch]
+    assert rows == [row for batch in generate_users(1000) for row in batch]
+    assert rows != [row for batch in generate_users(1000, seed=1) for row in batch]
+
+    assert [row['token_number'] for row in rows] == list(range(1, 1001))
+    assert sum(row['status'] == 'Completed' for row in rows) == 600
+    assert all(row['status'] == 'Completed' for row in rows[:600])
+    # Only the front of the queue has been reminded
+    assert [row['reminder_sent'] for row in rows[600:603]] == [True, True, False]
+
+    for row in rows:
+        created_at = datetime.fromisoformat(row['created_at'])
+        assert OPENS_AT <= created_at.hour < CLOSES_AT and created_at.weekday() != 6
+        assert row['updated_at'] >= row['created_at']
+        assert row['contact_number'][0] in '6789' and len(row['contact_number']) == 10
+    # Long-tailed names: the most common first name is far more frequent than the rarest
+    names = [row['name'].split()[0] for row in rows]
+    assert names.count('Aarav') > 5 * names.count('Hetal')
+
+
+def test_scenarios_run_against_a_seeded_database(smtp_sink, make_app, tmp_path):
+    db_path = str(tmp_path / 'bench.db')
+    engine = create_engine(f'sqlite:///{db_path}')
+    seed_users(engine, 300)
+    engine.dispose()
+
+    make_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}')
+    harness = Harness(db_path, smtp_sink)
+    try:
+        results = search(harness, repeat=1)
+        assert results['newest']['count'] == results['relevance']['count'] == results['terms']
+
+        results = export(harness, 'csv')
+        assert results['status'] == 200
+
+        results = admin_polling(harness, polls=25, update_every=10)
+        assert results['update']['count'] == 2
+        assert results['not_modified_ratio'] > 0.5
+
+        results = submit_burst(harness, requests=20, threads=4)
+        assert results['failures'] == 0 and results['latency']['count'] == 20
+        assert results['emails_delivered'] == 20
+    finally:
+        harness.stop()
+
+
+def test_results_compare_by_flattened_metric(capsys):
+    baseline = {'commit': 'abc', 'started_at': 'then', 'params': {'users': 10},
+                'scenarios': {'search': {'newest': {'p50_ms': 2.0, 'count': 9}}, 'export_csv': {'seconds': 1.0}}}
+    current = {'scenarios': {'search': {'newest': {'p50_ms': 1.0, 'count': 9}}}}
+    assert flatten(current['scenarios']) == {'search.newest.p50_ms': 1.0, 'search.newest.count': 9}
+
+    compare(current, baseline)
+    output = capsys.readouterr().out
+    assert 'search.newest.p50_ms' in output and '-50.0%' in output
+    assert 'export_csv' not in output
@@ -0,0 +1,56 @@
+from backend.models import CompletedWork, EmailOutbox
+
+
+def test_bulk_status_update_counts_only_real_transitions(app, client, admin_headers):
+    ids = []
+    for i in range(6):
+        response = client.post('/api/submit', json={
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "address": "123 Test Street",
+            "contact_number": "123-456-7890",
+            "work_description": "Test work description"
+        })
+        ids.append(response.get_json()['user']['id'])
+
+    def bulk(body):
+        return client.put('/api/admin/users/status', json=body, headers=admin_headers)
+
+    result = bulk({'status': 'Completed', 'ids': ids[:3]}).get_json()
+    assert (result['matched'], result['updated'], result['unchanged']) == (3, 3, 0)
+
+    # Already completed users are not counted again
+    result = bulk({'status': 'Completed', 'ids': ids[:3]}).get_json()
+    assert (result['matched'], result['updated']) == (3, 0)
+
+    # Tokens 3-5 overlap the first batch
+    result = bulk({'status': 'Completed', 'token_from': 3, 'token_to': 5}).get_json()
+    assert (result['matched'], result['updated']) == (3, 2)
+
+    stats = client.get('/api/admin/stats', headers=admin_headers).get_json()['stats']
+    assert stats == {'total': 6, 'pending': 1, 'completed': 5, 'completed_works': 5}
+
+    with app.app_context():
+        assert CompletedWork.query.one().count == 5
+        # One sweep per batch. The completions came seconds apart, so the learnt
+        # service time fell below the 15 minute default: tokens 4 and 5 were
+        # within the lead after the first batch, token 6 after the range
+        assert EmailOutbox.query.filter_by(kind='reminder').count() == 3
+
+    # Moving back to Pending does not touch the completed works counter
+    result = bulk({'status': 'Pending', 'ids': ids[:2]}).get_json()
+    assert result['updated'] == 2
+    stats = client.get('/api/admin/stats', headers=admin_headers).get_json()['stats']
+    assert stats == {'total': 6, 'pending': 3, 'completed': 3, 'completed_works': 5}
+
+    assert bulk({'status': 'Archived', 'ids': ids}).status_code == 400
+    assert bulk({'status': 'Completed'}).status_code == 400
+    assert bulk({'status': 'Completed', 'ids': []}).status_code == 400
+    assert bulk({'status': 'Completed', 'token_from': 5, 'token_to': 1}).status_code == 400
+    # true would otherwise pass as user 1
+    assert bulk({'status': 'Completed', 'ids': [True]}).status_code == 400
+    assert bulk({'status': 'Completed', 'token_from': False, 'token_to': True}).status_code == 400
+    assert client.put('/api/admin/users/status', json={'status': 'Completed', 'ids': ids}).status_code == 401
+    # A missing or non-JSON body is the caller's mistake, not a server error
+    assert client.put('/api/admin/users/status', headers=admin_headers).status_code == 400
+    assert client.put('/api/admin/users/status', data='status=Completed', headers=admin_headers).status_code == 400
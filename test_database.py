@@ -0,0 +1,62 @@
+import csv
+import io
+
+from sqlalchemy import create_engine
+
+from backend.config import Config
+from backend.models import db
+from backend.services.database_service import create_worker_engine
+from backend.utils.export_service import EXPORT_HEADERS
+from benchmarks.seed import seed_users
+
+
+def test_sqlite_connections_get_pragmas_and_admin_reads_use_replica(make_app, tmp_path, admin_headers):
+    # A stand-in replica: same schema, different rows, so reads show where they went
+    replica_path = tmp_path / 'replica.db'
+    replica = create_engine(f"sqlite:///{replica_path}")
+    seed_users(replica, 5)
+    replica.dispose()
+
+    app = make_app(SQLALCHEMY_BINDS={'replica': f"sqlite:///{replica_path}"},
+                   SQLITE_PRAGMAS={**Config.SQLITE_PRAGMAS, 'busy_timeout': 7000})
+    client = app.test_client()
+    with app.app_context():
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 7000
+
+    # Export pool processes open engines of their own, with the same pragmas
+    engine = create_worker_engine(app.config['SQLALCHEMY_DATABASE_URI'], app.config['SQLITE_PRAGMAS'])
+    try:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 7000
+    finally:
+        engine.dispose()
+
+    response = client.post('/api/submit', json={
+        "name": "Primary User",
+        "email": "primary@example.com",
+        "address": "123 Test Street",
+        "contact_number": "123-456-7890",
+        "work_description": "Test work description"
+    })
+    assert response.status_code == 201
+
+    # Writes go to the primary, the admin listing reads the replica
+    listing = client.get('/api/admin/users', headers=admin_headers).get_json()
+    assert listing['total'] == 5
+    assert 'Primary User' not in [user['name'] for user in listing['users']]
+
+    # So does the CSV export, streamed after the view has returned
+    export = client.get('/api/admin/export/csv', headers=admin_headers)
+    assert export.status_code == 200
+    rows = list(csv.reader(io.StringIO(export.get_data(as_text=True))))
+    assert rows[0] == EXPORT_HEADERS
+    assert [row[0] for row in rows[1:]] == ['1', '2', '3', '4', '5']
+
+    # Status changes still find the user on the primary
+    user_id = response.get_json()['user']['id']
+    update = client.put(f'/api/admin/users/{user_id}', json={'status': 'Completed'}, headers=admin_headers)
+    assert update.status_code == 200
@@ -0,0 +1,48 @@
+import time
+
+from backend.app import start_background_services
+from backend.models import db, EmailOutbox
+from test_asgi import USER_DATA
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def outbox_statuses(app):
+    with app.app_context():
+        db.session.expire_all()
+        return [entry.status for entry in EmailOutbox.query.order_by(EmailOutbox.id).all()]
+
+
+def start_app(make_app, sink):
+    app = make_app(sink=sink, OUTBOX_RETRY_BASE_SECONDS=0)
+    start_background_services(app)
+    return app
+
+
+def test_submit_queues_confirmation_and_outbox_delivers_it(smtp_sink, make_app):
+    app = start_app(make_app, smtp_sink)
+    response = app.test_client().post('/api/submit', json=USER_DATA)
+    assert response.status_code == 201
+
+    assert wait_for(lambda: outbox_statuses(app) == ['Sent'])
+    assert len(smtp_sink.messages) == 1
+    assert smtp_sink.messages[0][1] == ['test@example.com']
+
+
+def test_failed_send_is_retried(smtp_sink, make_app):
+    smtp_sink.fail_next = 1
+    app = start_app(make_app, smtp_sink)
+    response = app.test_client().post('/api/submit', json=USER_DATA)
+    assert response.status_code == 201
+
+    assert wait_for(lambda: outbox_statuses(app) == ['Sent'])
+    with app.app_context():
+        assert EmailOutbox.query.one().attempts == 2
+    assert len(smtp_sink.messages) == 1
@@ -0,0 +1,35 @@
+import email
+
+from backend.utils.email_service import build_confirmation_email, build_reminder_email
+
+USER = {
+    'token_number': 7,
+    'name': '<script>alert("hi")</script>',
+    'email': 'user@example.com',
+    'address': '12 Main & Station Road',
+    'contact_number': '98765-43210',
+    'work_description': 'AC <b>not</b> cooling',
+}
+
+
+def test_emails_escape_user_fields_and_carry_a_text_part(make_app):
+    app = make_app(setup=False)
+    with app.app_context():
+        for message in [build_confirmation_email(USER), build_reminder_email(dict(USER, minutes=10))]:
+            assert '#7' in message.subject and message.recipients == ['user@example.com']
+            parts = {part.get_content_type(): part.get_payload(decode=True).decode()
+                     for part in email.message_from_string(message.as_string()).walk()
+                     if not part.is_multipart()}
+            assert set(parts) == {'text/plain', 'text/html'}
+            html, text = parts['text/html'], parts['text/plain']
+
+            # User input never becomes markup in the HTML part...
+            assert '<b>not</b>' not in html and 'AC &lt;b&gt;not&lt;/b&gt; cooling' in html
+            # ...and reads as typed in the text part, which has no markup of its own
+            assert 'AC <b>not</b> cooling' in text
+            assert '<div' not in text and '<td' not in text and '{{' not in text
+
+        confirmation = build_confirmation_email(USER)
+        assert '<script>' not in confirmation.html and '&lt;script&gt;' in confirmation.html
+        assert '12 Main &amp; Station Road' in confirmation.html
+        assert '<script>alert("hi")</script>' in confirmation.body
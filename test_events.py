@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from backend.asgi import AsgiApp
+from backend.services.event_hub import EventHub
+from test_asgi import USER_DATA, call
+
+
+def parse_events(chunks):
+    events = []
+    for block in b''.join(chunks).decode().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if line and not line.startswith(':'))
+        if 'event' in fields:
+            events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_slow_subscriber_loses_oldest_events_and_gets_resync():
+    hub = EventHub(buffer_size=2)
+    subscription = hub.subscribe()
+    for token_number in range(1, 6):
+        hub.publish('token-created', {'token_number': token_number})
+    events = parse_events(subscription.drain())
+    assert events == [('resync', {'dropped': 3}), ('token-created', {'token_number': 4}),
+                      ('token-created', {'token_number': 5})]
+    subscription.close()
+    assert hub.subscriber_count == 0
+
+
+def test_write_paths_publish_to_event_stream_subscribers(make_app, admin_headers):
+    flask_app = make_app()
+    app = AsgiApp(flask_app)
+    hub = flask_app.extensions['event_hub']
+    client = flask_app.test_client()
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        chunks = []
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            chunks.append(message.get('body', b''))
+
+        stream = asyncio.ensure_future(app({
+            'type': 'http', 'method': 'GET', 'path': '/api/events', 'headers': [], 'query_string': b''
+        }, receive, send))
+        while hub.subscriber_count == 0:
+            await asyncio.sleep(0.01)
+
+        # Submits through ASGI, status changes through the Flask routes (in a thread,
+        # as the ASGI app would run them)
+        first = (await call(app, 'POST', '/api/submit', USER_DATA))[1]['user']
+        second = (await call(app, 'POST', '/api/submit', USER_DATA))[1]['user']
+        response = await asyncio.to_thread(client.put, f"/api/admin/users/{first['id']}",
+                                           json={'status': 'Completed'}, headers=admin_headers)
+        assert response.status_code == 200
+        response = await asyncio.to_thread(client.put, '/api/admin/users/status',
+                                           json={'status': 'Completed', 'token_from': 1, 'token_to': 2},
+                                           headers=admin_headers)
+        assert response.get_json()['updated'] == 1
+
+        while len(parse_events(chunks)) < 6:
+            await asyncio.sleep(0.01)
+        disconnect.set()
+        await asyncio.wait_for(stream, 5)
+        return first, second, chunks
+
+    first, second, chunks = asyncio.run(scenario())
+    assert chunks[1].startswith(b'retry:')
+    assert parse_events(chunks) == [
+        ('token-created', {'id': first['id'], 'token_number': 1, 'status': 'Pending'}),
+        ('token-created', {'id': second['id'], 'token_number': 2, 'status': 'Pending'}),
+        ('status-changed', {'status': 'Completed', 'old_status': 'Pending',
+                            'users': [{'id': first['id'], 'token_number': 1}]}),
+        ('now-serving', {'token_number': 2}),
+        ('status-changed', {'status': 'Completed', 'old_status': 'Pending',
+                            'users': [{'id': second['id'], 'token_number': 2}]}),
+        ('now-serving', {'token_number': None}),
+    ]
+    assert hub.subscriber_count == 0
+
+
+def test_event_stream_is_refused_when_streaming_is_off(make_app):
+    # As in gunicorn's sync workers, where a stream would hold the only thread
+    flask_app = make_app(EVENTS_STREAMING=False)
+    response = flask_app.test_client().get('/api/events')
+    assert response.status_code == 503
+    assert flask_app.extensions['event_hub'].subscriber_count == 0
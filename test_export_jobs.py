@@ -0,0 +1,52 @@
+import time
+
+
+def wait_for_job(client, headers, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/admin/exports/{job_id}', headers=headers).get_json()['job']
+        if job['status'] not in ('Queued', 'Running'):
+            return job
+        time.sleep(0.1)
+    return job
+
+
+def test_export_job_is_built_downloaded_and_cached(make_app, tmp_path, admin_headers):
+    app = make_app(EXPORT_DIR=str(tmp_path / 'exports'))
+    client = app.test_client()
+
+    for i in range(3):
+        response = client.post('/api/submit', json={
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "address": "123 Test Street",
+            "contact_number": "123-456-7890",
+            "work_description": "Test work description"
+        })
+        assert response.status_code == 201
+
+    response = client.post('/api/admin/exports', json={'format': 'csv'}, headers=admin_headers)
+    assert response.status_code == 202
+    job_id = response.get_json()['job']['id']
+    assert wait_for_job(client, admin_headers, job_id)['status'] == 'Completed'
+
+    download = client.get(f'/api/admin/exports/{job_id}/download', headers=admin_headers)
+    assert download.status_code == 200
+    lines = download.data.decode().splitlines()
+    assert lines[0].startswith('Token Number,Name,Email')
+    assert len(lines) == 4
+    download.close()
+
+    # Nothing changed, so the finished file is reused
+    response = client.post('/api/admin/exports', json={'format': 'csv'}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['cached'] is True
+    assert response.get_json()['job']['id'] == job_id
+
+    # A status change makes the next export a fresh one
+    client.put('/api/admin/users/1', json={'status': 'Completed'}, headers=admin_headers)
+    response = client.post('/api/admin/exports', json={'format': 'csv'}, headers=admin_headers)
+    assert response.get_json()['job']['id'] != job_id
+    assert wait_for_job(client, admin_headers, response.get_json()['job']['id'])['status'] == 'Completed'
+
+    assert client.post('/api/admin/exports', json={'format': 'doc'}, headers=admin_headers).status_code == 400
@@ -0,0 +1,132 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from openpyxl import load_workbook
+from pypdf import PdfReader
+
+from backend.models import db, User
+from backend.utils.export_service import export_to_pdf_parallel, stream_csv
+
+# The export format from before the streaming exports, which they must keep
+BASELINE_PDF_HEADERS = ['Token', 'Name', 'Email', 'Contact', 'Status']
+BASELINE_HEADERS = ['Token Number', 'Name', 'Email', 'Contact Number', 'Address', 'Work Description',
+                    'Status', 'Created At', 'Updated At']
+
+USERS = [
+    # Fields that need quoting, long enough to be cut short in the PDF, and non-ASCII
+    ('Priya Patel', 'priya@example.com', '98765-43210', '12, "Shanti" Society\nNavrangpura', 'AC service, gas refill'),
+    ('Maximilian Alexander Longname', 'maximilian.alexander@longdomain.example.com', '+91 99887 76655',
+     '1 Main Street', 'Fridge not cooling'),
+    ('Zoë Okubo', 'zoe@example.com', '555-0103', 'Flat 4, Gota', 'Geyser leaking'),
+]
+
+
+def baseline_row(user):
+    # A row as the original export_to_csv/export_to_excel built it
+    return [user.token_number, user.name, user.email, user.contact_number, user.address,
+            user.work_description, user.status,
+            user.created_at.strftime('%Y-%m-%d %H:%M:%S') if user.created_at else '',
+            user.updated_at.strftime('%Y-%m-%d %H:%M:%S') if user.updated_at else '']
+
+
+def baseline_pdf_row(user):
+    # A table row as the original export_to_pdf built it
+    return [str(user.token_number), user.name[:20], user.email[:25], user.contact_number, user.status]
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app(RESPONSE_CACHE_TTL_SECONDS=0)
+    with app.app_context():
+        started = datetime(2025, 3, 1, 9, 30, 15, 123456)
+        for token_number, (name, email, contact_number, address, work) in enumerate(USERS, 1):
+            created_at = started + timedelta(minutes=token_number)
+            db.session.add(User(token_number=token_number, name=name, email=email, contact_number=contact_number,
+                                address=address, work_description=work,
+                                status='Completed' if token_number == 1 else 'Pending', created_at=created_at,
+                                updated_at=created_at + timedelta(minutes=20 if token_number == 1 else 0)))
+        db.session.commit()
+    return app
+
+
+def baseline_rows(app):
+    with app.app_context():
+        return [baseline_row(user) for user in User.query.order_by(User.token_number)]
+
+
+def test_csv_export_matches_the_baseline_format(app, admin_headers):
+    response = app.test_client().get('/api/admin/export/csv', headers=admin_headers)
+    assert response.status_code == 200 and response.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    expected = [[str(value) for value in row] for row in baseline_rows(app)]
+    assert rows == [BASELINE_HEADERS] + expected
+
+    # Batch boundaries leave no trace in the output
+    with app.app_context():
+        assert ''.join(stream_csv(db.session, batch_size=2)) == response.get_data(as_text=True)
+
+
+def test_excel_export_matches_the_baseline_format(app, admin_headers):
+    response = app.test_client().get('/api/admin/export/excel', headers=admin_headers)
+    assert response.status_code == 200
+    workbook = load_workbook(io.BytesIO(response.get_data()), read_only=True)
+    assert workbook.sheetnames == ['Service Tokens']
+    rows = [list(row) for row in workbook['Service Tokens'].iter_rows(values_only=True)]
+    # Token numbers stay numbers, dates stay text, as pandas wrote them
+    assert rows == [BASELINE_HEADERS] + baseline_rows(app)
+    workbook.close()
+
+
+def pdf_pages(data):
+    return [page.extract_text().splitlines() for page in PdfReader(io.BytesIO(data)).pages]
+
+
+def test_pdf_export_matches_the_baseline_table(app, admin_headers):
+    client = app.test_client()
+    response = client.get('/api/admin/export/pdf', headers=admin_headers)
+    assert response.status_code == 200 and response.mimetype == 'application/pdf'
+    [lines] = pdf_pages(response.get_data())
+    assert lines[0] == 'Service Token Report' and lines[1].startswith('Generated on: ')
+    with app.app_context():
+        expected = [cell for user in User.query.order_by(User.token_number) for cell in baseline_pdf_row(user)]
+    table = lines[lines.index('Token'):-1]
+    assert table == BASELINE_PDF_HEADERS + expected
+    assert lines[-1] == 'Page 1 of 1'
+
+    # Longer reports: every page has its own header row, the rows run on in token
+    # order without a gap or repeat, and the parallel render reads the same
+    with app.app_context():
+        for token_number in range(4, 201):
+            db.session.add(User(token_number=token_number, name=f'User {token_number}',
+                                email=f'user{token_number}@example.com', contact_number='555-0100',
+                                address='1 Test Street', work_description='Test work'))
+        db.session.commit()
+    data = client.get('/api/admin/export/pdf', headers=admin_headers).get_data()
+    pages = pdf_pages(data)
+    assert len(pages) >= 4  # enough for two workers to split
+    tokens = []
+    for number, lines in enumerate(pages, 1):
+        assert lines[-1] == f'Page {number} of {len(pages)}'
+        table = lines[lines.index('Token'):-1]
+        assert table[:5] == BASELINE_PDF_HEADERS
+        tokens += [int(cell) for cell in table[5::5]]
+    assert tokens == list(range(1, 201))
+
+    output = io.BytesIO()
+    export_to_pdf_parallel(app.config['SQLALCHEMY_DATABASE_URI'], output, workers=2)
+    parallel = pdf_pages(output.getvalue())
+    assert [page[2:] for page in parallel] == [page[2:] for page in pages]
+
+
+def test_pdf_summary_lists_other_statuses_after_the_usual_ones(app, admin_headers):
+    # Statuses set outside the app, including none at all
+    with app.app_context():
+        db.session.execute(User.__table__.update().where(User.token_number == 2).values(status=None))
+        db.session.execute(User.__table__.update().where(User.token_number == 3).values(status='Archived'))
+        db.session.commit()
+    response = app.test_client().get('/api/admin/export/pdf', headers=admin_headers)
+    assert response.status_code == 200
+    [lines] = pdf_pages(response.get_data())
+    assert lines[2:11] == ['Total', 'Pending', 'Completed', 'Archived', 'No status', '3', '0', '1', '1']
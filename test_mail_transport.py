@@ -0,0 +1,69 @@
+import socket
+import threading
+
+from flask_mail import Message
+
+
+def message(i):
+    return Message(subject=f"Message {i}", recipients=[f"user{i}@example.com"], body="Test")
+
+
+def test_pooled_connection_is_reused_and_reopened_when_dropped(smtp_sink, make_app):
+    app = make_app(sink=smtp_sink, setup=False, MAIL_POOL_SIZE=1)
+    transport = app.extensions['mail_transport']
+    with app.app_context():
+        # One handshake for every message, sent one by one or in bulk
+        transport.send(message(1))
+        transport.send(message(2))
+        assert transport.send_bulk([message(3), message(4)]) == [None, None]
+        assert smtp_sink.connections == 1
+
+        # A rejected message leaves the connection in use
+        smtp_sink.fail_next = 1
+        errors = transport.send_bulk([message(5), message(6)])
+        assert errors[0] is not None and errors[1] is None
+        assert smtp_sink.connections == 1
+
+        # The server dropped the idle connection: the next send opens a new
+        # one and the message still goes out
+        conn, _ = transport._idle.queue[0]
+        conn.host.sock.shutdown(socket.SHUT_RDWR)
+        transport.send(message(7))
+        assert smtp_sink.connections == 2
+
+        # Idle past max_idle_seconds, the connection is checked with NOOP
+        transport.max_idle_seconds = 0
+        conn, _ = transport._idle.queue[0]
+        conn.host.sock.shutdown(socket.SHUT_RDWR)
+        assert transport.send_bulk([message(8)]) == [None]
+        assert smtp_sink.connections == 3
+        assert transport._open_count == 1
+    assert [rcpt_tos for _, rcpt_tos, _ in smtp_sink.messages] == [
+        [f"user{i}@example.com"] for i in (1, 2, 3, 4, 6, 7, 8)
+    ]
+
+
+def test_outage_does_not_block_waiting_senders(make_app):
+    # Nothing listens on this port, so every open and reopen fails
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    app = make_app(setup=False, MAIL_SUPPRESS_SEND=False, MAIL_SERVER='127.0.0.1', MAIL_PORT=port,
+                   MAIL_USE_TLS=False, MAIL_USERNAME='', MAIL_PASSWORD='', MAIL_POOL_SIZE=1)
+    transport = app.extensions['mail_transport']
+    results = []
+
+    def send():
+        with app.app_context():
+            results.append(transport.send_bulk([message(1), message(2)]))
+
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(results) == 4
+    assert all(error is not None for errors in results for error in errors)
+    assert transport._open_count == 0
@@ -0,0 +1,104 @@
+import logging
+import re
+import time
+
+from sqlalchemy import select
+
+from backend.app import start_background_services
+from backend.models import db, User
+from backend.services.metrics import EMAILS, REQUEST_DURATION, REQUEST_QUERIES, SCHEDULER_JOB_DURATION
+from test_asgi import USER_DATA
+from test_email_outbox import wait_for
+
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{([a-z_]+="[^"]*",?)*\})? [0-9.e+-]+$|^# (HELP|TYPE) ')
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_requests_queries_emails_and_jobs_are_measured(smtp_sink, make_app, admin_headers):
+    app = make_app(sink=smtp_sink, METRICS_TOKEN='scrape-me', METRICS_QUERY_WARN_THRESHOLD=3, PROFILER_ENABLED=True)
+
+    @app.route('/test/lookups')
+    def one_query_per_user():
+        # The N+1 shape: one query per row
+        for token_number in range(1, 6):
+            db.session.execute(select(User.id).where(User.token_number == token_number)).all()
+        return {'done': True}
+
+    @app.route('/test/slow')
+    def slow():
+        busy_work(0.05)
+        return {'done': True}
+
+    start_background_services(app)
+    client = app.test_client()
+
+    submits = REQUEST_DURATION.count(method='POST', route='/api/submit', status='201')
+    sent = EMAILS.value(kind='confirmation', result='sent')
+    sweeps = SCHEDULER_JOB_DURATION.count(job='reminder_sweep')
+
+    user_id = client.post('/api/submit', json=USER_DATA).get_json()['user']['id']
+    assert REQUEST_DURATION.count(method='POST', route='/api/submit', status='201') == submits + 1
+    assert wait_for(lambda: EMAILS.value(kind='confirmation', result='sent') == sent + 1)
+
+    client.put(f'/api/admin/users/{user_id}', json={'status': 'Completed'}, headers=admin_headers)
+    assert wait_for(lambda: SCHEDULER_JOB_DURATION.count(job='reminder_sweep') > sweeps)
+
+    # Queries are counted per request, and a request over the threshold is logged
+    queries = REQUEST_QUERIES.count(method='GET', route='/test/lookups')
+    logger = logging.getLogger('backend.services.metrics')
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger.addHandler(handler)
+    try:
+        client.get('/test/lookups')
+    finally:
+        logger.removeHandler(handler)
+    assert REQUEST_QUERIES.count(method='GET', route='/test/lookups') == queries + 1
+    assert any('GET /test/lookups ran 5 queries' in record.getMessage() for record in records)
+
+    # Unknown paths share one label instead of one series per URL
+    client.get('/api/unknown/1')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers=admin_headers).status_code == 200
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert all(SAMPLE_LINE.match(line) for line in text.splitlines()), text
+    assert 'http_request_db_queries_bucket{method="GET",route="/test/lookups",le="5.0"}' in text
+    assert '# TYPE emails counter' in text
+    assert 'route="/<path:filename>"' in text
+    assert '/api/unknown/1' not in text
+
+    # Only authorized requests that ask for it are profiled
+    assert 'X-Profile-Id' not in client.get('/test/slow').headers
+    assert 'X-Profile-Id' not in client.get('/test/slow', headers={'X-Profile': '1'}).headers
+    response = client.get('/test/slow', headers={'X-Profile': '1', **admin_headers})
+    profile_id = response.headers['X-Profile-Id']
+    listing = client.get('/api/admin/profiles', headers=admin_headers).get_json()
+    assert listing['profiles'][0]['id'] == profile_id
+    assert listing['profiles'][0]['samples'] > 0
+    stacks = client.get(f'/api/admin/profiles/{profile_id}', headers=admin_headers).get_data(as_text=True)
+    assert 'busy_work (test_metrics.py' in stacks
+    assert all(re.match(r'^.+ \d+$', line) for line in stacks.splitlines())
+
+
+def test_metrics_and_profiling_are_not_public_by_default(make_app, admin_headers):
+    app = make_app(PROFILER_ENABLED=True)
+    client = app.test_client()
+
+    # No METRICS_TOKEN: anonymous callers get neither metrics nor profiles
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer '}).status_code == 401
+    assert 'X-Profile-Id' not in client.get('/api/next-token', headers={'X-Profile': '1'}).headers
+    assert len(app.extensions['profiles']) == 0
+
+    assert client.get('/metrics', headers=admin_headers).status_code == 200
+    assert 'X-Profile-Id' in client.get('/api/next-token', headers={'X-Profile': '1', **admin_headers}).headers
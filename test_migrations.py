@@ -0,0 +1,67 @@
+import sqlite3
+
+from sqlalchemy import inspect, text
+
+from backend.app import setup_database
+from backend.models import db, User
+
+# The schema db.create_all() made before migrations existed: users and completed_works
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL,
+    token_number INTEGER NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    email VARCHAR(120) NOT NULL,
+    address TEXT NOT NULL,
+    contact_number VARCHAR(20) NOT NULL,
+    work_description TEXT NOT NULL,
+    status VARCHAR(20),
+    created_at DATETIME,
+    updated_at DATETIME,
+    reminder_sent BOOLEAN,
+    PRIMARY KEY (id),
+    UNIQUE (token_number)
+);
+CREATE TABLE completed_works (
+    id INTEGER NOT NULL,
+    count INTEGER,
+    last_updated DATETIME,
+    PRIMARY KEY (id)
+);
+INSERT INTO users (token_number, name, email, address, contact_number, work_description, status,
+                   created_at, updated_at, reminder_sent)
+VALUES (1, 'Old User', 'old@example.com', '1 Old Street', '555-0101', 'Old work', 'Pending',
+        '2024-01-01 10:00:00.000000', '2024-01-01 10:00:00.000000', 0);
+"""
+
+
+def test_baseline_database_upgrades_to_head(make_app, tmp_path):
+    db_path = tmp_path / 'baseline.db'
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+
+    app = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{db_path}")
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        assert {'token_sequences', 'email_outbox', 'scheduler_leases', 'status_counters',
+                'export_jobs', 'service_time_stats', 'users_fts'} <= tables
+        from alembic.script import ScriptDirectory
+        from backend.services.migration_service import MIGRATIONS_DIRECTORY
+        head = ScriptDirectory(MIGRATIONS_DIRECTORY).get_current_head()
+        assert db.session.execute(text("SELECT version_num FROM alembic_version")).scalar() == head
+        assert User.query.one().name == 'Old User'
+        # Only indexes that serve a query; email and contact number lookups go
+        # through the search index
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('users')}
+        assert indexes == {'ix_users_status_token_number', 'ix_users_updated_at'}
+
+    # The upgraded database serves the app: the next token follows the old one
+    response = app.test_client().post('/api/submit', json={
+        'name': 'New User', 'email': 'new@example.com', 'address': '2 New Street',
+        'contact_number': '555-0102', 'work_description': 'New work'
+    })
+    assert response.status_code == 201
+    assert response.get_json()['token_number'] == 2
+
+    # Running it again is a no-op
+    setup_database(app)
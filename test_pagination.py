@@ -0,0 +1,65 @@
+from sqlalchemy import event
+
+from backend.models import db
+from test_asgi import USER_DATA
+
+
+def test_admin_listing_pages_by_keyset_cursor(app, client, admin_headers):
+    def submit(count):
+        for _ in range(count):
+            assert client.post('/api/submit', json=USER_DATA).status_code == 201
+
+    def page(**params):
+        response = client.get('/api/admin/users', query_string=params, headers=admin_headers)
+        assert response.status_code == 200
+        return response.get_json()
+
+    submit(10)
+    # Completes tokens 10, 9 and 8
+    ids = [user['id'] for user in page(limit=10)['users']]
+    for user_id in ids[:3]:
+        client.put(f'/api/admin/users/{user_id}', json={'status': 'Completed'}, headers=admin_headers)
+
+    # Newest first, four at a time; the total comes with the first page only
+    first = page(limit=4)
+    assert [user['token_number'] for user in first['users']] == [10, 9, 8, 7]
+    assert (first['total'], first['has_more'], first['next_cursor']) == (10, True, 7)
+
+    # Tokens submitted between pages land in front of the cursor: the listing
+    # carries on where it was, with nothing repeated or skipped
+    submit(3)
+    second = page(limit=4, cursor=first['next_cursor'])
+    assert [user['token_number'] for user in second['users']] == [6, 5, 4, 3]
+    assert (second['total'], second['has_more'], second['next_cursor']) == (None, True, 3)
+
+    # The last page says so, and has no cursor to follow
+    last = page(limit=4, cursor=second['next_cursor'])
+    assert [user['token_number'] for user in last['users']] == [2, 1]
+    assert (last['has_more'], last['next_cursor']) == (False, None)
+    assert page(limit=4, cursor=1)['users'] == []
+
+    # A page that exactly fills the limit is also the last one
+    exact = page(limit=2, cursor=3)
+    assert [user['token_number'] for user in exact['users']] == [2, 1]
+    assert (exact['has_more'], exact['next_cursor']) == (False, None)
+
+    # Filters hold across pages
+    pending = page(limit=5, status='Pending')
+    assert [user['token_number'] for user in pending['users']] == [13, 12, 11, 7, 6]
+    assert pending['total'] == 10
+    rest = page(limit=5, status='Pending', cursor=pending['next_cursor'])
+    assert [user['token_number'] for user in rest['users']] == [5, 4, 3, 2, 1]
+    assert (rest['has_more'], rest['next_cursor']) == (False, None)
+
+    # Without a search the total is read from the status counters, not counted
+    statements = []
+    with app.app_context():
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert page(limit=5)['total'] == 13
+            assert page(limit=5, status='Completed')['total'] == 3
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+    assert statements and not any('count(' in statement.lower() for statement in statements)
+    assert page(limit=5, search='test')['total'] == 13
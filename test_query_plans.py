@@ -0,0 +1,68 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, or_, and_
+
+from backend.models import db, User, EmailOutbox
+from backend.utils.user_serializer import USER_FIELDS, select_users
+from benchmarks.seed import seed_users
+
+# The hot queries must be answered from an index once the migrations have run: no
+# plain table scans, and listings come back in index order without a sort step.
+
+
+def explain(conn, statement):
+    compiled = statement.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    rows = conn.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {compiled.string}",
+        tuple(params[name] for name in compiled.positiontup)
+    )
+    return [row[3] for row in rows]
+
+
+def hot_queries():
+    now = datetime.utcnow()
+    listing = select_users(USER_FIELDS).order_by(User.token_number.desc()).limit(51)
+    return {
+        'listing': (listing, True),
+        'listing cursor': (listing.where(User.token_number < 500), True),
+        'listing by status': (listing.where(User.status == 'Pending'), True),
+        'listing by status cursor': (listing.where(User.status == 'Pending', User.token_number < 500), True),
+        'counts by status': (select(User.status, func.count(User.id)).group_by(User.status), False),
+        'reminder sweep': (
+            select(User).where(User.status == 'Pending').order_by(User.token_number).limit(3),
+            True
+        ),
+        'tokens ahead': (
+            select(func.count()).select_from(User).where(User.status == 'Pending', User.token_number < 1500),
+            False
+        ),
+        'token index refresh': (
+            select(User.token_number, User.status).where(User.updated_at >= now - timedelta(minutes=1)),
+            False
+        ),
+        'outbox due': (
+            select(EmailOutbox.id).where(or_(
+                and_(EmailOutbox.status == 'Queued', EmailOutbox.next_attempt_at <= now),
+                and_(EmailOutbox.status == 'Sending', EmailOutbox.locked_at < now - timedelta(minutes=5))
+            )).order_by(EmailOutbox.id).limit(50),
+            False
+        ),
+        'outbox next attempt': (
+            select(func.min(EmailOutbox.next_attempt_at)).where(EmailOutbox.status == 'Queued'),
+            False
+        ),
+    }
+
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        seed_users(db.engine, 2000)
+        with db.engine.connect() as conn:
+            for name, (statement, ordered) in hot_queries().items():
+                plan = explain(conn, statement)
+                scans = [step for step in plan if re.match(r'SCAN \w+$', step)]
+                assert not scans, f"{name} scans the table: {plan}"
+                if ordered:
+                    assert not any('TEMP B-TREE' in step for step in plan), f"{name} sorts: {plan}"
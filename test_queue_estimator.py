@@ -0,0 +1,112 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from backend.app import setup_database
+from backend.models import db, User, EmailOutbox, ServiceTimeStats
+from test_asgi import USER_DATA
+
+
+def test_service_time_is_learnt_from_completions_and_drives_reminders(make_app, admin_headers):
+    # A window of 3: each completion moves the mean halfway to its duration
+    app = make_app(SERVICE_TIME_MINUTES=10, SERVICE_TIME_WINDOW=3, REMINDER_LEAD_MINUTES=25)
+    client = app.test_client()
+
+    ids = []
+    for i in range(6):
+        response = client.post('/api/submit', json={
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "address": "123 Test Street",
+            "contact_number": "123-456-7890",
+            "work_description": "Test work description"
+        })
+        ids.append(response.get_json()['user']['id'])
+    with app.app_context():
+        db.session.execute(update(User).values(created_at=datetime.utcnow() - timedelta(hours=1)))
+        db.session.commit()
+
+    # No completions yet: the configured service time
+    queue = client.get('/api/queue/3').get_json()['queue']
+    assert (queue['position'], queue['ahead'], queue['eta_minutes']) == (3, 2, 20)
+    assert queue['service_time_minutes'] == 10
+    assert client.get('/api/queue/99').status_code == 404
+
+    def reminded():
+        with app.app_context():
+            return sorted(
+                json.loads(email.payload)['token_number']
+                for email in EmailOutbox.query.filter_by(kind='reminder')
+            )
+
+    # Token 1 waited an hour with nobody ahead: a 60 minute service, so the mean
+    # is 35 minutes and only the next token is within the 25 minute lead
+    client.put(f'/api/admin/users/{ids[0]}', json={'status': 'Completed'}, headers=admin_headers)
+    queue = client.get('/api/queue/2').get_json()['queue']
+    assert queue['service_time_minutes'] == pytest.approx(35, abs=0.1)
+    assert (queue['position'], queue['eta_minutes']) == (1, 0)
+    assert reminded() == [2]
+
+    # Two completions straight after the last one share its (near zero) interval:
+    # the mean drops to about 9 minutes, bringing tokens 4-6 within the lead
+    response = client.put('/api/admin/users/status', json={'status': 'Completed', 'ids': ids[1:3]},
+                          headers=admin_headers)
+    assert response.get_json()['updated'] == 2
+    queue = client.get('/api/queue/5').get_json()['queue']
+    assert queue['service_time_minutes'] == pytest.approx(8.75, abs=0.1)
+    assert (queue['position'], queue['ahead'], queue['eta_minutes']) == (2, 1, 9)
+    assert reminded() == [2, 4, 5, 6]
+
+    queue = client.get('/api/queue/2').get_json()['queue']
+    assert queue['status'] == 'Completed'
+    assert queue['position'] is None and queue['eta_minutes'] is None
+
+    with app.app_context():
+        stats = ServiceTimeStats.query.one()
+        assert stats.samples == 3
+
+    # A completion after a long idle gap moves the clock on but is not a sample
+    with app.app_context():
+        db.session.execute(update(ServiceTimeStats).values(
+            last_completed_at=datetime.utcnow() - timedelta(hours=5)))
+        db.session.execute(update(User).values(created_at=datetime.utcnow() - timedelta(hours=6)))
+        db.session.commit()
+    client.put(f'/api/admin/users/{ids[3]}', json={'status': 'Completed'}, headers=admin_headers)
+    with app.app_context():
+        stats = ServiceTimeStats.query.one()
+        assert stats.samples == 3
+        assert stats.mean_seconds / 60 == pytest.approx(8.75, abs=0.1)
+        assert stats.last_completed_at > datetime.utcnow() - timedelta(minutes=1)
+
+
+def test_first_completions_in_parallel_share_the_stats_row(make_app, admin_headers):
+    # The row exists from setup on, so simultaneous first completions cannot race
+    # to create it
+    app = make_app(SERVICE_TIME_MINUTES=10)
+    with app.app_context():
+        stats = ServiceTimeStats.query.one()
+        assert (stats.mean_seconds, stats.samples, stats.last_completed_at) == (600, 0, None)
+
+    client = app.test_client()
+    ids = [client.post('/api/submit', json=USER_DATA).get_json()['user']['id'] for _ in range(6)]
+
+    def complete(user_id):
+        return app.test_client().put(f'/api/admin/users/{user_id}', json={'status': 'Completed'},
+                                     headers=admin_headers).status_code
+
+    with ThreadPoolExecutor(6) as pool:
+        assert list(pool.map(complete, ids)) == [200] * 6
+    with app.app_context():
+        # Completions committed out of order are not samples
+        stats = ServiceTimeStats.query.one()
+        learnt = (stats.mean_seconds, stats.samples, stats.last_completed_at)
+        assert 1 <= stats.samples <= 6 and stats.last_completed_at is not None
+
+    # Setting up again keeps what was learnt
+    setup_database(app)
+    with app.app_context():
+        stats = ServiceTimeStats.query.one()
+        assert (stats.mean_seconds, stats.samples, stats.last_completed_at) == learnt
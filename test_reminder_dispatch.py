@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+from apscheduler.events import EVENT_JOB_MISSED, JobExecutionEvent
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from backend.asgi import AsgiApp
+from backend.models import db, CompletedWork, EmailOutbox
+from backend.services.metrics import SCHEDULER_JOB_DURATION
+from backend.services.scheduler_service import ReminderDispatcher
+from test_asgi import USER_DATA, call, lifespan
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def with_completed_work(app):
+    with app.app_context():
+        db.session.add(CompletedWork(count=1))
+        db.session.commit()
+    return app
+
+
+def reminded(app):
+    with app.app_context():
+        db.session.expire_all()
+        return sorted(email.recipient for email in EmailOutbox.query.filter_by(kind='reminder'))
+
+
+def test_dispatch_survives_busy_executor_and_missed_runs(app):
+    scheduler = BackgroundScheduler(executors={'default': ThreadPoolExecutor(1)})
+    scheduler.start()
+    try:
+        dispatcher = ReminderDispatcher(app, scheduler)
+
+        def sweeps():
+            return SCHEDULER_JOB_DURATION.count(job='reminder_sweep')
+
+        # The only executor thread is busy for longer than APScheduler's default
+        # one second misfire grace time: the queued sweep must still run
+        release = threading.Event()
+        scheduler.add_job(release.wait, args=(1.5,))
+        time.sleep(0.1)
+        before = sweeps()
+        dispatcher.request()
+        assert wait_for(lambda: sweeps() > before)
+        assert wait_for(lambda: not dispatcher._running)
+
+        # A run APScheduler reports as missed leaves nothing stuck: the pending
+        # request is scheduled again, and later requests still sweep
+        with dispatcher._lock:
+            dispatcher._running = dispatcher._pending = True
+        before = sweeps()
+        dispatcher._on_job_event(JobExecutionEvent(EVENT_JOB_MISSED, ReminderDispatcher.JOB_ID, None,
+                                                   datetime.now()))
+        assert wait_for(lambda: sweeps() > before)
+        assert wait_for(lambda: not dispatcher._running)
+
+        before = sweeps()
+        dispatcher.request()
+        assert wait_for(lambda: sweeps() > before)
+    finally:
+        scheduler.shutdown(wait=False)
+
+
+def test_submit_into_a_short_queue_is_reminded(make_app, tmp_path):
+    # Work has been completed before, and the queue is empty: a new token is next in
+    # line, so it is owed its reminder without waiting for another completion
+    app = with_completed_work(make_app())
+    response = app.test_client().post('/api/submit', json=dict(USER_DATA, email='flask@example.com'))
+    assert response.status_code == 201
+    assert reminded(app) == ['flask@example.com']
+
+    flask_app = with_completed_work(make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'asgi.db'}"))
+    app = AsgiApp(flask_app)
+
+    async def scenario():
+        await lifespan(app, 'startup')
+        try:
+            status, _ = await call(app, 'POST', '/api/submit', dict(USER_DATA, email='asgi@example.com'))
+            assert status == 201
+            assert wait_for(lambda: reminded(flask_app) == ['asgi@example.com'])
+        finally:
+            await lifespan(app, 'shutdown')
+
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+def submit(client, name):
+    response = client.post('/api/submit', json={
+        "name": name,
+        "email": "test@example.com",
+        "address": "123 Test Street",
+        "contact_number": "123-456-7890",
+        "work_description": "Test work description"
+    })
+    assert response.status_code == 201
+    return response.get_json()['user']['id']
+
+
+def test_admin_reads_are_cached_until_a_write_and_support_etags(make_app, admin_headers):
+    app = make_app(RESPONSE_CACHE_TTL_SECONDS=300)
+    client = app.test_client()
+    cache = app.extensions['response_cache']
+
+    user_id = submit(client, 'First User')
+
+    first = client.get('/api/admin/stats', headers=admin_headers)
+    assert first.get_json()['stats']['pending'] == 1
+    etag = first.headers['ETag']
+    second = client.get('/api/admin/stats', headers=admin_headers)
+    assert second.headers['ETag'] == etag
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # An unchanged poll gets a 304 without a body
+    unchanged = client.get('/api/admin/stats', headers={**admin_headers, 'If-None-Match': etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b''
+
+    # The key covers the query string, in any parameter order
+    client.get('/api/admin/users?status=Pending&limit=10', headers=admin_headers)
+    listing = client.get('/api/admin/users?limit=10&status=Pending', headers=admin_headers)
+    assert listing.get_json()['total'] == 1
+    assert client.get('/api/admin/users?limit=5', headers=admin_headers).get_json()['total'] == 1
+    assert (cache.hits, cache.misses) == (3, 3)
+
+    # A submit invalidates both
+    submit(client, 'Second User')
+    changed = client.get('/api/admin/stats', headers={**admin_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.get_json()['stats']['pending'] == 2
+    assert client.get('/api/admin/users?status=Pending&limit=10', headers=admin_headers).get_json()['total'] == 2
+
+    # So does a status change
+    update = client.put(f'/api/admin/users/{user_id}', json={'status': 'Completed'}, headers=admin_headers)
+    assert update.status_code == 200
+    assert client.get('/api/admin/stats', headers=admin_headers).get_json()['stats']['completed'] == 1
+    assert client.get('/api/admin/users?limit=10&status=Pending', headers=admin_headers).get_json()['total'] == 1
+
+    # Authorization is still checked before the cache
+    assert client.get('/api/admin/stats').status_code == 401
+
+    stats = client.get('/api/admin/cache', headers=admin_headers).get_json()['stats']
+    assert stats['backend'] == 'LocalCacheBackend'
+    assert stats['hits'] == 3
+    assert stats['misses'] == 7
+    assert stats['not_modified'] == 1
+    assert stats['invalidations'] == 6
@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import Counter
+
+from backend.app import start_background_services
+from backend.config import Config
+from backend.models import db, EmailOutbox
+
+WORKERS = 3
+USERS = 12
+
+
+def wait_for(condition, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def outbox_settled(app):
+    with app.app_context():
+        db.session.expire_all()
+        return EmailOutbox.query.filter(EmailOutbox.status.in_(['Queued', 'Sending'])).count() == 0
+
+
+def test_each_reminder_is_sent_exactly_once_across_workers(smtp_sink, make_app):
+    # Several app instances against one database, like gunicorn workers
+    apps = [
+        make_app(sink=smtp_sink, setup=i == 0, SQLITE_PRAGMAS={**Config.SQLITE_PRAGMAS, 'busy_timeout': 30000},
+                 SCHEDULER_LEASE_SECONDS=3)
+        for i in range(WORKERS)
+    ]
+    for app in apps:
+        start_background_services(app)
+    assert wait_for(lambda: sum(app.extensions['scheduler_coordinator'].is_leader for app in apps) == 1)
+
+    client = apps[0].test_client()
+    for i in range(USERS):
+        response = client.post('/api/submit', json={
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "address": "123 Test Street",
+            "contact_number": "123-456-7890",
+            "work_description": "Test work description"
+        })
+        assert response.status_code == 201
+
+    token = client.post('/api/admin/login', json={'username': 'admin', 'password': 'admin123'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Complete works through every worker at once. A failed assert in a
+    # thread only ends that thread, so the codes are checked after join()
+    status_codes = {}
+
+    def complete(app, user_ids):
+        worker_client = app.test_client()
+        for user_id in user_ids:
+            response = worker_client.put(f'/api/admin/users/{user_id}', json={'status': 'Completed'}, headers=headers)
+            status_codes[user_id] = response.status_code
+
+    completed_ids = list(range(1, 9))
+    threads = [
+        threading.Thread(target=complete, args=(app, completed_ids[i::WORKERS]))
+        for i, app in enumerate(apps)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert status_codes == {user_id: 200 for user_id in completed_ids}
+
+    assert wait_for(lambda: all(outbox_settled(app) for app in apps))
+
+    reminders = Counter(
+        rcpt_tos[0]
+        for _, rcpt_tos, data in smtp_sink.messages
+        if b'Subject: Service Reminder' in data
+    )
+    # The front of the queue is owed reminders as far as REMINDER_LEAD_MINUTES
+    # reaches. The completions came seconds apart, so the learnt service time is
+    # short and tokens 9 and 10 are within the lead by the end; tokens completed
+    # before a sweep reached them got none. Nobody may get two.
+    assert reminders
+    assert max(reminders.values()) == 1
+    assert {'user8@example.com', 'user9@example.com'} <= set(reminders)
+    assert sum(app.extensions['scheduler_coordinator'].is_leader for app in apps) == 1
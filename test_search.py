@@ -0,0 +1,59 @@
+from sqlalchemy import text
+
+from backend.models import db, User
+
+USERS = [
+    # name, email, contact number; token numbers follow the order
+    ('Anna Smith', 'anna.smith@example.com', '98765-43210'),
+    ('Priya Patel', 'priya@example.com', '+91 99887 76655'),
+    ('Patrick Shah', 'patrick@example.com', '(079) 2658 1234'),
+    ('Carlos Garcia', 'garcia.smithson@example.com', '555-0103'),
+]
+
+
+def test_admin_search_uses_the_fts5_index(make_app, admin_headers):
+    app = make_app(RESPONSE_CACHE_TTL_SECONDS=0)
+    client = app.test_client()
+    with app.app_context():
+        for token_number, (name, email, contact_number) in enumerate(USERS, 1):
+            db.session.add(User(token_number=token_number, name=name, email=email, address='1 Test Street',
+                                contact_number=contact_number, work_description='Test work'))
+        db.session.commit()
+
+    def search(term, **params):
+        response = client.get('/api/admin/users', query_string={'search': term, **params}, headers=admin_headers)
+        assert response.status_code == 200
+        return [user['name'] for user in response.get_json()['users']]
+
+    # Every word matches as a prefix, of any of the columns
+    assert search('pat') == ['Patrick Shah', 'Priya Patel']
+    assert app.extensions['user_search'] == 'fts5'
+    assert search('pat pri') == ['Priya Patel']
+    assert search('garcia.smithson@example.com') == ['Carlos Garcia']
+    assert search('nobody') == []
+    # Contact numbers match without their punctuation, and as they are written
+    assert search('9876543210') == ['Anna Smith']
+    assert search('99887') == ['Priya Patel']
+    assert search('2658') == ['Patrick Shah']
+    # A token number finds its token, ahead of any text match
+    assert search('#3') == ['Patrick Shah']
+    assert search('4', order='relevance')[0] == 'Carlos Garcia'
+
+    # Newest first by default; by relevance, the user matching twice comes first
+    assert search('smith') == ['Carlos Garcia', 'Anna Smith']
+    assert search('smith', order='relevance') == ['Anna Smith', 'Carlos Garcia']
+
+    # The triggers keep the index in step with users
+    with app.app_context():
+        user = User.query.filter_by(token_number=2).one()
+        user.name = 'Priya Desai'
+        user.contact_number = '11223-34455'
+        db.session.delete(User.query.filter_by(token_number=3).one())
+        db.session.commit()
+        indexed = db.session.execute(text("SELECT count(*) FROM users_fts")).scalar()
+        assert indexed == User.query.count() == 3
+    assert search('pat') == []
+    assert search('desai') == ['Priya Desai']
+    assert search('1122334455') == ['Priya Desai']
+    assert search('99887') == []
+    assert search('patrick') == []
@@ -0,0 +1,51 @@
+from sqlalchemy import select, update
+
+from backend.models import db, StatusCounter, User
+from backend.services.stats_service import count_users_by_status, reconcile_status_counters
+from test_asgi import USER_DATA
+
+
+def test_status_counters_follow_every_write_path(app, client, admin_headers):
+    def counters():
+        with app.app_context():
+            stored = dict(db.session.execute(select(StatusCounter.status, StatusCounter.count)).all())
+            # Statuses nobody has any more keep a zero counter
+            return {status: count for status, count in stored.items() if count}, count_users_by_status()
+
+    ids = [client.post('/api/submit', json=USER_DATA).get_json()['user']['id'] for _ in range(8)]
+    stored, actual = counters()
+    assert stored == actual == {'Pending': 8}
+
+    # Single updates, including a no-op and a move back to Pending
+    for user_id, status in [(ids[0], 'Completed'), (ids[0], 'Completed'), (ids[1], 'Completed'),
+                            (ids[1], 'Pending')]:
+        response = client.put(f'/api/admin/users/{user_id}', json={'status': status}, headers=admin_headers)
+        assert response.status_code == 200
+    stored, actual = counters()
+    assert stored == actual == {'Pending': 7, 'Completed': 1}
+
+    # Bulk updates by id and by token range, overlapping what is already done
+    for body in [{'status': 'Completed', 'ids': ids[:4]}, {'status': 'Completed', 'token_from': 3, 'token_to': 6},
+                 {'status': 'Pending', 'ids': ids[5:7]}]:
+        response = client.put('/api/admin/users/status', json=body, headers=admin_headers)
+        assert response.status_code == 200
+    stored, actual = counters()
+    assert stored == actual == {'Pending': 3, 'Completed': 5}
+
+    stats = client.get('/api/admin/stats', headers=admin_headers).get_json()['stats']
+    assert (stats['total'], stats['pending'], stats['completed']) == (8, 3, 5)
+
+    # Users deleted behind the app's back, and counters drifting on their own,
+    # are repaired by the reconcile job
+    with app.app_context():
+        db.session.delete(db.session.get(User, ids[0]))
+        db.session.delete(db.session.get(User, ids[7]))
+        db.session.execute(update(StatusCounter).where(StatusCounter.status == 'Completed')
+                           .values(count=StatusCounter.count + 5))
+        db.session.commit()
+    stored, actual = counters()
+    assert stored == {'Pending': 3, 'Completed': 10} and actual == {'Pending': 2, 'Completed': 4}
+
+    reconcile_status_counters(app)
+    stored, actual = counters()
+    assert stored == actual == {'Pending': 2, 'Completed': 4}
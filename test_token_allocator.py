@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.models import db, User
+from test_asgi import USER_DATA
+
+
+def submit_concurrently(app, clients=8, submits=5):
+    # Returns the token numbers the responses carried and those stored, both sorted
+    def submit(_):
+        client = app.test_client()
+        return [client.post('/api/submit', json=USER_DATA) for _ in range(submits)]
+
+    with ThreadPoolExecutor(clients) as pool:
+        responses = [response for batch in pool.map(submit, range(clients)) for response in batch]
+    assert [response.status_code for response in responses] == [201] * clients * submits
+
+    with app.app_context():
+        stored = sorted(token for token, in db.session.query(User.token_number))
+    return sorted(response.get_json()['token_number'] for response in responses), stored
+
+
+def test_concurrent_submits_get_unique_gap_free_tokens(make_app):
+    app = make_app(TOKEN_BLOCK_SIZE=1)
+    returned, stored = submit_concurrently(app)
+    assert returned == stored == list(range(1, 41))
+
+    # A rolled back submit gives its token back
+    with app.app_context():
+        allocator = app.extensions['token_allocator']
+        assert allocator.allocate() == 41
+        db.session.rollback()
+        assert allocator.allocate() == 41
+        db.session.rollback()
+
+
+def test_concurrent_submits_with_token_blocks_stay_unique_and_gap_free(make_app):
+    # One worker hands out every token of its blocks, in order
+    app = make_app(TOKEN_BLOCK_SIZE=5)
+    returned, stored = submit_concurrently(app)
+    assert returned == stored == list(range(1, 41))
+    with app.app_context():
+        assert app.extensions['token_allocator'].peek_next() == 41
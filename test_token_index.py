@@ -0,0 +1,112 @@
+import random
+import threading
+import time
+
+from sqlalchemy import event
+
+from backend.models import db
+from backend.services.rate_limiter import RateLimiter
+from backend.services.token_index import TokenIndex
+
+
+def test_positions_match_a_scan_through_growth_and_status_changes():
+    rng = random.Random(7)
+    index = TokenIndex()
+    statuses = {}
+    for _ in range(3000):
+        token_number = rng.randint(1, 6000)
+        status = rng.choice(['Pending', 'Pending', 'Completed'])
+        index.set_status(token_number, status)
+        statuses[token_number] = status
+
+    for token_number in range(1, 6002):
+        status = statuses.get(token_number)
+        if status is None:
+            assert index.lookup(token_number) is None
+            continue
+        ahead = sum(1 for other, other_status in statuses.items()
+                    if other < token_number and other_status == 'Pending')
+        assert index.lookup(token_number) == (status, ahead if status == 'Pending' else None)
+    assert index.memory_bytes() == 5 * (index.capacity + 1)
+
+
+def test_concurrent_first_lookups_load_the_index_once():
+    index = TokenIndex()
+    loads = []
+
+    def load(session=None):
+        loads.append(session)
+        time.sleep(0.1)
+        index.loaded = True
+
+    index.load = load
+    threads = [threading.Thread(target=index.ensure_loaded) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+
+
+def test_token_lookup_is_served_from_the_index_and_follows_writes(make_app, admin_headers):
+    # The index is refreshed by hand below
+    settings = dict(SERVICE_TIME_MINUTES=10, TOKEN_INDEX_REFRESH_SECONDS=3600, TOKEN_LOOKUP_RATE_LIMIT=30)
+    # Two app instances on one database, like two gunicorn workers
+    app, other_app = make_app(**settings), make_app(setup=False, **settings)
+    client, other_client = app.test_client(), other_app.test_client()
+
+    def submit(test_client, i):
+        return test_client.post('/api/submit', json={
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "address": "123 Test Street",
+            "contact_number": "123-456-7890",
+            "work_description": "Test work description"
+        }).get_json()['user']['id']
+
+    ids = [submit(client, i) for i in range(4)]
+    token = client.get('/api/token/3').get_json()['token']
+    assert token.pop('estimated_start') is not None
+    assert token == {'token_number': 3, 'status': 'Pending', 'position': 3, 'ahead': 2, 'eta_minutes': 20,
+                     'service_time_minutes': 10}
+    # The same estimate as /api/queue, from the index instead of the database
+    queue = client.get('/api/queue/3').get_json()['queue']
+    assert queue.pop('estimated_start') is not None and queue == token
+    assert client.get('/api/token/99').status_code == 404
+
+    # Known tokens are answered without a query
+    queries = []
+    with app.app_context():
+        listener = lambda *args: queries.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            client.put(f'/api/admin/users/{ids[0]}', json={'status': 'Completed'}, headers=admin_headers)
+            client.put('/api/admin/users/status', json={'status': 'Completed', 'ids': [ids[1]]},
+                       headers=admin_headers)
+            del queries[:]
+            assert client.get('/api/token/3').get_json()['token']['position'] == 1
+            assert client.get('/api/token/1').get_json()['token']['status'] == 'Completed'
+            assert queries == []
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    # Another worker's new token is read through, its status change arrives
+    # with the next refresh
+    other_ids = [submit(other_client, 4)]
+    assert client.get('/api/token/5').get_json()['token']['position'] == 3
+    other_client.put(f'/api/admin/users/{ids[2]}', json={'status': 'Completed'}, headers=admin_headers)
+    assert client.get('/api/token/5').get_json()['token']['position'] == 3
+    with app.app_context():
+        app.extensions['token_index'].refresh()
+    assert client.get('/api/token/5').get_json()['token']['position'] == 2
+    assert client.get('/api/token/3').get_json()['token']['status'] == 'Completed'
+    assert other_ids
+
+    # A fresh limiter with an hour-long window, so the test cannot straddle two
+    responses = [client.get('/api/token/4') for _ in range(22)]
+    assert [response.status_code for response in responses] == [200] * 22
+    app.extensions['rate_limiters']['TOKEN_LOOKUP_RATE_LIMIT'] = RateLimiter(5, window_seconds=3600)
+    responses = [client.get('/api/token/4') for _ in range(7)]
+    assert [response.status_code for response in responses] == [200] * 5 + [429] * 2
+    assert int(responses[-1].headers['Retry-After']) >= 1
+    assert other_client.get('/api/token/4').status_code == 200
@@ -0,0 +1,75 @@
+import json
+from datetime import datetime
+
+from backend.models import db, User
+from backend.utils import user_serializer
+from backend.utils.user_serializer import USER_FIELDS, format_columns, iter_user_rows, select_users, serialize_users
+
+
+def baseline_to_dict(user):
+    # User.to_dict() as it was before the shared serializer
+    return {
+        'id': user.id,
+        'token_number': user.token_number,
+        'name': user.name,
+        'email': user.email,
+        'address': user.address,
+        'contact_number': user.contact_number,
+        'work_description': user.work_description,
+        'status': user.status,
+        'created_at': user.created_at.isoformat() if user.created_at else None,
+        'updated_at': user.updated_at.isoformat() if user.updated_at else None,
+        'reminder_sent': user.reminder_sent
+    }
+
+
+def test_serialized_rows_match_to_dict(make_app, admin_headers):
+    app = make_app(RESPONSE_CACHE_TTL_SECONDS=0)
+    with app.app_context():
+        # With and without microseconds, a missing updated_at, both reminder flags
+        for token_number, (created_at, updated_at, reminder_sent) in enumerate([
+            (datetime(2025, 3, 1, 9, 30, 15, 123456), datetime(2025, 3, 1, 9, 50), True),
+            (datetime(2025, 3, 1, 10, 0), None, False),
+            (datetime(2025, 3, 1, 10, 5, 0, 1), datetime(2025, 3, 1, 10, 5, 0, 1), False),
+        ], 1):
+            db.session.add(User(token_number=token_number, name=f'User "{token_number}" é',
+                                email=f'user{token_number}@example.com', address='1, Main Street\nGota',
+                                contact_number='555-0100', work_description='Test work',
+                                status='Pending', created_at=created_at, updated_at=updated_at,
+                                reminder_sent=reminder_sent))
+        db.session.commit()
+        db.session.execute(User.__table__.update().where(User.token_number == 2).values(updated_at=None))
+        db.session.commit()
+        db.session.expire_all()
+
+        users = User.query.order_by(User.token_number).all()
+        expected = [baseline_to_dict(user) for user in users]
+        assert [user.to_dict() for user in users] == expected
+        assert expected[1]['updated_at'] is None
+
+        rows = [row for batch in iter_user_rows(db.session, USER_FIELDS, batch_size=2) for row in batch]
+        assert serialize_users(USER_FIELDS, rows) == expected
+
+        # A subset of the fields, in the order asked for
+        fields = ('token_number', 'updated_at', 'name')
+        rows = db.session.execute(select_users(fields).order_by(User.token_number)).all()
+        assert serialize_users(fields, rows) == [{field: user[field] for field in fields} for user in expected]
+
+        # The export style is the old strftime text
+        rows = db.session.execute(select_users(['created_at', 'updated_at'])
+                                  .order_by(User.token_number)).all()
+        assert format_columns(['created_at', 'updated_at'], rows, style='export') == [
+            tuple(value.strftime('%Y-%m-%d %H:%M:%S') if value else '' for value in (user.created_at, user.updated_at))
+            for user in users
+        ]
+
+    # The listing's JSON decodes to the same dicts, with orjson and without
+    client = app.test_client()
+    orjson = user_serializer.orjson
+    try:
+        for encoder in {orjson, None}:
+            user_serializer.orjson = encoder
+            listing = client.get('/api/admin/users', headers=admin_headers).get_json()
+            assert listing['users'] == json.loads(json.dumps(expected[::-1]))
+    finally:
+        user_serializer.orjson = orjson